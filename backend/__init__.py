@@ -0,0 +1 @@
+from backend import config  # noqa: F401 (loads .env before any module reads os.environ)
@@ -0,0 +1,295 @@
+"""
+End-to-end API benchmark against backend.main:app with the mock LLM backend.
+
+Seeds a scratch database (videos + generated exercises, through the real
+services), then for every worker count starts `uvicorn backend.main:app
+--workers N` with LLM_BACKEND=mock and drives each hot endpoint at every
+concurrency level with an httpx async load generator for a fixed duration.
+Reports throughput and p50/p95/p99 latency per (workers, concurrency,
+endpoint) and saves the report as JSON.
+
+Endpoints: list_videos, get_exercise, evaluate_listening, speaking_eval,
+create_video. Listening answers are made unique per request so they miss the
+evaluation caches (worst case: every answer reaches the model).
+
+Usage:
+    python -m backend.bench.bench_api                                  # SQLite, workers 1,2,4 x concurrency 1,8,32
+    python -m backend.bench.bench_api --workers 1 --concurrency 16 --duration 5 --endpoints list_videos,speaking_eval
+    python -m backend.bench.bench_api --url mysql+pymysql://root:pw@127.0.0.1:3307/bench --mock-latency-ms 800
+
+SQLite serializes writers, so create_video numbers with several workers are
+mostly lock waits; use --url with a MySQL container for write-heavy runs.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import httpx
+
+DEFAULT_URL = "sqlite:///bench_api.db"
+ENDPOINTS = ["list_videos", "get_exercise", "evaluate_listening", "speaking_eval", "create_video"]
+WORDS = (
+    "family market weather school garden travel river music friend morning city "
+    "holiday kitchen library planet ocean story teacher window animal summer"
+).split()
+
+
+def _int_list(value: str):
+    return [int(v) for v in value.split(",") if v]
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=DEFAULT_URL, help="SQLAlchemy URL of a scratch database (it is wiped)")
+    parser.add_argument("--workers", type=_int_list, default=[1, 2, 4], help="uvicorn worker counts, e.g. 1,2,4")
+    parser.add_argument("--concurrency", type=_int_list, default=[1, 8, 32], help="in-flight requests, e.g. 1,8,32")
+    parser.add_argument("--duration", type=float, default=10, help="seconds per (workers, concurrency, endpoint) run")
+    parser.add_argument("--warmup", type=float, default=1, help="untimed seconds before each run")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS), help="comma-separated subset of " + ",".join(ENDPOINTS))
+    parser.add_argument("--videos", type=int, default=50, help="seeded videos (one exercise each)")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--mock-latency-ms", type=float, default=300, help="mean time to first token of the mock LLM")
+    parser.add_argument("--mock-latency-dist", default="lognormal", choices=["fixed", "uniform", "lognormal"])
+    parser.add_argument("--mock-tokens-per-sec", type=float, default=150)
+    parser.add_argument("--mock-failure-rate", type=float, default=0)
+    parser.add_argument("--output", help="JSON report path (default bench_results/api-<timestamp>.json)")
+    return parser.parse_args()
+
+
+ARGS = _parse_args() if __name__ == "__main__" else None
+if ARGS is not None:
+    # backend.database / llm_backend read these at import time
+    os.environ["DATABASE_URL"] = ARGS.url
+    os.environ["LLM_BACKEND"] = "mock"
+
+from sqlalchemy import create_engine  # noqa: E402
+
+from backend import models  # noqa: E402
+from backend.database import Base, SessionLocal  # noqa: E402
+from backend.migrations import run_migrations  # noqa: E402
+from backend.services import llm_backend  # noqa: E402
+from backend.services.exercise_service import get_or_generate_exercise  # noqa: E402
+
+
+# --------------------------
+# 🔹 Seed
+# --------------------------
+def _transcript(rnd: random.Random, sentences: int = 40) -> str:
+    return " ".join(
+        f"The {rnd.choice(WORDS)} near the {rnd.choice(WORDS)} was {rnd.choice(['quiet', 'busy', 'new', 'old', 'bright'])} "
+        f"when we talked about the {rnd.choice(WORDS)}."
+        for _ in range(sentences)
+    )
+
+
+def _seed(url: str, videos: int) -> dict:
+    engine = create_engine(url)
+    Base.metadata.drop_all(bind=engine)
+    run_migrations(engine)
+
+    # seeding goes through the real generation path, without simulated latency
+    llm_backend.set_backend(llm_backend.MockBackend(latency_ms=0, latency_dist="fixed", tokens_per_sec=0, failure_rate=0))
+    rnd = random.Random(42)
+    data = {"sources": [], "questions": []}
+    db = SessionLocal()
+    try:
+        for i in range(videos):
+            video = models.ListeningSource(
+                url=f"https://www.youtube.com/watch?v=bench{i:05d}",
+                title=f"Bench video {i}",
+                youtube_video_id=f"bench{i:05d}",
+                transcript=_transcript(rnd),
+            )
+            db.add(video)
+            db.commit()
+            exercise, _ = asyncio.run(get_or_generate_exercise(db, video))
+            data["sources"].append(video.id)
+            for q in exercise.content["questions"]:
+                points = q.get("expected_answer_points") or ["personal opinion"]
+                data["questions"].append({"exercise_id": exercise.id, "question_id": q["id"], "answer": points[0]})
+    finally:
+        db.close()
+        llm_backend.set_backend(None)
+    engine.dispose()
+    print(f"🌱 Seeded {videos} videos, {len(data['questions'])} questions")
+    return data
+
+
+# --------------------------
+# 🔹 Requests
+# --------------------------
+def _request_factory(name: str, data: dict, rnd: random.Random):
+    """Returns a function building (method, path, httpx kwargs) for one request."""
+    if name == "list_videos":
+        return lambda: ("GET", "/api/videos/?limit=20", {})
+    if name == "get_exercise":
+        return lambda: ("GET", f"/api/listening/exercises/{rnd.choice(data['sources'])}", {})
+    if name == "evaluate_listening":
+        def evaluate():
+            q = rnd.choice(data["questions"])
+            answer = f"{q['answer']} {rnd.choice(WORDS)} {rnd.randint(0, 10**9)}"
+            return "POST", "/api/speaking/evaluate", {"data": {"question_id": q["question_id"], "exercise_id": q["exercise_id"], "user_answer": answer}}
+        return evaluate
+    if name == "speaking_eval":
+        return lambda: ("POST", "/api/ai/eval/speaking", {"json": {"transcript": _transcript(rnd, sentences=rnd.randint(2, 6))}})
+    if name == "create_video":
+        def create():
+            vid = f"new{rnd.randint(0, 10**12):012d}"
+            return "POST", "/api/videos/", {"json": {"title": f"Bench upload {vid}", "url": f"https://www.youtube.com/watch?v={vid}", "youtube_video_id": vid, "transcript": _transcript(rnd, 10)}}
+        return create
+    raise ValueError(f"Unknown endpoint {name!r}")
+
+
+def _percentile(samples, q: float):
+    if not samples:
+        return None
+    index = min(len(samples) - 1, max(0, round(q * len(samples)) - 1))
+    return round(samples[index], 2)
+
+
+async def _run_load(base_url: str, build, concurrency: int, duration: float, warmup: float) -> dict:
+    latencies, statuses, errors = [], {}, 0
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        started = time.perf_counter()
+        measure_from = started + warmup
+        stop_at = measure_from + duration
+
+        async def worker():
+            nonlocal errors
+            while True:
+                method, path, kwargs = build()
+                t0 = time.perf_counter()
+                if t0 >= stop_at:
+                    return
+                try:
+                    resp = await client.request(method, path, **kwargs)
+                    status = resp.status_code
+                except httpx.HTTPError:
+                    status = "connection_error"
+                elapsed = (time.perf_counter() - t0) * 1000
+                if t0 < measure_from:
+                    continue
+                statuses[str(status)] = statuses.get(str(status), 0) + 1
+                if status == "connection_error" or status >= 400:
+                    errors += 1
+                latencies.append(elapsed)
+
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "status_codes": statuses,
+        "throughput_rps": round(len(latencies) / duration, 2),
+        "p50_ms": _percentile(latencies, 0.50),
+        "p95_ms": _percentile(latencies, 0.95),
+        "p99_ms": _percentile(latencies, 0.99),
+        "max_ms": round(latencies[-1], 2) if latencies else None,
+    }
+
+
+# --------------------------
+# 🔹 Server
+# --------------------------
+def _start_server(args, workers: int, log_path: str) -> subprocess.Popen:
+    env = {
+        **os.environ,
+        "DATABASE_URL": args.url,
+        "LLM_BACKEND": "mock",
+        "MOCK_LLM_LATENCY_MS": str(args.mock_latency_ms),
+        "MOCK_LLM_LATENCY_DIST": args.mock_latency_dist,
+        "MOCK_LLM_TOKENS_PER_SEC": str(args.mock_tokens_per_sec),
+        "MOCK_LLM_FAILURE_RATE": str(args.mock_failure_rate),
+    }
+    command = [
+        sys.executable, "-m", "uvicorn", "backend.main:app",
+        "--host", "127.0.0.1", "--port", str(args.port), "--workers", str(workers), "--log-level", "warning",
+    ]
+    log = open(log_path, "a")
+    return subprocess.Popen(command, env=env, stdout=log, stderr=subprocess.STDOUT)
+
+
+def _wait_ready(base_url: str, process: subprocess.Popen, timeout: float = 60) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with code {process.returncode}, see the server log")
+        try:
+            if httpx.get(f"{base_url}/api/videos/?limit=1", timeout=2).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.3)
+    raise RuntimeError(f"server not ready after {timeout}s")
+
+
+def _stop_server(process: subprocess.Popen) -> None:
+    process.terminate()
+    try:
+        process.wait(timeout=20)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def main(args) -> dict:
+    endpoints = [e for e in args.endpoints.split(",") if e]
+    unknown = set(endpoints) - set(ENDPOINTS)
+    if unknown:
+        raise SystemExit(f"Unknown endpoints: {', '.join(sorted(unknown))}")
+
+    output = args.output or os.path.join("bench_results", f"api-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    log_path = os.path.splitext(output)[0] + ".server.log"
+
+    started_at = datetime.now(timezone.utc).isoformat()
+    print(f"🔧 Preparing {args.url}")
+    data = _seed(args.url, args.videos)
+    base_url = f"http://127.0.0.1:{args.port}"
+    rnd = random.Random(7)
+
+    runs = []
+    for workers in args.workers:
+        print(f"🚀 uvicorn --workers {workers}")
+        process = _start_server(args, workers, log_path)
+        try:
+            _wait_ready(base_url, process)
+            for concurrency in args.concurrency:
+                for endpoint in endpoints:
+                    result = asyncio.run(_run_load(base_url, _request_factory(endpoint, data, rnd), concurrency, args.duration, args.warmup))
+                    runs.append({"workers": workers, "concurrency": concurrency, "endpoint": endpoint, **result})
+                    print(
+                        f"  w={workers:<2} c={concurrency:<3} {endpoint:<19} {result['throughput_rps']:>8} rps  "
+                        f"p50={result['p50_ms']}ms p95={result['p95_ms']}ms p99={result['p99_ms']}ms errors={result['errors']}"
+                    )
+        finally:
+            _stop_server(process)
+
+    report = {
+        "started_at": started_at,
+        "database": create_engine(args.url).dialect.name,
+        "duration_s": args.duration,
+        "mock_llm": {
+            "latency_ms": args.mock_latency_ms,
+            "latency_dist": args.mock_latency_dist,
+            "tokens_per_sec": args.mock_tokens_per_sec,
+            "failure_rate": args.mock_failure_rate,
+        },
+        "seed": {"videos": args.videos, "questions": len(data["questions"])},
+        "runs": runs,
+    }
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"📄 Report written to {output}")
+    return report
+
+
+if __name__ == "__main__":
+    main(ARGS)
@@ -0,0 +1,193 @@
+"""
+Query-plan benchmark for the exercise/progress indexes.
+
+Seeds a database with users, sources, exercises and progress rows, times
+the hot lookups without the composite indexes, then creates them through
+run_migrations() and times the same lookups again.
+
+Usage:
+    python -m backend.bench.bench_indexes                       # SQLite file, 1M progress rows
+    python -m backend.bench.bench_indexes --rows 200000 --url mysql+pymysql://root:pw@127.0.0.1:3307/bench
+"""
+import argparse
+import json
+import os
+import random
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+
+DEFAULT_URL = "sqlite:///bench_indexes.db"
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=DEFAULT_URL, help="SQLAlchemy URL of a scratch database (it is wiped)")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="number of user_listening_progress rows")
+    parser.add_argument("--users", type=int, default=20_000)
+    parser.add_argument("--sources", type=int, default=500)
+    parser.add_argument("--exercises-per-source", type=int, default=4)
+    parser.add_argument("--repeat", type=int, default=50, help="timed runs per query")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    return parser.parse_args()
+
+
+ARGS = _parse_args() if __name__ == "__main__" else None
+if ARGS is not None:
+    # backend.database reads DATABASE_URL at import time
+    os.environ["DATABASE_URL"] = ARGS.url
+
+from sqlalchemy import create_engine, insert, inspect, select  # noqa: E402
+
+from backend import models  # noqa: E402
+from backend.database import Base  # noqa: E402
+from backend.migrations import run_migrations  # noqa: E402
+
+NEW_INDEXES = {
+    "listening_exercises": {"ix_listening_exercises_source_created", "ix_listening_exercises_type_created"},
+    "user_listening_progress": {"ix_progress_user_exercise_submitted", "ix_progress_exercise_submitted"},
+}
+
+
+def _create_schema_without_new_indexes(engine) -> None:
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    for table_name, names in NEW_INDEXES.items():
+        table = Base.metadata.tables[table_name]
+        for index in table.indexes:
+            if index.name in names:
+                index.drop(bind=engine)
+
+
+def _seed(engine, args) -> dict:
+    rnd = random.Random(42)
+    now = datetime.now(timezone.utc)
+    user_ids = [str(uuid.uuid4()) for _ in range(args.users)]
+    source_ids = [str(uuid.uuid4()) for _ in range(args.sources)]
+    exercise_ids = []
+
+    with engine.begin() as conn:
+        conn.execute(insert(models.User), [
+            {"id": uid, "name": f"user{i}", "email": f"user{i}@bench.local", "is_active": True}
+            for i, uid in enumerate(user_ids)
+        ])
+        conn.execute(insert(models.ListeningSource), [
+            {"id": sid, "url": f"https://youtube.com/watch?v={i}", "title": f"Video {i}", "youtube_video_id": f"vid{i}"}
+            for i, sid in enumerate(source_ids)
+        ])
+        exercises = []
+        for sid in source_ids:
+            for k in range(args.exercises_per_source):
+                eid = str(uuid.uuid4())
+                exercise_ids.append(eid)
+                exercises.append({
+                    "id": eid, "source_id": sid, "exercise_type": rnd.choice(["comprehension", "lesson"]),
+                    "content": {"title": "bench", "questions": []}, "created_at": now - timedelta(minutes=k),
+                })
+        conn.execute(insert(models.ListeningExercise), exercises)
+
+    batch = 20_000
+    for offset in range(0, args.rows, batch):
+        rows = [
+            {
+                "id": str(uuid.uuid4()),
+                "user_id": rnd.choice(user_ids),
+                "exercise_id": rnd.choice(exercise_ids),
+                "score": rnd.randint(0, 100),
+                "results": [],
+                "submitted_at": now - timedelta(seconds=rnd.randint(0, 90 * 86400)),
+            }
+            for _ in range(min(batch, args.rows - offset))
+        ]
+        with engine.begin() as conn:
+            conn.execute(insert(models.UserListeningProgress), rows)
+        print(f"  seeded {offset + len(rows):>9,} / {args.rows:,} progress rows", end="\r", flush=True)
+    print()
+    return {"users": user_ids, "sources": source_ids, "exercises": exercise_ids}
+
+
+def _queries(ids: dict):
+    Exercise, Progress = models.ListeningExercise, models.UserListeningProgress
+    rnd = random.Random(7)
+    return {
+        "exercise_by_source_latest": lambda: select(Exercise.id)
+        .where(Exercise.source_id == rnd.choice(ids["sources"]))
+        .order_by(Exercise.created_at.desc()).limit(1),
+        "exercises_by_type_recent": lambda: select(Exercise.id)
+        .where(Exercise.exercise_type == "comprehension")
+        .order_by(Exercise.created_at.desc()).limit(20),
+        "progress_by_user": lambda: select(Progress.id, Progress.score)
+        .where(Progress.user_id == rnd.choice(ids["users"]))
+        .order_by(Progress.submitted_at.desc()).limit(50),
+        "progress_by_user_exercise": lambda: select(Progress.score)
+        .where(Progress.user_id == rnd.choice(ids["users"]), Progress.exercise_id == rnd.choice(ids["exercises"]))
+        .order_by(Progress.submitted_at.desc()).limit(1),
+        "progress_by_exercise": lambda: select(Progress.score)
+        .where(Progress.exercise_id == rnd.choice(ids["exercises"]))
+        .order_by(Progress.submitted_at.desc()).limit(50),
+    }
+
+
+def _time_queries(engine, ids: dict, repeat: int) -> dict:
+    results = {}
+    with engine.connect() as conn:
+        for name, build in _queries(ids).items():
+            conn.execute(build()).all()  # warm-up
+            samples = []
+            for _ in range(repeat):
+                stmt = build()
+                start = time.perf_counter()
+                conn.execute(stmt).all()
+                samples.append((time.perf_counter() - start) * 1000)
+            samples.sort()
+            results[name] = {
+                "p50_ms": round(statistics.median(samples), 3),
+                "p95_ms": round(samples[int(len(samples) * 0.95) - 1], 3),
+                "max_ms": round(samples[-1], 3),
+            }
+    return results
+
+
+def main(args) -> dict:
+    engine = create_engine(args.url)
+    print(f"🔧 Preparing {engine.url.render_as_string(hide_password=True)}")
+    _create_schema_without_new_indexes(engine)
+    ids = _seed(engine, args)
+
+    print("⏱️  Timing queries without composite indexes...")
+    before = _time_queries(engine, ids, args.repeat)
+
+    start = time.perf_counter()
+    run_migrations(engine)
+    migration_s = time.perf_counter() - start
+    created = {
+        t: sorted(NEW_INDEXES[t] & {ix["name"] for ix in inspect(engine).get_indexes(t)}) for t in NEW_INDEXES
+    }
+
+    print("⏱️  Timing queries with composite indexes...")
+    after = _time_queries(engine, ids, args.repeat)
+
+    report = {
+        "database": engine.dialect.name,
+        "progress_rows": args.rows,
+        "migration_seconds": round(migration_s, 2),
+        "indexes_created": created,
+        "queries": {
+            name: {
+                "before": before[name],
+                "after": after[name],
+                "speedup_p50": round(before[name]["p50_ms"] / after[name]["p50_ms"], 1) if after[name]["p50_ms"] else None,
+            }
+            for name in before
+        },
+    }
+    print(json.dumps(report, indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return report
+
+
+if __name__ == "__main__":
+    main(ARGS)
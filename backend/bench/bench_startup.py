@@ -0,0 +1,186 @@
+"""
+Cold-start benchmark: import time of backend.main and first-request latency.
+
+For every repeat, in fresh processes:
+  - import_s: `import backend.main` in a new interpreter
+  - listen_s: from spawning `uvicorn backend.main:app` until the port accepts
+  - first_request_ms / second_request_ms: GET --path right after that
+The scratch database is migrated and seeded once up front (python -m
+backend.seed), as a deploy would, so startup only pays for what runs on boot.
+Also lists the slowest top-level imports from `python -X importtime`.
+
+Usage:
+    python -m backend.bench.bench_startup
+    python -m backend.bench.bench_startup --repeats 10 --path /api/listening/exercises
+    python -m backend.bench.bench_startup --migrations-on-startup --db-init-on-startup   # old boot path
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import httpx
+
+DEFAULT_URL = "sqlite:///bench_startup.db"
+
+
+def _parse_args():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default=DEFAULT_URL, help="SQLAlchemy URL of a scratch database")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--path", default="/api/videos/?limit=20", help="endpoint hit by the first request")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--migrations-on-startup", action="store_true", help="RUN_MIGRATIONS_ON_STARTUP=1 for the server")
+    parser.add_argument("--db-init-on-startup", action="store_true", help="RUN_DB_INIT_ON_STARTUP=1 for the server")
+    parser.add_argument("--top-imports", type=int, default=15, help="slowest imports to list")
+    parser.add_argument("--output", help="JSON report path (default bench_results/startup-<timestamp>.json)")
+    return parser.parse_args()
+
+
+def _env(args) -> dict:
+    return {
+        **os.environ,
+        "DATABASE_URL": args.url,
+        "LLM_BACKEND": "mock",
+        "RUN_MIGRATIONS_ON_STARTUP": "1" if args.migrations_on_startup else "0",
+        "RUN_DB_INIT_ON_STARTUP": "1" if args.db_init_on_startup else "0",
+    }
+
+
+# --------------------------
+# 🔹 Import time
+# --------------------------
+IMPORT_SNIPPET = "import time; t = time.perf_counter(); import backend.main; print(time.perf_counter() - t)"
+
+
+def _import_time(env: dict) -> float:
+    out = subprocess.run([sys.executable, "-c", IMPORT_SNIPPET], env=env, check=True, capture_output=True, text=True).stdout
+    return float(out.strip().splitlines()[-1])
+
+
+def _slowest_imports(env: dict, top: int) -> list:
+    """Cumulative time of the top-level packages imported by backend.main (one -X importtime run)."""
+    err = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import backend.main"], env=env, check=True, capture_output=True, text=True
+    ).stderr
+    packages = {}
+    for line in err.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        if not cumulative.isdigit() or name.startswith(" "):
+            continue
+        package = name.strip().split(".")[0]
+        # the top-level package line is imported last and carries the cumulative time of its submodules
+        packages[package] = max(packages.get(package, 0), int(cumulative))
+    slowest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:top]
+    return [{"module": name, "cumulative_ms": round(us / 1000, 1)} for name, us in slowest]
+
+
+# --------------------------
+# 🔹 Server start + first request
+# --------------------------
+def _wait_listening(port: int, process: subprocess.Popen, timeout: float = 60) -> None:
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"uvicorn exited with code {process.returncode}, see the server log")
+        try:
+            with socket.create_connection(("127.0.0.1", port), timeout=0.2):
+                return
+        except OSError:
+            time.sleep(0.01)
+    raise RuntimeError(f"server not listening after {timeout}s")
+
+
+def _timed_get(client: httpx.Client, path: str) -> float:
+    t0 = time.perf_counter()
+    resp = client.get(path)
+    elapsed = (time.perf_counter() - t0) * 1000
+    if resp.status_code >= 400:
+        raise RuntimeError(f"GET {path} returned {resp.status_code}")
+    return elapsed
+
+
+def _server_start(args, env: dict, log) -> dict:
+    command = [
+        sys.executable, "-m", "uvicorn", "backend.main:app",
+        "--host", "127.0.0.1", "--port", str(args.port), "--log-level", "warning",
+    ]
+    started = time.perf_counter()
+    process = subprocess.Popen(command, env=env, stdout=log, stderr=subprocess.STDOUT)
+    try:
+        # uvicorn binds the socket only after the app's startup handlers finished
+        _wait_listening(args.port, process)
+        listen_s = time.perf_counter() - started
+        with httpx.Client(base_url=f"http://127.0.0.1:{args.port}", timeout=60) as client:
+            first_ms = _timed_get(client, args.path)
+            second_ms = _timed_get(client, args.path)
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=20)
+        except subprocess.TimeoutExpired:
+            process.kill()
+    return {"listen_s": listen_s, "first_request_ms": first_ms, "second_request_ms": second_ms}
+
+
+def _summary(samples: list, digits: int) -> dict:
+    return {
+        "median": round(statistics.median(samples), digits),
+        "min": round(min(samples), digits),
+        "max": round(max(samples), digits),
+    }
+
+
+def main(args) -> dict:
+    output = args.output or os.path.join("bench_results", f"startup-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    log_path = os.path.splitext(output)[0] + ".server.log"
+    env = _env(args)
+
+    print(f"🔧 Preparing {args.url}")
+    subprocess.run([sys.executable, "-m", "backend.seed"], env=env, check=True, capture_output=True)
+
+    imports, runs = [], []
+    with open(log_path, "a") as log:
+        for i in range(args.repeats):
+            imports.append(_import_time(env))
+            runs.append(_server_start(args, env, log))
+            print(
+                f"  #{i + 1}: import={imports[-1]:.3f}s listen={runs[-1]['listen_s']:.3f}s "
+                f"first={runs[-1]['first_request_ms']:.1f}ms second={runs[-1]['second_request_ms']:.1f}ms"
+            )
+
+    report = {
+        "started_at": datetime.now(timezone.utc).isoformat(),
+        "python": sys.version.split()[0],
+        "path": args.path,
+        "repeats": args.repeats,
+        "migrations_on_startup": args.migrations_on_startup,
+        "db_init_on_startup": args.db_init_on_startup,
+        "import_s": _summary(imports, 3),
+        "listen_s": _summary([r["listen_s"] for r in runs], 3),
+        "first_request_ms": _summary([r["first_request_ms"] for r in runs], 1),
+        "second_request_ms": _summary([r["second_request_ms"] for r in runs], 1),
+        "slowest_imports": _slowest_imports(env, args.top_imports),
+    }
+    print(
+        f"📊 import {report['import_s']['median']}s, listening after {report['listen_s']['median']}s, "
+        f"first request {report['first_request_ms']['median']}ms (then {report['second_request_ms']['median']}ms)"
+    )
+    for item in report["slowest_imports"]:
+        print(f"    {item['module']:<28} {item['cumulative_ms']:>8} ms")
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"📄 Report written to {output}")
+    return report
+
+
+if __name__ == "__main__":
+    main(_parse_args())
@@ -0,0 +1,17 @@
+import os
+from dotenv import load_dotenv
+
+# --------------------------
+# 🔹 Load environment
+# --------------------------
+# Imported by backend/__init__.py, so .env is read exactly once per process,
+# before any module reads its settings with os.getenv (real env vars win).
+load_dotenv()
+
+# --------------------------
+# 🔹 Startup
+# --------------------------
+# Schema upgrade on every worker boot (idempotent, races between workers are tolerated)
+RUN_MIGRATIONS_ON_STARTUP = os.getenv("RUN_MIGRATIONS_ON_STARTUP", "1") != "0"
+# Sample data is seeded once with `python -m backend.seed`; set to 1 to also seed on boot
+RUN_DB_INIT_ON_STARTUP = os.getenv("RUN_DB_INIT_ON_STARTUP", "0") == "1"
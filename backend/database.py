@@ -1,13 +1,16 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 import os
-from dotenv import load_dotenv
+import threading
+import time
+from backend.services.metrics import Histogram
 
 
-# Load environment variables from .env if present
-load_dotenv()
-
 def _build_database_url() -> str:
     """Return SQLAlchemy database URL.
 
@@ -29,11 +32,140 @@ if not DATABASE_URL or DATABASE_URL.strip() == "":
         "Database configuration missing. Set DATABASE_URL or DB_* env vars."
     )
 
-engine = create_engine(
-    DATABASE_URL,
-    pool_pre_ping=True,
-)
+# --------------------------
+# 🔹 Connection pool
+# --------------------------
+# Size the pool against the threadpool/worker count: each uvicorn worker has
+# its own pool, so the DB sees workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW).
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))  # seconds to wait for a free connection
+# Recycle connections before MySQL's wait_timeout closes them server-side; with
+# recycling in place DB_POOL_PRE_PING=0 saves the SELECT 1 round-trip per checkout.
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "1") != "0"
+
+POOL_WAIT_BUCKETS_MS = [0.1, 1, 5, 10, 50, 100, 500, 1000, 5000, 30000]
+
+
+class PoolStats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.checkout_wait_ms = Histogram(POOL_WAIT_BUCKETS_MS)
+        self.checkouts = 0
+        self.overflow_events = 0  # checkouts that had to open an overflow connection
+        self.timeouts = 0
+        self.peak_in_use = 0
+
+
+pool_stats = PoolStats()
+async_pool_stats = PoolStats()
+
+
+class _TimedCheckout:
+    """Pool mixin that times how long each checkout waits for a connection."""
+
+    stats: PoolStats
+
+    def _do_get(self):
+        overflow_before = self.overflow()
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            with self.stats.lock:
+                self.stats.timeouts += 1
+            raise
+        waited_ms = (time.perf_counter() - started) * 1000
+        with self.stats.lock:
+            self.stats.checkout_wait_ms.observe(waited_ms)
+            self.stats.checkouts += 1
+            overflow = self.overflow()
+            if overflow > overflow_before and overflow > 0:
+                self.stats.overflow_events += 1
+            self.stats.peak_in_use = max(self.stats.peak_in_use, self.checkedout())
+        return connection
+
+
+class InstrumentedQueuePool(_TimedCheckout, QueuePool):
+    stats = pool_stats
+
+
+class InstrumentedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    stats = async_pool_stats
+
+
+def _engine_options(url: str, poolclass=InstrumentedQueuePool) -> dict:
+    options = {"pool_pre_ping": DB_POOL_PRE_PING}
+    parsed = make_url(url)
+    if parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:"):
+        # in-memory SQLite lives in one connection: keep SQLAlchemy's default pool
+        return options
+    options.update(
+        poolclass=poolclass,
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+    )
+    return options
+
+
+# Async drivers for the sync URLs in use (ASYNC_DATABASE_URL overrides)
+ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql",
+    "mysql+mysqlconnector": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+
+def _async_database_url(url: str) -> str:
+    if os.getenv("ASYNC_DATABASE_URL"):
+        return os.getenv("ASYNC_DATABASE_URL")
+    parsed = make_url(url)
+    drivername = ASYNC_DRIVERS.get(parsed.drivername, parsed.drivername)
+    return parsed.set(drivername=drivername).render_as_string(hide_password=False)
+
+
+engine = create_engine(DATABASE_URL, **_engine_options(DATABASE_URL))
+
+ASYNC_DATABASE_URL = _async_database_url(DATABASE_URL)
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **_engine_options(ASYNC_DATABASE_URL, InstrumentedAsyncQueuePool))
+
+
+def _pool_metrics(pool, stats: PoolStats) -> dict:
+    with stats.lock:
+        metrics = {
+            "pool_class": type(pool).__name__,
+            "checkouts": stats.checkouts,
+            "overflow_events": stats.overflow_events,
+            "timeouts": stats.timeouts,
+            "peak_in_use": stats.peak_in_use,
+            "checkout_wait_ms": stats.checkout_wait_ms.snapshot(),
+        }
+    if isinstance(pool, QueuePool):
+        metrics.update(
+            size=pool.size(),
+            max_overflow=DB_MAX_OVERFLOW,
+            in_use=pool.checkedout(),
+            idle=pool.checkedin(),
+            overflow=max(pool.overflow(), 0),
+        )
+    return metrics
+
+
+def pool_metrics() -> dict:
+    return _pool_metrics(engine.pool, pool_stats)
+
+
+def async_pool_metrics() -> dict:
+    return _pool_metrics(async_engine.pool, async_pool_stats)
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# expire_on_commit=False: attributes stay readable after commit without an implicit (sync) reload
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 Base = declarative_base()
 
 
@@ -45,4 +177,10 @@ def get_db():
         db.close()
 
 
+async def get_async_db():
+    """AsyncSession dependency: DB I/O runs on the event loop instead of the threadpool."""
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
 # db_dependency = Annotated[Session, Depends(get_db)]
\ No newline at end of file
@@ -1,8 +1,16 @@
-from fastapi import FastAPI
-from backend import models
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from backend.database import SessionLocal, engine, Base, DATABASE_URL
-from backend.routers import video_router, speaking_router, ai_question_router, listening_router, ai_eval_router
+import asyncio
+from backend import config
+from backend.database import engine, async_engine
+from backend.routers import video_router, speaking_router, ai_question_router, listening_router, ai_eval_router, job_router, metrics_router, progress_router
+from backend.migrations import run_migrations
+from backend.seed import init_db_data
+from backend.services.job_queue import job_queue
+from backend.services import audio_store, asr_service, llm_calls
+from backend.services.ai_service import MODEL
+from backend.services.progress_recorder import progress_recorder
 
 app = FastAPI()
 app.add_middleware(
@@ -11,74 +19,58 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Next-Cursor", "X-Total-Count", "Link"],
 )
 
-def init_db_data():
-    """Initialize fake data for ListeningSource table if empty"""
-    db = SessionLocal()
-    try:
-        # Check if table has data
-        if not db.query(models.ListeningSource).first():
-            sample_data = [
-                models.ListeningSource(
-                    url="https://www.youtube.com/watch?v=dQw4w9WgXcQ",  # full YouTube URL
-                    title="English Listening - Daily Conversation",
-                    youtube_video_id="dQw4w9WgXcQ",
-                    transcript="""
-                    A: Hi, how are you today?
-                    B: I'm good, thanks! How about you?
-                    A: Not bad. What are your plans for the weekend?
-                    B: I'm going to visit my parents.
-                    """
-                ),
-                models.ListeningSource(
-                    url="https://www.youtube.com/watch?v=_DmYA7OzyRE",
-                    title="Speaking Practice - Travel Roleplay",
-                    youtube_video_id="_DmYA7OzyRE",
-                    transcript="""
-                    A: Excuse me, where is the nearest train station?
-                    B: It's just two blocks away on the left.
-                    A: Thank you very much!
-                    B: You're welcome!
-                    """
-                ),
-                models.ListeningSource(
-                    url="https://www.youtube.com/watch?v=M7lc1UVf-VE",
-                    title="Learn Loops in Computer Science",
-                    youtube_video_id="M7lc1UVf-VE",
-                    transcript="""
-                    for i in range(5):
-                        print("Hello, world!")
-                    # This loop prints the message five times.
-                    """
-                )
-            ]
+# Endpoints receiving audio files: oversized uploads are rejected from the
+# Content-Length header before the multipart body is read
+AUDIO_UPLOAD_PATHS = {
+    "/api/speaking/upload-audio",
+    "/api/ai/eval/speaking/audio",
+    "/api/ai/eval/speaking/audio/stream",
+}
+MULTIPART_OVERHEAD_BYTES = 64 * 1024
 
-            db.add_all(sample_data)
-            db.commit()
-            print("Dữ liệu mẫu ListeningSource đã được thêm vào database.")
-        else:
-            print("ℹDữ liệu mẫu ListeningSource đã tồn tại, bỏ qua thêm mới.")
-    except Exception as e:
-        db.rollback()
-        print(f"Lỗi khi khởi tạo dữ liệu mẫu: {e}")
-    finally:
-        db.close()
+@app.middleware("http")
+async def limit_audio_upload_size(request: Request, call_next):
+    if request.method == "POST" and request.url.path in AUDIO_UPLOAD_PATHS:
+        content_length = request.headers.get("content-length")
+        if content_length and content_length.isdigit() and \
+                int(content_length) > audio_store.MAX_AUDIO_UPLOAD_BYTES + MULTIPART_OVERHEAD_BYTES:
+            return JSONResponse(status_code=413, content={"detail": "Audio file too large"})
+    return await call_next(request)
 
 @app.on_event("startup")
-def on_startup():
-    init_db_data()
+async def on_startup():
+    # Sample data is seeded once by `python -m backend.seed`, not by every worker.
+    # Both steps are blocking DB work: keep them off the event loop.
+    if config.RUN_MIGRATIONS_ON_STARTUP:
+        # create missing tables / columns / indexes (idempotent)
+        await asyncio.to_thread(run_migrations, engine)
+    if config.RUN_DB_INIT_ON_STARTUP:
+        await asyncio.to_thread(init_db_data)
+    # tiktoken may download its BPE file on first use: do it now, in a thread,
+    # instead of inside the first model call (kept on app.state so it is not GC'd)
+    app.state.tokenizer_warmup = asyncio.create_task(asyncio.to_thread(llm_calls.warm_encoding, MODEL))
+    await job_queue.start()
+    audio_store.start_janitor()
+    progress_recorder.start()
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    await job_queue.stop()
+    await audio_store.stop_janitor()
+    # write out buffered progress before exiting
+    await progress_recorder.stop()
+    asr_service.shutdown_executor()
+    await async_engine.dispose()
 
 app.include_router(video_router.router, prefix="/api/videos", tags=["Videos"])
 app.include_router(speaking_router.router, prefix="/api/speaking", tags=["Speaking"])
 app.include_router(listening_router.router, prefix="/api/listening", tags=["Listening"])
 app.include_router(ai_question_router.router, prefix="/api/ai/questions", tags=["AI Question Generator"])
 app.include_router(ai_eval_router.router, prefix="/api/ai/eval", tags=["AI Evaluation"])
-
-def get_db():
-    db = SessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
+app.include_router(job_router.router, prefix="/api/jobs", tags=["Jobs"])
+app.include_router(metrics_router.router, prefix="/api/metrics", tags=["Metrics"])
+app.include_router(progress_router.router, prefix="/api/progress", tags=["Progress"])
 
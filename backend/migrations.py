@@ -0,0 +1,78 @@
+import logging
+
+from sqlalchemy import inspect, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import OperationalError, ProgrammingError
+
+from backend import models  # noqa: F401 (registers all tables on Base.metadata)
+from backend.database import Base, engine as default_engine
+
+logger = logging.getLogger("api_debug")
+
+
+def _add_missing_columns(engine: Engine, table, existing_columns: set) -> None:
+    """ALTER TABLE ... ADD COLUMN for nullable columns added to the models later."""
+    for column in table.columns:
+        if column.name in existing_columns:
+            continue
+        if not column.nullable or column.primary_key:
+            logger.warning(f"⚠️ Column {table.name}.{column.name} is missing and not nullable; add it manually")
+            continue
+        column_type = column.type.compile(dialect=engine.dialect)
+        try:
+            with engine.begin() as conn:
+                conn.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+        except (OperationalError, ProgrammingError):
+            # another worker may have added it since we inspected: fine if it is there now
+            if column.name not in {c["name"] for c in inspect(engine).get_columns(table.name)}:
+                raise
+            continue
+        logger.info(f"🛠️ Added column {table.name}.{column.name}")
+
+
+def _create_missing_tables(engine: Engine) -> None:
+    """create_all() one table at a time, tolerating a concurrent CREATE of the same table."""
+    for table in Base.metadata.sorted_tables:
+        try:
+            table.create(bind=engine, checkfirst=True)
+        except (OperationalError, ProgrammingError):
+            if not inspect(engine).has_table(table.name):
+                raise
+
+
+def _create_missing_indexes(engine: Engine, table, existing_indexes: set) -> None:
+    for index in table.indexes:
+        if index.name in existing_indexes:
+            continue
+        try:
+            index.create(bind=engine)
+            logger.info(f"🛠️ Created index {index.name}")
+        except (OperationalError, ProgrammingError) as e:
+            # Another worker may have created it at the same time
+            if index.name not in {ix["name"] for ix in inspect(engine).get_indexes(table.name)}:
+                logger.warning(f"⚠️ Could not create index {index.name}: {e}")
+
+
+def run_migrations(engine: Engine = default_engine) -> None:
+    """
+    Idempotent schema upgrade, safe to run on every start and by several
+    workers at once (a DDL that fails because another worker just applied it
+    is checked against a fresh inspection and skipped):
+    1) create missing tables (with their indexes)
+    2) add nullable columns that exist in the models but not in the database
+    3) create indexes declared on the models but missing in the database
+    """
+    _create_missing_tables(engine)
+
+    inspector = inspect(engine)
+    for table in Base.metadata.sorted_tables:
+        if not inspector.has_table(table.name):
+            continue
+        _add_missing_columns(engine, table, {c["name"] for c in inspector.get_columns(table.name)})
+        _create_missing_indexes(engine, table, {ix["name"] for ix in inspector.get_indexes(table.name)})
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    run_migrations()
+    print("✅ Database schema is up to date.")
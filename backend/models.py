@@ -1,7 +1,7 @@
 import uuid
-from sqlalchemy import Column, String, Boolean, ForeignKey, DateTime, JSON, Integer
+from sqlalchemy import Column, String, Boolean, ForeignKey, DateTime, JSON, Integer, Text, Index
 from sqlalchemy.dialects.mysql import LONGTEXT
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 from backend.database import Base
 
@@ -30,7 +30,9 @@ class ListeningSource(Base):
     url = Column(String(512))
     title = Column(String(255))
     youtube_video_id = Column(String(32), unique=True, index=True)
-    transcript = Column(LONGTEXT, nullable=True)
+    transcript = Column(Text().with_variant(LONGTEXT, "mysql"), nullable=True)
+    # Timed transcript {"start": [...], "end": [...], "text": [...]}, see services/transcript_segments.py
+    segments = deferred(Column(JSON, nullable=True))
 
     # Relationship
     exercises = relationship("ListeningExercise", back_populates="source", cascade="all, delete")
@@ -41,7 +43,11 @@ class ListeningSource(Base):
 # -------------------------------
 class ListeningExercise(Base):
     __tablename__ = "listening_exercises"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_listening_exercises_source_created", "source_id", "created_at"),
+        Index("ix_listening_exercises_type_created", "exercise_type", "created_at"),
+        {'extend_existing': True},
+    )
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     source_id = Column(String(36), ForeignKey("listening_sources.id"))
@@ -53,6 +59,7 @@ class ListeningExercise(Base):
     # Relationship
     source = relationship("ListeningSource", back_populates="exercises")
     progresses = relationship("UserListeningProgress", back_populates="exercise", cascade="all, delete")
+    generation_cache = relationship("GeneratedQuestionSet", back_populates="exercise", cascade="all, delete-orphan")
 
 
 # -------------------------------
@@ -60,7 +67,11 @@ class ListeningExercise(Base):
 # -------------------------------
 class UserListeningProgress(Base):
     __tablename__ = "user_listening_progress"
-    __table_args__ = {'extend_existing': True}
+    __table_args__ = (
+        Index("ix_progress_user_exercise_submitted", "user_id", "exercise_id", "submitted_at"),
+        Index("ix_progress_exercise_submitted", "exercise_id", "submitted_at"),
+        {'extend_existing': True},
+    )
 
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     user_id = Column(String(36), ForeignKey("users.id"))
@@ -72,3 +83,72 @@ class UserListeningProgress(Base):
 
     # Relationship
     exercise = relationship("ListeningExercise", back_populates="progresses")
+
+
+# -------------------------------
+# USER PROGRESS SUMMARY TABLE
+# -------------------------------
+class UserProgressSummary(Base):
+    """
+    Running aggregates of graded answers per user / exercise / CEFR level,
+    upserted by services/progress_recorder.py on every flush, so dashboards
+    read a handful of rows instead of scanning user_listening_progress.
+    """
+    __tablename__ = "user_progress_summary"
+    __table_args__ = {'extend_existing': True}
+
+    user_id = Column(String(36), primary_key=True)
+    exercise_id = Column(String(36), primary_key=True)
+    cefr_level = Column(String(8), primary_key=True)  # question level, "NA" when unknown
+    attempts = Column(Integer, nullable=False, default=0)
+    total_score = Column(Integer, nullable=False, default=0)
+    best_score = Column(Integer, nullable=False, default=0)
+    last_submitted_at = Column(DateTime(timezone=True))
+
+
+# -------------------------------
+# AI EVALUATION CACHE TABLE
+# -------------------------------
+class AIEvalCache(Base):
+    """Shared tier of the listening evaluation cache (reused across workers)."""
+    __tablename__ = "ai_eval_cache"
+    __table_args__ = {'extend_existing': True}
+
+    cache_key = Column(String(64), primary_key=True)  # sha256 hex
+    result = Column(JSON)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+# -------------------------------
+# GENERATED QUESTION SET TABLE
+# -------------------------------
+class GeneratedQuestionSet(Base):
+    """Maps a hash of (title, transcript, model, prompt version) to the exercise generated for it."""
+    __tablename__ = "generated_question_sets"
+    __table_args__ = {'extend_existing': True}
+
+    content_hash = Column(String(64), primary_key=True)  # sha256 hex
+    exercise_id = Column(String(36), ForeignKey("listening_exercises.id", ondelete="CASCADE"), index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    # Relationship
+    exercise = relationship("ListeningExercise", back_populates="generation_cache")
+
+
+# -------------------------------
+# BACKGROUND JOB TABLE
+# -------------------------------
+class Job(Base):
+    __tablename__ = "jobs"
+    __table_args__ = {'extend_existing': True}
+
+    id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
+    kind = Column(String(50), index=True)  # e.g. 'generate_questions'
+    status = Column(String(20), default="queued", index=True)  # queued | running | succeeded | failed
+    payload = Column(JSON)
+    result = Column(JSON, nullable=True)
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, default=0)
+    max_attempts = Column(Integer, default=3)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
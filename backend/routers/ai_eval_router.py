@@ -1,6 +1,10 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, UploadFile, Form, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from backend.services.ai_service import  ai_evaluate_speaking
+from backend.services.ai_service import ai_evaluate_speaking_async
+from backend.services.asr_service import transcribe, transcribe_stream
+from backend.services.audio_store import save_upload, AudioTooLargeError
+from backend.services.sse import format_sse
 
 router = APIRouter()
 
@@ -8,5 +12,62 @@ class SpeakingRequest(BaseModel):
     transcript: str
 
 @router.post("/speaking")
-def eval_speaking(req: SpeakingRequest):
-    return ai_evaluate_speaking(req.transcript)
+async def eval_speaking(req: SpeakingRequest):
+    return await ai_evaluate_speaking_async(req.transcript)
+
+
+async def _store_audio(file: UploadFile) -> str:
+    try:
+        stored = await save_upload(file)
+    except AudioTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    return stored.path
+
+
+@router.post("/speaking/audio", summary="Transcribe a recording on the server and evaluate it")
+async def eval_speaking_audio(file: UploadFile, question: str = Form("")):
+    path = await _store_audio(file)
+    try:
+        transcript = await transcribe(path)
+    except Exception as e:
+        raise HTTPException(status_code=422, detail=f"Could not transcribe audio: {str(e)}")
+
+    if not transcript:
+        raise HTTPException(status_code=422, detail="No speech recognized in the recording")
+
+    evaluation = await ai_evaluate_speaking_async(transcript, question)
+    return {"transcript": transcript, "evaluation": evaluation}
+
+
+@router.post("/speaking/audio/stream", summary="Transcribe and evaluate a recording, streaming partial transcripts (SSE)")
+async def eval_speaking_audio_stream(file: UploadFile, question: str = Form("")):
+    """
+    Events: `partial` for each recognized chunk (in audio order), then
+    `evaluation` with the ai_evaluate_speaking result, or `error`.
+    """
+    path = await _store_audio(file)
+
+    async def event_stream():
+        parts = []
+        try:
+            async for index, total, text in transcribe_stream(path):
+                if text:
+                    parts.append(text)
+                yield format_sse("partial", {"chunk": index + 1, "chunks": total, "text": text, "transcript": " ".join(parts)})
+        except Exception as e:
+            yield format_sse("error", {"detail": f"Could not transcribe audio: {str(e)}"})
+            return
+
+        transcript = " ".join(parts)
+        if not transcript:
+            yield format_sse("error", {"detail": "No speech recognized in the recording"})
+            return
+
+        evaluation = await ai_evaluate_speaking_async(transcript, question)
+        yield format_sse("evaluation", {"transcript": transcript, "evaluation": evaluation})
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
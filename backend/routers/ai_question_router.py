@@ -1,55 +1,120 @@
+import asyncio
+import uuid
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from backend.database import get_db
+from backend.database import get_db, SessionLocal
 from backend import models
-import uuid
-from backend.services.ai_service import generate_comprehension_questions
+from backend.services.ai_service import stream_comprehension_questions
+from backend.services.sse import format_sse
+from backend.services.exercise_service import (
+    get_or_generate_exercise, QuestionGenerationError, questions_cache_key, find_cached_exercise, save_exercise, clean_questions
+)
+from backend.services.question_pipeline import generate_questions_map_reduce, question_windows
+from backend.services.transcript_segments import TranscriptSegments
 
 router = APIRouter()
 
+def _find_video(db: Session, youtube_video_id: str):
+    return db.query(models.ListeningSource).filter_by(youtube_video_id=youtube_video_id).first()
+
+
 @router.post("/generate_questions/{youtube_video_id}", summary="Generate questions for a YouTube video")
-def generate_questions(youtube_video_id: str, db: Session = Depends(get_db)):
-    # 🔍 Tìm video theo youtube_video_id
-    video = db.query(models.ListeningSource).filter_by(youtube_video_id=youtube_video_id).first()
+async def generate_questions(youtube_video_id: str, force: bool = False, db: Session = Depends(get_db)):
+    # 🔍 Tìm video theo youtube_video_id (sync session: query chạy trong thread, không chặn event loop)
+    video = await asyncio.to_thread(_find_video, db, youtube_video_id)
     if not video:
         raise HTTPException(status_code=404, detail="Video not found")
 
     if not video.transcript:
         raise HTTPException(status_code=400, detail="Transcript not available")
 
-    # 🧠 Gọi AI sinh câu hỏi
-    question_list = generate_comprehension_questions(video.transcript, video.title)
-
-    questions = []
-    for q in question_list:
-        if isinstance(q, str):
-            import json
-            try:
-                q = json.loads(q)
-            except Exception:
-                continue
-        q["id"] = str(uuid.uuid4())
-        questions.append(q)
-
-    exercise_content = {
-        "title": f"Questions for: {video.title}",
-        "questions": questions
-    }
+    # 🧠 Gọi AI sinh câu hỏi (hoặc lấy lại bộ câu hỏi đã sinh cho transcript này)
+    try:
+        exercise, cached = await get_or_generate_exercise(db, video, force=force)
+    except QuestionGenerationError as e:
+        raise HTTPException(status_code=502, detail=f"AI generation failed: {e.detail}")
 
-    exercise = models.ListeningExercise(
-        source_id=video.id,
-        exercise_type="comprehension",
-        content=exercise_content
-    )
-    db.add(exercise)
-    db.commit()
-    db.refresh(exercise)
+    exercise_content = exercise.content
 
     return {
         "exercise_id": exercise.id,
-        "source_id": video.id,
+        "source_id": exercise.source_id,
         "exercise_type": exercise.exercise_type,
         "title": exercise_content["title"],
-        "questions_generated": len(questions),
+        "questions_generated": len(exercise_content["questions"]),
+        "cached": cached,
         "content_preview": exercise_content
     }
+
+
+@router.post("/generate_questions/{youtube_video_id}/stream", summary="Generate questions and stream them as Server-Sent Events")
+def generate_questions_stream(youtube_video_id: str, force: bool = False, db: Session = Depends(get_db)):
+    """
+    Events: `question` (one per validated question, in generation order),
+    then `done` with the saved exercise id, or `error`.
+    Transcripts that fit one model call are streamed token by token; longer
+    ones go through the map-reduce pipeline (like generate_questions) and their
+    questions are sent once all windows are done, so the exercise cached under
+    the full-transcript key always covers the whole transcript.
+    """
+    video = _find_video(db, youtube_video_id)
+    if not video:
+        raise HTTPException(status_code=404, detail="Video not found")
+
+    if not video.transcript:
+        raise HTTPException(status_code=400, detail="Transcript not available")
+
+    title, transcript = video.title, video.transcript
+    content_hash = questions_cache_key(title, transcript)
+    segments = TranscriptSegments.from_json(video.segments) if video.segments else None
+    single_call = len(question_windows(transcript, segments)) <= 1
+    cached_exercise = None if force else find_cached_exercise(db, video, content_hash)
+    if cached_exercise is not None:
+        cached_id, cached_questions = cached_exercise.id, cached_exercise.content["questions"]
+
+    async def event_stream():
+        if cached_exercise is not None:
+            for q in cached_questions:
+                yield format_sse("question", q)
+            yield format_sse("done", {"exercise_id": cached_id, "questions_generated": len(cached_questions), "cached": True})
+            return
+
+        questions = []
+        try:
+            if single_call:
+                async for q in stream_comprehension_questions(transcript, title):
+                    q["id"] = str(uuid.uuid4())
+                    questions.append(q)
+                    yield format_sse("question", q)
+            else:
+                questions = clean_questions(await generate_questions_map_reduce(transcript, title, segments=segments))
+                for q in questions:
+                    yield format_sse("question", q)
+        except QuestionGenerationError as e:
+            yield format_sse("error", {"detail": f"AI generation failed: {e.detail}"})
+            return
+        except Exception as e:
+            yield format_sse("error", {"detail": f"Generation failed: {type(e).__name__} - {str(e)}"})
+            return
+
+        if not questions:
+            yield format_sse("error", {"detail": "No valid questions extracted"})
+            return
+
+        # Session riêng: session của dependency có thể đã đóng khi stream chạy
+        stream_db = SessionLocal()
+        try:
+            exercise = await asyncio.to_thread(save_exercise, stream_db, video, questions, content_hash)
+            yield format_sse("done", {"exercise_id": exercise.id, "questions_generated": len(questions), "cached": False})
+        except Exception as e:
+            stream_db.rollback()
+            yield format_sse("error", {"detail": f"Could not save exercise: {str(e)}"})
+        finally:
+            stream_db.close()
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
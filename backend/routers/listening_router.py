@@ -1,22 +1,63 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from backend.database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import contains_eager, joinedload, load_only
+from typing import List, Optional
+from backend.database import get_async_db
 from backend import models
-from backend.schemas import ListeningExerciseSchema
+from backend.schemas import ListeningExerciseSchema, ListeningExerciseSummary
 
 router = APIRouter()
 
-@router.get("/exercises", summary="List all listening exercises")
-def list_exercises(db: Session = Depends(get_db)):
-    exercises = db.query(models.ListeningExercise).all()
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+@router.get("/exercises", summary="List listening exercises (cursor-paginated)", response_model=List[ListeningExerciseSummary])
+async def list_exercises(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Last exercise id of the previous page"),
+    source_id: Optional[str] = None,
+    exercise_type: Optional[str] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    One query regardless of page size: the source is joined eagerly and only
+    the listed columns are loaded (no exercise content, no transcript).
+    The next page's cursor is returned in the `X-Next-Cursor` header.
+    """
+    Exercise, Source = models.ListeningExercise, models.ListeningSource
+    query = (
+        select(Exercise)
+        .options(
+            load_only(Exercise.id, Exercise.source_id, Exercise.exercise_type, Exercise.created_at),
+            joinedload(Exercise.source).load_only(Source.id, Source.url, Source.title, Source.youtube_video_id),
+        )
+        .order_by(Exercise.id)
+    )
+    if source_id:
+        query = query.where(Exercise.source_id == source_id)
+    if exercise_type:
+        query = query.where(Exercise.exercise_type == exercise_type)
+    if cursor:
+        query = query.where(Exercise.id > cursor)
+
+    exercises = (await db.execute(query.limit(limit + 1))).scalars().all()
+    if len(exercises) > limit:
+        exercises = exercises[:limit]
+        response.headers["X-Next-Cursor"] = exercises[-1].id
     return exercises
 
 @router.get("/exercises/{exercise_id}", response_model=ListeningExerciseSchema, summary="Get a specific listening exercise")
-def get_exercise(exercise_id: str, db: Session = Depends(get_db)):
-    exercise = db.query(models.ListeningExercise) \
-             .join(models.ListeningSource) \
-             .filter(models.ListeningExercise.source_id == exercise_id) \
-             .first()
+async def get_exercise(exercise_id: str, db: AsyncSession = Depends(get_async_db)):
+    # the source comes from the same join (no lazy load on an AsyncSession)
+    query = select(models.ListeningExercise) \
+             .join(models.ListeningExercise.source) \
+             .options(contains_eager(models.ListeningExercise.source)) \
+             .where(models.ListeningExercise.source_id == exercise_id) \
+             .order_by(models.ListeningExercise.created_at.desc()) \
+             .limit(1)
+    exercise = (await db.execute(query)).scalars().first()
     if not exercise:
         raise HTTPException(status_code=404, detail="Exercise not found")
     return exercise
@@ -0,0 +1,41 @@
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+from backend.database import async_pool_metrics, pool_metrics
+from backend.services import llm_backend, llm_calls
+from backend.services.prompts import prefix_fingerprints
+
+router = APIRouter()
+
+@router.get("/", summary="Token, latency and cost metrics of model calls (JSON)")
+def get_metrics():
+    return {
+        "llm_backend": llm_backend.get_backend().name,
+        "llm": llm_calls.metrics_snapshot(),
+        "prompt_prefixes": prefix_fingerprints(),
+        "db_pool": pool_metrics(),
+        "db_async_pool": async_pool_metrics(),
+    }
+
+
+def _pool_prometheus_text(metrics: dict, prefix: str = "db_pool") -> str:
+    lines = []
+    for key in ("checkouts", "overflow_events", "timeouts"):
+        lines.append(f"{prefix}_{key}_total {metrics[key]}")
+    for key in ("size", "in_use", "idle", "overflow", "peak_in_use"):
+        if key in metrics:
+            lines.append(f"{prefix}_{key} {metrics[key]}")
+    wait = metrics["checkout_wait_ms"]
+    for le, cumulative in wait["buckets"].items():
+        lines.append(f'{prefix}_checkout_wait_ms_bucket{{le="{le}"}} {cumulative}')
+    lines.append(f"{prefix}_checkout_wait_ms_sum {wait['sum']}")
+    lines.append(f"{prefix}_checkout_wait_ms_count {wait['count']}")
+    return "\n".join(lines) + "\n"
+
+
+@router.get("/prometheus", summary="Metrics in Prometheus text format", response_class=PlainTextResponse)
+def get_metrics_prometheus():
+    return (
+        llm_calls.prometheus_text()
+        + _pool_prometheus_text(pool_metrics())
+        + _pool_prometheus_text(async_pool_metrics(), prefix="db_async_pool")
+    )
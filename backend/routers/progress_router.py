@@ -0,0 +1,18 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+from backend.database import get_db
+from backend.services.progress_recorder import progress_recorder, user_progress
+
+router = APIRouter()
+
+@router.get("/stats", summary="Counters of the buffered progress recorder")
+def get_recorder_stats():
+    return progress_recorder.stats()
+
+@router.get("/{user_id}", summary="Listening progress of a user (per exercise and CEFR level)")
+def get_user_progress(user_id: str, db: Session = Depends(get_db)):
+    """
+    Read from the pre-aggregated user_progress_summary table. Results are
+    written in batches, so the last few seconds of answers may not show yet.
+    """
+    return user_progress(db, user_id)
@@ -1,10 +1,16 @@
 from fastapi import APIRouter, UploadFile, Form, HTTPException, Depends
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.exc import SQLAlchemyError
-from backend.database import get_db
-from backend.models import ListeningExercise
-from backend.services.ai_service import ai_evaluate_listening
-import tempfile
+from backend.database import get_async_db
+from backend.schemas import ListeningAnswer, ListeningBatchEvalRequest
+from backend.services.eval_cache import cached_evaluate_listening, cache_stats
+from backend.services import exercise_cache
+from backend.services.exercise_cache import CachedExercise
+from backend.services.local_grader import pre_grade, grader_stats
+from backend.services.progress_recorder import progress_recorder
+from typing import List, Optional
+from backend.services.audio_store import save_upload, AudioTooLargeError
+import asyncio
 import os
 import logging
 import traceback
@@ -14,50 +20,95 @@ logging.basicConfig(level=logging.INFO)
 
 router = APIRouter()
 
+# Max concurrent model calls for one batch submission
+BATCH_EVAL_CONCURRENCY = int(os.getenv("BATCH_EVAL_CONCURRENCY", "8"))
+
+
+async def _load_exercise(db: AsyncSession, exercise_id: str) -> CachedExercise:
+    try:
+        exercise = await exercise_cache.aget_exercise(db, exercise_id)
+    except SQLAlchemyError as db_err:
+        logger.error(f"❌ Database Error: {str(db_err)}")
+        raise HTTPException(status_code=500, detail="Database connection failed")
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    if not exercise:
+        raise HTTPException(status_code=404, detail="Exercise not found")
+    return exercise
+
+
+def _format_listening_result(ai_result: dict, correct_answer: str) -> dict:
+    """Shape an evaluator result into the response format used by the frontend."""
+    final_score = ai_result.get("overall_score", 0)
+
+    general = ai_result.get("general", "incorrect")
+
+    if final_score < 40:
+        general = "incorrect"
+
+    raw_details = ai_result.get("details", {})
+
+    formatted_details = {
+        "fluency": raw_details.get("fluency", {}).get("score", 0),
+        "vocabulary": raw_details.get("vocabulary", {}).get("score", 0),
+        "pronunciation": raw_details.get("grammar", {}).get("score", 0),
+        "grammar": raw_details.get("grammar", {}).get("score", 0)
+    }
+
+    feedback = ai_result.get("feedback", "")
+    suggestion = ai_result.get("suggestion", "")
+
+    if general == "incorrect" and not suggestion:
+        suggestion = f"Key points needed: {correct_answer}"
+
+    return {
+        "general": general,
+        "score": final_score,
+        "details": formatted_details,
+        "feedback": feedback,
+        "suggestion": suggestion
+    }
+
+
+async def _evaluate_answer(question_data: dict, expected_points: List[str], user_answer: str) -> dict:
+    """Local pre-grader first; only ambiguous or open-ended answers reach the model."""
+    local_result = pre_grade(question_data, user_answer)
+    if local_result is not None:
+        return local_result
+    return await cached_evaluate_listening(expected_points, user_answer)
+
 
 @router.post("/evaluate")
-def evaluate_listening(
+async def evaluate_listening(
     question_id: str = Form(...),
     user_answer: str = Form(...),
     exercise_id: str = Form(...),
-    db: Session = Depends(get_db)
+    user_id: Optional[str] = Form(None),
+    submission_id: Optional[str] = Form(None, max_length=36),
+    db: AsyncSession = Depends(get_async_db)
 ):
     """
     Evaluate a student's answer for a specific listening question.
+    With user_id the result is recorded in the user's progress (written in
+    bulk, best-effort: see ProgressRecorder); `progress_id` is the id of the
+    queued row. Pass a client-generated submission_id to make retries
+    record only once (submission ids are scoped to the user).
     """
     try:
-        try:
-            exercise = db.query(ListeningExercise).filter_by(id=exercise_id).first()
-        except SQLAlchemyError as db_err:
-            logger.error(f"❌ Database Error: {str(db_err)}")
-            raise HTTPException(status_code=500, detail="Database connection failed")
-
-        if not exercise:
-            raise HTTPException(status_code=404, detail="Exercise not found")
-
-        content = exercise.content
-        if not content or "questions" not in content:
-            raise HTTPException(status_code=400, detail="Exercise content invalid")
-
-        try:
-            question_data = next((q for q in content["questions"] if str(q.get("id")) == str(question_id)), None)
-        except Exception as e:
-            logger.error(f"❌ Error filtering questions: {e}")
-            raise HTTPException(status_code=500, detail="Error processing questions list")
+        exercise = await _load_exercise(db, exercise_id)
 
+        question_data = exercise.questions_by_id.get(str(question_id))
         if not question_data:
             raise HTTPException(status_code=404, detail="Question not found")
 
-        expected_points = question_data.get("expected_answer_points", [])
-        if not isinstance(expected_points, list):
-             expected_points = [str(expected_points)]
-             
-        correct_answer = ", ".join(expected_points)
+        expected_points = exercise.expected_points[str(question_id)]
+        correct_answer = exercise.correct_answers[str(question_id)]
         
-        logger.info(f"🤖 Calling AI for Question {question_id} | User Answer: {user_answer}")
+        logger.info(f"🤖 Evaluating Question {question_id} | User Answer: {user_answer}")
         
         try:
-            ai_result = ai_evaluate_listening(correct_answer, user_answer)
+            ai_result = await _evaluate_answer(question_data, expected_points, user_answer)
         except Exception as ai_crash:
             logger.error(f"❌ AI Service CRASHED: {traceback.format_exc()}")
             raise HTTPException(status_code=500, detail=f"AI Service Internal Error: {str(ai_crash)}")
@@ -66,35 +117,12 @@ def evaluate_listening(
             logger.error(f"❌ AI returned error: {ai_result['error']}")
             raise HTTPException(status_code=500, detail=f"AI evaluation failed: {ai_result['error']}")
 
-        final_score = ai_result.get("overall_score", 0)
-
-        general = ai_result.get("general", "incorrect")
-        
-        if final_score < 40:
-            general = "incorrect"
-
-        raw_details = ai_result.get("details", {})
-        
-        formatted_details = {
-            "fluency": raw_details.get("fluency", {}).get("score", 0),
-            "vocabulary": raw_details.get("vocabulary", {}).get("score", 0),
-            "pronunciation": raw_details.get("grammar", {}).get("score", 0), 
-            "grammar": raw_details.get("grammar", {}).get("score", 0)
-        }
-
-        feedback = ai_result.get("feedback", "")
-        suggestion = ai_result.get("suggestion", "")
-        
-        if general == "incorrect" and not suggestion:
-            suggestion = f"Key points needed: {correct_answer}"
-
-        return {
-            "general": general,
-            "score": final_score,
-            "details": formatted_details,
-            "feedback": feedback,
-            "suggestion": suggestion
-        }
+        result = _format_listening_result(ai_result, correct_answer)
+        if user_id:
+            result["progress_id"] = progress_recorder.record(
+                user_id, exercise_id, [{"question_id": question_id, "level": question_data.get("level"), **result}], submission_id
+            )
+        return result
 
     except HTTPException as http_ex:
         raise http_ex
@@ -104,16 +132,92 @@ def evaluate_listening(
         raise HTTPException(status_code=500, detail=f"Internal Server Error: {str(e)}")
 
 
+@router.post("/evaluate_batch", summary="Evaluate all answers of one exercise submission")
+async def evaluate_listening_batch(req: ListeningBatchEvalRequest, db: AsyncSession = Depends(get_async_db)):
+    """
+    Grade every (question_id, answer) pair of one exercise in a single request
+    (at most one answer per question). The exercise is loaded once, answers are evaluated concurrently (capped by
+    BATCH_EVAL_CONCURRENCY). With user_id the submission is queued on the
+    progress recorder, same rules as /evaluate (anonymous submissions are
+    not recorded).
+    """
+    if not req.answers:
+        raise HTTPException(status_code=400, detail="No answers submitted")
+
+    # one answer per question: repeats would fan out extra model calls and
+    # inflate score/correct (and the progress summaries built from them)
+    question_ids = [str(item.question_id) for item in req.answers]
+    if len(set(question_ids)) != len(question_ids):
+        raise HTTPException(status_code=400, detail="Each question_id may be answered only once per submission")
+
+    exercise = await _load_exercise(db, req.exercise_id)
+    if len(req.answers) > len(exercise.questions_by_id):
+        raise HTTPException(
+            status_code=400,
+            detail=f"Too many answers: exercise has {len(exercise.questions_by_id)} questions",
+        )
+
+    semaphore = asyncio.Semaphore(BATCH_EVAL_CONCURRENCY)
+
+    async def grade(item: ListeningAnswer) -> dict:
+        question_data = exercise.questions_by_id.get(str(item.question_id))
+        if not question_data:
+            return {"question_id": item.question_id, "error": "Question not found"}
+
+        async with semaphore:
+            try:
+                ai_result = await _evaluate_answer(question_data, exercise.expected_points[str(item.question_id)], item.user_answer)
+            except Exception as e:
+                logger.error(f"❌ AI Service CRASHED: {traceback.format_exc()}")
+                ai_result = {"error": str(e)}
+
+        if "error" in ai_result:
+            return {"question_id": item.question_id, "error": f"AI evaluation failed: {ai_result['error']}"}
+        return {
+            "question_id": item.question_id,
+            "level": question_data.get("level"),
+            **_format_listening_result(ai_result, exercise.correct_answers[str(item.question_id)]),
+        }
+
+    results = await asyncio.gather(*(grade(item) for item in req.answers))
+
+    graded = [r for r in results if "error" not in r]
+    score = round(sum(r["score"] for r in graded) / len(graded)) if graded else 0
+    summary = {
+        "exercise_id": req.exercise_id,
+        "score": score,
+        "total": len(results),
+        "graded": len(graded),
+        "correct": sum(1 for r in graded if r["general"] == "correct"),
+        "results": results,
+    }
+
+    if req.user_id:
+        summary["progress_id"] = progress_recorder.record(req.user_id, req.exercise_id, results, req.submission_id)
+    return summary
+
+
+@router.get("/evaluate/cache-stats", summary="Hit/miss counters of the listening evaluation cache")
+def evaluate_cache_stats():
+    return {**cache_stats(), "local_grader": grader_stats(), "exercises": exercise_cache.cache_stats()}
+
+
 @router.post("/upload-audio")
 async def upload_audio(file: UploadFile):
     """
     Upload user's speaking audio (e.g., for ASR or storage)
     """
     try:
-        temp_dir = tempfile.mkdtemp()
-        file_path = os.path.join(temp_dir, file.filename)
-        with open(file_path, "wb") as f:
-            f.write(await file.read())
-        return {"filename": file.filename, "path": file_path, "message": "Audio uploaded successfully"}
+        stored = await save_upload(file)
+        return {
+            "filename": file.filename,
+            "path": stored.path,
+            "sha256": stored.sha256,
+            "size": stored.size,
+            "deduplicated": stored.deduplicated,
+            "message": "Audio uploaded successfully"
+        }
+    except AudioTooLargeError as e:
+        raise HTTPException(status_code=413, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Audio upload failed: {str(e)}")
@@ -1,96 +1,196 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-import traceback
-from typing import List
-from backend.database import get_db
-from backend import models
-import uuid
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import JSONResponse
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import undefer
+import asyncio
+from typing import List, Optional
+import hashlib
 import json
-from backend.services.ai_service import generate_comprehension_questions
-from backend.schemas import VideoResponse, VideoCreate
+from backend.database import get_async_db
+from backend import models
+from backend.services.job_queue import job_queue
+from backend.services import exercise_service  # noqa: F401 (registers the generate_questions job handler)
+from backend.services.transcript_service import fetch_many, fetch_snippets, snippets_to_text, TranscriptError
+from backend.services.transcript_segments import TranscriptSegments, segments_cache
+from backend.schemas import VideoSummary, VideoCreate, VideoCreateResponse, SegmentsBulkImportRequest
 
 router = APIRouter()
 
-@router.get("/", summary="List all videos", response_model=List[VideoResponse])
-def list_videos(db: Session = Depends(get_db)):
-    videos = db.query(models.ListeningSource).all()
-    return videos
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 500
+
+def _etag(payload) -> str:
+    digest = hashlib.sha1(json.dumps(payload, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+    return f'W/"{digest}"'
+
+
+@router.get("/", summary="List videos (cursor-paginated, without transcripts)", response_model=List[VideoSummary])
+async def list_videos(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None, description="Last video id of the previous page"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Keyset pagination on id. The next page's cursor is returned in the
+    `X-Next-Cursor` header (and a `Link: rel="next"` header) and the number of
+    videos in `X-Total-Count`; the body stays a plain list. Responses carry an
+    ETag so unchanged pages return 304.
+    """
+    Source = models.ListeningSource
+    # Chỉ lấy các cột cần hiển thị, không đụng tới cột transcript (LONGTEXT)
+    query = select(Source.id, Source.url, Source.title, Source.youtube_video_id).order_by(Source.id)
+    if cursor:
+        query = query.where(Source.id > cursor)
+    rows = (await db.execute(query.limit(limit + 1))).all()
+    total = (await db.execute(select(func.count()).select_from(Source))).scalar_one()
+
+    has_more = len(rows) > limit
+    videos = [row._asdict() for row in rows[:limit]]
+    next_cursor = videos[-1]["id"] if has_more else None
+
+    headers = {"ETag": _etag([videos, next_cursor, total]), "Cache-Control": "no-cache", "X-Total-Count": str(total)}
+    if next_cursor:
+        headers["X-Next-Cursor"] = next_cursor
+        next_url = request.url.include_query_params(cursor=next_cursor, limit=limit)
+        headers["Link"] = f'<{next_url}>; rel="next"'
+
+    if_none_match = request.headers.get("if-none-match", "")
+    if headers["ETag"] in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
+
+    return JSONResponse(content=videos, headers=headers)
 
 @router.get("/{video_id}", summary="Get video by ID")
-def get_video(video_id: str, db: Session = Depends(get_db)):
-    video = db.query(models.ListeningSource).filter_by(id=video_id).first()
+async def get_video(video_id: str, db: AsyncSession = Depends(get_async_db)):
+    video = await db.get(models.ListeningSource, video_id)
     if not video:
         raise HTTPException(status_code=404, detail="Video not found")
     return video
 
-@router.post("/", summary="Add new video and auto-generate questions", response_model=VideoResponse)
-def add_video(video_create: VideoCreate, db: Session = Depends(get_db)):
+@router.post("/", summary="Add new video and queue question generation", response_model=VideoCreateResponse, status_code=202)
+async def add_video(video_create: VideoCreate, db: AsyncSession = Depends(get_async_db)):
     # 1. Lưu Video trước
-    video_data = video_create.model_dump()
+    video_data = video_create.model_dump(mode="json")
     video = models.ListeningSource(**video_data)
-    
+
     db.add(video)
-    db.commit()
-    db.refresh(video)
-    
+    await db.commit()
+    await db.refresh(video)
+
     print(f"✅ Video created: {video.id}")
 
     if not video.transcript:
         print(f"⚠️ Video {video.id} has no transcript. Skipping AI generation.")
-        return video
+        return VideoCreateResponse.model_validate(video, from_attributes=True)
+
+    # 2. Sinh câu hỏi chạy nền, client theo dõi qua GET /api/jobs/{job_id}
+    job = await job_queue.aenqueue(db, "generate_questions", {"video_id": video.id})
+    print(f"🤖 Queued question generation job {job.id} for video {video.id}")
+
+    response = VideoCreateResponse.model_validate(video, from_attributes=True)
+    response.job_id = job.id
+    return response
+
+async def _load_segments(db: AsyncSession, video_id: str) -> TranscriptSegments:
+    segments = segments_cache.get(video_id)
+    if segments is not None:
+        return segments
+
+    video = await db.get(models.ListeningSource, video_id, options=[undefer(models.ListeningSource.segments)])
+    if not video:
+        raise HTTPException(status_code=404, detail="Video not found")
+    if not video.segments:
+        raise HTTPException(status_code=404, detail="No timed transcript for this video, import it first")
+
+    segments = TranscriptSegments.from_json(video.segments)
+    segments_cache.set(video_id, segments)
+    return segments
+
+
+def _apply_snippets(video: models.ListeningSource, snippets) -> TranscriptSegments:
+    segments = TranscriptSegments.from_snippets(snippets)
+    video.segments = segments.to_json()
+    if not video.transcript:
+        video.transcript = snippets_to_text(snippets)
+    return segments
+
+
+@router.post("/{video_id}/segments/import", summary="Import the timed YouTube transcript of a video")
+async def import_segments(video_id: str, lang: str = "en", db: AsyncSession = Depends(get_async_db)):
+    video = await db.get(models.ListeningSource, video_id)
+    if not video:
+        raise HTTPException(status_code=404, detail="Video not found")
+    if not video.youtube_video_id:
+        raise HTTPException(status_code=400, detail="Video has no youtube_video_id")
 
     try:
-        print(f"🤖 Generating questions for video {video.id}...")
-        ai_response = generate_comprehension_questions(video.transcript, video.title)
-
-        if isinstance(ai_response, dict) and "error" in ai_response:
-            print(f"❌ AI Service Error: {ai_response['error']}")
-            return video
-
-        if not isinstance(ai_response, list):
-            print(f"❌ Invalid AI response format (expected list, got {type(ai_response)})")
-            return video
-
-        valid_questions = []
-        for q in ai_response:
-            if isinstance(q, dict):
-                q["id"] = str(uuid.uuid4()) # Gán ID duy nhất cho từng câu hỏi
-                valid_questions.append(q)
-            else:
-                print(f"⚠️ Skipping invalid question item: {q}")
-
-        if not valid_questions:
-            print(f"⚠️ No valid questions extracted for video {video.id}.")
-            return video
-
-        exercise_content = {
-            "title": f"Questions for: {video.title}",
-            "questions": valid_questions
-        }
-
-        new_exercise = models.ListeningExercise(
-            source_id=video.id, 
-            exercise_type="comprehension",
-            content=exercise_content
-        )
-        
-        db.add(new_exercise)
-        db.commit()
-        db.refresh(new_exercise)
-        print(f"✅ Successfully created Exercise {new_exercise.id} with {len(valid_questions)} questions.")
-        
-    except Exception as e:
-        print(f"🔥 CRITICAL ERROR generating exercise: {str(e)}")
-        traceback.print_exc() 
-        db.rollback()
+        snippets = await asyncio.to_thread(fetch_snippets, video.youtube_video_id, lang)
+    except TranscriptError as e:
+        raise HTTPException(status_code=404 if e.permanent else 502, detail=str(e))
+
+    segments = _apply_snippets(video, snippets)
+    await db.commit()
+    segments_cache.set(video_id, segments)
+
+    return {"video_id": video_id, "segments": len(segments), "duration": segments.duration}
+
+
+@router.post("/segments/import", summary="Import the timed YouTube transcripts of many videos (playlist import)")
+async def import_segments_bulk(req: SegmentsBulkImportRequest, db: AsyncSession = Depends(get_async_db)):
+    """
+    Transcripts are fetched concurrently (bounded by TRANSCRIPT_FETCH_WORKERS)
+    and all videos are updated in one commit. A video that fails does not fail
+    the others: its entry carries an `error` instead.
+    """
+    rows = (await db.execute(select(models.ListeningSource).where(models.ListeningSource.id.in_(req.video_ids)))).scalars().all()
+    videos = {video.id: video for video in rows}
+    youtube_ids = [video.youtube_video_id for video in videos.values() if video.youtube_video_id]
+    fetched = await asyncio.to_thread(fetch_many, youtube_ids, req.lang)
+
+    results, imported = [], {}
+    for video_id in dict.fromkeys(req.video_ids):
+        video = videos.get(video_id)
+        if video is None:
+            results.append({"video_id": video_id, "error": "Video not found"})
+            continue
+        snippets = fetched.get(video.youtube_video_id) if video.youtube_video_id else None
+        if snippets is None:
+            results.append({"video_id": video_id, "error": "Video has no youtube_video_id"})
+        elif isinstance(snippets, TranscriptError):
+            results.append({"video_id": video_id, "error": str(snippets)})
+        else:
+            imported[video_id] = segments = _apply_snippets(video, snippets)
+            results.append({"video_id": video_id, "segments": len(segments), "duration": segments.duration})
+
+    await db.commit()
+    for video_id, segments in imported.items():
+        segments_cache.set(video_id, segments)
+    return {"imported": len(imported), "results": results}
+
+
+@router.get("/{video_id}/segments/at", summary="What is being said at time t (seconds)")
+async def segment_at(video_id: str, t: float = Query(..., ge=0), db: AsyncSession = Depends(get_async_db)):
+    segment = (await _load_segments(db, video_id)).at(t)
+    if segment is None:
+        raise HTTPException(status_code=404, detail="Nothing is said at this time")
+    return segment
+
+
+@router.get("/{video_id}/segments", summary="Timed transcript segments in a time window")
+async def list_segments(video_id: str, start: float = Query(0, ge=0), end: Optional[float] = Query(None, gt=0), db: AsyncSession = Depends(get_async_db)):
+    segments = await _load_segments(db, video_id)
+    return segments.between(start, end if end is not None else segments.duration + 1)
 
-    return video
 
 @router.delete("/{video_id}", summary="Delete a video")
-def delete_video(video_id: str, db: Session = Depends(get_db)):
-    video = db.query(models.ListeningSource).filter_by(id=video_id).first()
+async def delete_video(video_id: str, db: AsyncSession = Depends(get_async_db)):
+    video = await db.get(models.ListeningSource, video_id)
     if not video:
         raise HTTPException(status_code=404, detail="Not found")
-    db.delete(video)
-    db.commit()
+    # cascades load and delete the exercises (exercise_cache evicts them on commit)
+    await db.delete(video)
+    await db.commit()
+    segments_cache.pop(video_id)
     return {"message": "Deleted successfully"}
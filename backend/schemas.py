@@ -1,4 +1,4 @@
-from pydantic import BaseModel, HttpUrl, Field, AliasChoices
+from pydantic import BaseModel, HttpUrl, Field
 from typing import List, Optional
 from datetime import datetime
 import uuid
@@ -39,9 +39,24 @@ class VideoResponse(BaseModel):
     class Config:
         orm_mode = True
 
+class VideoSummary(BaseModel):
+    """Listing item: everything except the (large) transcript."""
+    id: str
+    url: str
+    title: str
+    youtube_video_id: str
+
+class VideoCreateResponse(VideoResponse):
+    job_id: Optional[str] = None  # question generation job, poll /api/jobs/{job_id}
+
 class VideoListResponse(BaseModel):
     videos: List[VideoResponse]
 
+class SegmentsBulkImportRequest(BaseModel):
+    """Import the timed transcripts of many videos at once (e.g. a playlist)."""
+    video_ids: List[str] = Field(..., min_length=1, max_length=200)
+    lang: str = "en"
+
 # -----------------------------
 # Listening Schema
 # -----------------------------
@@ -56,6 +71,18 @@ class ListeningExerciseSchema(BaseModel):
         orm_mode = True
 
 
+class ListeningExerciseSummary(BaseModel):
+    """Listing item: exercise metadata + source info, without content/transcript."""
+    id: str
+    source_id: Optional[str] = None
+    exercise_type: str
+    created_at: Optional[datetime] = None
+    source: Optional[VideoSummary] = None
+
+    class Config:
+        from_attributes = True
+
+
 # -----------------------------
 # Speaking Schema
 # -----------------------------
@@ -126,12 +153,43 @@ class AIEvalRequest(BaseModel):
     mode: str  # "listening" | "speaking"
 
 
+class ListeningAnswer(BaseModel):
+    question_id: str
+    user_answer: str
+
+
+class ListeningBatchEvalRequest(BaseModel):
+    exercise_id: str
+    user_id: Optional[str] = None
+    # client-generated id of this submission: a retried request is recorded once
+    submission_id: Optional[str] = Field(None, max_length=36)
+    answers: List[ListeningAnswer] = Field(..., max_length=100)  # hard cap; the router also caps at the exercise size
+
+
 class AIEvalResponse(BaseModel):
     score: float
     feedback: str
     corrections: Optional[List[str]] = None
 
 
+# -----------------------------
+# Background Job Schema
+# -----------------------------
+class JobResponse(BaseModel):
+    id: str
+    kind: str
+    status: str  # queued | running | succeeded | failed
+    attempts: int
+    max_attempts: int
+    result: Optional[dict] = None
+    error: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
 # -----------------------------
 # Generic Message (use for DELETE/UPDATE)
 # -----------------------------
@@ -179,4 +237,84 @@ class ComprehensionExercise(BaseModel):
     )
 
     class Config:
-        extra = 'ignore'
\ No newline at end of file
+        extra = 'ignore'
+
+# -----------------
+# Speaking evaluation (AI output)
+# Every field has a default so partial model output still validates with the
+# same fallbacks the evaluator used to fill in by hand.
+# -----------------
+class GrammarError(BaseModel):
+    type: str = ""
+    example: str = ""
+    correction: str = ""
+
+    class Config:
+        extra = 'ignore'
+
+class GrammarEvaluation(BaseModel):
+    score: int = 0
+    errors: List[GrammarError] = []
+    strengths: List[str] = []
+    analysis: str = ""
+
+    class Config:
+        extra = 'ignore'
+
+class VocabularyError(BaseModel):
+    word: str = ""
+    context: str = ""
+    suggestion: str = ""
+
+    class Config:
+        extra = 'ignore'
+
+class VocabularyEvaluation(BaseModel):
+    score: int = 0
+    range_score: int = 0
+    precision_score: int = 0
+    errors: List[VocabularyError] = []
+    strengths: List[str] = []
+    advanced_words_used: List[str] = []
+    analysis: str = ""
+
+    class Config:
+        extra = 'ignore'
+
+class FluencyEvaluation(BaseModel):
+    score: int = 0
+    coherence_score: int = 0
+    cohesion_score: int = 0
+    issues: List[str] = []
+    strengths: List[str] = []
+    linking_words_used: List[str] = []
+    analysis: str = ""
+
+    class Config:
+        extra = 'ignore'
+
+class ContentEvaluation(BaseModel):
+    score: int = 0
+    relevance: str = ""
+    depth: str = ""
+    comments: str = ""
+
+    class Config:
+        extra = 'ignore'
+
+class SpeakingEvaluation(BaseModel):
+    """Kết quả chấm bài nói chi tiết (ai_evaluate_speaking)."""
+    overall_score: int = 0
+    cefr_level: str = Field("A1", description="A1 | A2 | B1 | B2 | C1 | C2")
+    grammar: GrammarEvaluation = GrammarEvaluation()
+    vocabulary: VocabularyEvaluation = VocabularyEvaluation()
+    fluency: FluencyEvaluation = FluencyEvaluation()
+    pronunciation_hints: List[str] = []
+    content: ContentEvaluation = ContentEvaluation()
+    overall_feedback: str = ""
+    strengths_summary: List[str] = []
+    areas_for_improvement: List[str] = []
+    actionable_suggestions: List[str] = []
+
+    class Config:
+        extra = 'ignore'
@@ -0,0 +1,99 @@
+"""
+One-shot database setup: schema migrations + sample ListeningSource rows.
+
+Run once per deploy (not in every worker):
+    python -m backend.seed                  # migrations, then sample data
+    python -m backend.seed --skip-migrations
+
+Safe to re-run: only samples whose youtube_video_id is missing are inserted.
+"""
+import argparse
+import logging
+
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+
+from backend import models
+from backend.database import SessionLocal
+from backend.migrations import run_migrations
+
+SAMPLE_SOURCES = [
+    {
+        "url": "https://www.youtube.com/watch?v=dQw4w9WgXcQ",  # full YouTube URL
+        "title": "English Listening - Daily Conversation",
+        "youtube_video_id": "dQw4w9WgXcQ",
+        "transcript": """
+                    A: Hi, how are you today?
+                    B: I'm good, thanks! How about you?
+                    A: Not bad. What are your plans for the weekend?
+                    B: I'm going to visit my parents.
+                    """,
+    },
+    {
+        "url": "https://www.youtube.com/watch?v=_DmYA7OzyRE",
+        "title": "Speaking Practice - Travel Roleplay",
+        "youtube_video_id": "_DmYA7OzyRE",
+        "transcript": """
+                    A: Excuse me, where is the nearest train station?
+                    B: It's just two blocks away on the left.
+                    A: Thank you very much!
+                    B: You're welcome!
+                    """,
+    },
+    {
+        "url": "https://www.youtube.com/watch?v=M7lc1UVf-VE",
+        "title": "Learn Loops in Computer Science",
+        "youtube_video_id": "M7lc1UVf-VE",
+        "transcript": """
+                    for i in range(5):
+                        print("Hello, world!")
+                    # This loop prints the message five times.
+                    """,
+    },
+]
+
+
+def init_db_data(session_factory=SessionLocal) -> int:
+    """Insert the sample ListeningSource rows that are not in the database yet. Returns how many were added."""
+    wanted = {sample["youtube_video_id"] for sample in SAMPLE_SOURCES}
+    db = session_factory()
+    try:
+        existing = set(db.execute(
+            select(models.ListeningSource.youtube_video_id).where(models.ListeningSource.youtube_video_id.in_(wanted))
+        ).scalars())
+        missing = [models.ListeningSource(**sample) for sample in SAMPLE_SOURCES if sample["youtube_video_id"] not in existing]
+        if not missing:
+            print("ℹDữ liệu mẫu ListeningSource đã tồn tại, bỏ qua thêm mới.")
+            return 0
+
+        db.add_all(missing)
+        db.commit()
+        print("Dữ liệu mẫu ListeningSource đã được thêm vào database.")
+        return len(missing)
+    except IntegrityError:
+        # youtube_video_id is unique: a concurrent seed inserted them first
+        db.rollback()
+        print("ℹDữ liệu mẫu ListeningSource vừa được thêm bởi tiến trình khác, bỏ qua.")
+        return 0
+    except Exception as e:
+        db.rollback()
+        print(f"Lỗi khi khởi tạo dữ liệu mẫu: {e}")
+        raise
+    finally:
+        db.close()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--skip-migrations", action="store_true", help="only insert the sample data")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if not args.skip_migrations:
+        run_migrations()
+        print("✅ Database schema is up to date.")
+    init_db_data()
+
+
+if __name__ == "__main__":
+    main()
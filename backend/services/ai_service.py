@@ -1,35 +1,110 @@
 import os
 import json
-from typing import Dict, Any, List
-from dotenv import load_dotenv
-from openai import OpenAI, BadRequestError
-from pydantic import ValidationError
-from backend.schemas import ComprehensionExercise
+import re
+from typing import Dict, Any, List, AsyncIterator, Optional
+from pydantic import TypeAdapter, ValidationError
+from backend.schemas import ComprehensionExercise, ComprehensionQuestion, SpeakingEvaluation
+from backend.services import llm_backend, llm_calls
+from backend.services.structured_output import json_schema_format
+from backend.services.prompts import (
+    LISTENING_PROMPT_VERSION, LISTENING_SYSTEM_PROMPT, listening_user_prompt,
+    SPEAKING_PROMPT_VERSION, SPEAKING_SYSTEM_PROMPT, speaking_user_prompt,
+)
 
 # --------------------------
-# 🔹 Load environment & init client
+# 🔹 Config
 # --------------------------
-load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# .env is loaded once by backend/config.py.
+# Clients come from services/llm_backend.py (LLM_BACKEND=openai|mock) at call time
 MODEL = os.getenv("OPENAI_MODEL", "gpt-4o-mini")
 
+# Bump these whenever a prompt template changes so cached results keyed on
+# the prompt are not reused across incompatible versions (evaluator prompt
+# versions live in services/prompts.py).
+QUESTIONS_PROMPT_VERSION = "questions-v2"
+
+# --------------------------
+# 🔹 Structured outputs
+# --------------------------
+# json_schema response_format: the model is constrained to the Pydantic schema,
+# so one validate_json pass replaces json.loads + manual defaulting.
+# Set STRUCTURED_OUTPUTS=0 for models without json_schema support.
+STRUCTURED_OUTPUTS = os.getenv("STRUCTURED_OUTPUTS", "1") != "0"
+# Extra round-trips allowed when the output still fails validation
+STRUCTURED_OUTPUT_MAX_REPAIRS = int(os.getenv("STRUCTURED_OUTPUT_MAX_REPAIRS", "1"))
+# Validation errors are cut to this length so a repair round stays within
+# llm_calls.REPAIR_PROMPT_ALLOWANCE
+REPAIR_ERROR_CHARS = 2000
+
+_exercise_adapter = TypeAdapter(ComprehensionExercise)
+_speaking_adapter = TypeAdapter(SpeakingEvaluation)
+QUESTIONS_RESPONSE_FORMAT = json_schema_format(ComprehensionExercise)
+SPEAKING_RESPONSE_FORMAT = json_schema_format(SpeakingEvaluation)
+
+
+class StructuredOutputError(ValueError):
+    """Model output still invalid after all repair attempts."""
+
+    def __init__(self, raw_output: str, error: Exception):
+        super().__init__(str(error))
+        self.raw_output = raw_output
+
+
+def _repair_messages(request: Dict[str, Any], text: str, error: Exception) -> None:
+    """Append the rejected output and the validation error so the model can fix it."""
+    request["messages"] = request["messages"] + [
+        {"role": "assistant", "content": text},
+        {"role": "user", "content": f"Your previous output did not match the required JSON schema:\n{str(error)[:REPAIR_ERROR_CHARS]}\nReturn ONLY the corrected JSON."},
+    ]
+
+
+def _chat_parsed(name: str, request: Dict[str, Any], parse):
+    """llm_calls.chat + parse, with up to STRUCTURED_OUTPUT_MAX_REPAIRS repair round-trips.
+    Raises StructuredOutputError once the repairs are used up."""
+    for attempt in range(STRUCTURED_OUTPUT_MAX_REPAIRS + 1):
+        resp = llm_calls.chat(name, llm_backend.get_backend().client, repair=attempt > 0, **request)
+        text = resp.choices[0].message.content.strip()
+        try:
+            return parse(text)
+        except (json.JSONDecodeError, ValidationError) as e:
+            if attempt == STRUCTURED_OUTPUT_MAX_REPAIRS:
+                raise StructuredOutputError(text, e)
+            print(f"⚠️ {name}: output failed validation, repairing ({attempt + 1}/{STRUCTURED_OUTPUT_MAX_REPAIRS})")
+            _repair_messages(request, text, e)
+
+
+async def _achat_parsed(name: str, request: Dict[str, Any], parse):
+    """Async variant of _chat_parsed."""
+    for attempt in range(STRUCTURED_OUTPUT_MAX_REPAIRS + 1):
+        resp = await llm_calls.achat(name, llm_backend.get_backend().async_client, repair=attempt > 0, **request)
+        text = resp.choices[0].message.content.strip()
+        try:
+            return parse(text)
+        except (json.JSONDecodeError, ValidationError) as e:
+            if attempt == STRUCTURED_OUTPUT_MAX_REPAIRS:
+                raise StructuredOutputError(text, e)
+            print(f"⚠️ {name}: output failed validation, repairing ({attempt + 1}/{STRUCTURED_OUTPUT_MAX_REPAIRS})")
+            _repair_messages(request, text, e)
+
 # --------------------------
 # 🔹 Generate exercises from transcript
 # --------------------------
-def generate_comprehension_questions(transcript: str, title: str) -> List[Dict[str, Any]]:
-    """
-    Sinh 10-15 câu hỏi comprehension dựa vào transcript, từ cấp độ A1 -> C1
-    Trả về list các câu hỏi hợp lệ (dict)
-    """
-    prompt = f"""
+DEFAULT_QUESTION_COUNT = "15-20"
+# Only this many transcript tokens fit in a single generation prompt;
+# longer transcripts go through services/question_pipeline.py, anything that
+# still gets here is trimmed to the generate_questions budget, not rejected
+MAX_TRANSCRIPT_TOKENS = int(os.getenv("MAX_TRANSCRIPT_TOKENS", "3750"))
+
+def _build_questions_prompt(transcript: str, title: str, question_count: str = DEFAULT_QUESTION_COUNT) -> str:
+    return f"""
     You are an expert ESL (English as a Second Language) curriculum designer.
     Your goal is to create questions that not only test comprehension but also
     promote CRITICAL THINKING and SPEAKING PRACTICE.
     
-    Generate 15-20 questions based on the transcript below.
+    Generate {question_count} questions based on the transcript below.
     
     RULES:
-    1.  **Question Count:** Strictly generate 15-20 questions.
+    1.  **Question Count:** Strictly generate {question_count} questions.
     2.  **Difficulty Range:** Must cover all levels from A1 (simple facts) to C1 (complex analysis).
     3.  **Question Types (THIS IS CRITICAL):**
         * **Avoid simple, low-effort questions** (e.g., "Who is Peppa?") unless they are for A1 level.
@@ -38,7 +113,7 @@ def generate_comprehension_questions(transcript: str, title: str) -> List[Dict[s
         * For B2-C1 levels, questions should ask the student to *infer*, *evaluate*, or *relate the topic to their own personal experience*. These questions are designed to be "speaking prompts".
     
     Title: "{title}"
-    Transcript: {transcript[:15000]}
+    Transcript: {transcript}
     
     Output strictly valid JSON.
     * For fact-based questions, 'answer' should list key points.
@@ -75,108 +150,223 @@ def generate_comprehension_questions(transcript: str, title: str) -> List[Dict[s
         ]
     }}
     """
-    
+
+
+def _questions_messages(transcript: str, title: str, question_count: str) -> List[Dict[str, Any]]:
+    return [
+        {"role": "system", "content": "You are an AI generating comprehension questions. Output ONLY JSON."},
+        {"role": "user", "content": _build_questions_prompt(transcript, title, question_count)}
+    ]
+
+
+def _fit_transcript(transcript: str, title: str, question_count: str) -> str:
+    """Trim the transcript so the whole prompt stays within the generate_questions budget."""
+    overhead = llm_calls.count_message_tokens(_questions_messages("", title, question_count), MODEL)
+    room = min(MAX_TRANSCRIPT_TOKENS, llm_calls.budget_for("generate_questions")[0] - overhead)
+    return llm_calls.truncate_tokens(transcript, max(room, 0), MODEL)
+
+
+def _questions_request(transcript: str, title: str, question_count: str = DEFAULT_QUESTION_COUNT) -> Dict[str, Any]:
+    request = dict(
+        model=MODEL,
+        messages=_questions_messages(_fit_transcript(transcript, title, question_count), title, question_count),
+        temperature=0.4,
+        max_tokens=2000
+    )
+    if STRUCTURED_OUTPUTS:
+        request["response_format"] = QUESTIONS_RESPONSE_FORMAT
+    return request
+
+
+def _parse_questions(text: str) -> List[Dict[str, Any]]:
     try:
-        resp = client.chat.completions.create(
-            model=MODEL,
-            messages=[
-                {"role": "system", "content": "You are an AI generating comprehension questions. Output ONLY JSON."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.4,
-            max_tokens=2000
-        )
-        text = resp.choices[0].message.content.strip()
-        
-        # parse JSON
+        # parse + validate trong một lượt
+        validated_exercise = _exercise_adapter.validate_json(text)
+    except ValidationError:
+        # free-form output: unwrap nếu có key 'ComprehensionExercise'
         raw_data = json.loads(text)
-        # unwrap nếu có key 'ComprehensionExercise', còn không dùng luôn
-        data_to_validate = raw_data.get("ComprehensionExercise", raw_data)
-        
-        # validate với Pydantic
-        validated_exercise = ComprehensionExercise.model_validate(data_to_validate)
-        
-        # trả về danh sách question dict
-        return [q.model_dump() for q in validated_exercise.questions]
-        
-    except BadRequestError as e:
+        if not isinstance(raw_data, dict) or "ComprehensionExercise" not in raw_data:
+            raise
+        validated_exercise = _exercise_adapter.validate_python(raw_data["ComprehensionExercise"])
+
+    # trả về danh sách question dict
+    return [q.model_dump() for q in validated_exercise.questions]
+
+
+def _generation_error(e: Exception) -> Dict[str, Any]:
+    # openai is imported lazily (see llm_backend.openai_module)
+    if isinstance(e, llm_backend.openai_module().BadRequestError):
         return {"error": f"OpenAI Request Error: {e.status_code} - {e.response.text}"}
-    except (json.JSONDecodeError, ValidationError) as e:
-        return {"error": "pydantic_validation_failed", "raw_output": text, "details": str(e)}
+    return {"error": f"Generation failed: {type(e).__name__} - {str(e)}"}
+
+
+def generate_comprehension_questions(transcript: str, title: str) -> List[Dict[str, Any]]:
+    """
+    Sinh 10-15 câu hỏi comprehension dựa vào transcript, từ cấp độ A1 -> C1
+    Trả về list các câu hỏi hợp lệ (dict)
+    """
+    try:
+        return _chat_parsed("generate_questions", _questions_request(transcript, title), _parse_questions)
+
+    except StructuredOutputError as e:
+        return {"error": "pydantic_validation_failed", "raw_output": e.raw_output, "details": str(e)}
+    except Exception as e:
+        return _generation_error(e)
+
+
+async def generate_comprehension_questions_async(transcript: str, title: str, question_count: str = DEFAULT_QUESTION_COUNT) -> List[Dict[str, Any]]:
+    """
+    Bản async của generate_comprehension_questions (dùng async client của backend),
+    không chiếm slot threadpool trong lúc chờ model.
+    """
+    try:
+        return await _achat_parsed("generate_questions", _questions_request(transcript, title, question_count), _parse_questions)
+
+    except StructuredOutputError as e:
+        return {"error": "pydantic_validation_failed", "raw_output": e.raw_output, "details": str(e)}
     except Exception as e:
-        return {"error": f"Generation failed: {type(e).__name__} - {str(e)}"}
+        return _generation_error(e)
+
+# --------------------------
+# 🔹 Streaming generation
+# --------------------------
+class QuestionStreamParser:
+    """
+    Incremental parser for the generation output.
+    Feed raw text chunks; every complete object inside the "questions" array
+    is returned as soon as its closing brace arrives.
+    """
+
+    _ARRAY_START = re.compile(r'"questions"\s*:\s*\[')
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0  # next character to scan once inside the array
+        self._in_array = False
+        self._done = False
+        self._depth = 0
+        self._obj_start: Optional[int] = None
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, chunk: str) -> List[str]:
+        self._buffer += chunk
+        if self._done:
+            return []
+        if not self._in_array:
+            match = self._ARRAY_START.search(self._buffer)
+            if not match:
+                return []
+            self._in_array = True
+            self._pos = match.end()
+
+        objects = []
+        buf = self._buffer
+        while self._pos < len(buf):
+            ch = buf[self._pos]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch == "{":
+                if self._depth == 0:
+                    self._obj_start = self._pos
+                self._depth += 1
+            elif ch == "}":
+                self._depth -= 1
+                if self._depth == 0 and self._obj_start is not None:
+                    objects.append(buf[self._obj_start:self._pos + 1])
+                    self._obj_start = None
+            elif ch == "]" and self._depth == 0:
+                self._done = True
+                self._pos += 1
+                break
+            self._pos += 1
+        return objects
+
+
+async def stream_comprehension_questions(transcript: str, title: str) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Stream variant of generate_comprehension_questions: yields each validated
+    question dict as soon as the model has finished writing it.
+    Invalid items are skipped; request errors propagate to the caller.
+    """
+    parser = QuestionStreamParser()
+    async for chunk in llm_calls.achat_stream("generate_questions", llm_backend.get_backend().async_client, **_questions_request(transcript, title)):
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if not delta:
+            continue
+        for raw in parser.feed(delta):
+            try:
+                question = ComprehensionQuestion.model_validate(json.loads(raw))
+            except (json.JSONDecodeError, ValidationError) as e:
+                print(f"⚠️ Skipping invalid streamed question: {e}")
+                continue
+            yield question.model_dump()
 
 # --------------------------
 # 🔹 AI evaluation for listening
 # --------------------------
+def _listening_request(correct_answer: str, user_answer: str) -> Dict[str, Any]:
+    return dict(
+        model=MODEL,
+        messages=[
+            # static prefix first (provider prompt caching), then the per-call data
+            {"role": "system", "content": LISTENING_SYSTEM_PROMPT},
+            {"role": "user", "content": listening_user_prompt(correct_answer, user_answer)}
+        ],
+        temperature=0.3,
+        max_tokens=1000,
+        response_format={"type": "json_object"}
+    )
+
+
+def _parse_listening(text: str) -> Dict[str, Any]:
+    if text.startswith("```json"):
+        text = text.replace("```json", "").replace("```", "").strip()
+    elif text.startswith("```"):
+        text = text.replace("```", "").strip()
+
+    result = json.loads(text)
+
+    result.setdefault("general", "incorrect")
+    result.setdefault("overall_score", 0)
+
+    if "details" not in result:
+        result["details"] = {}
+
+    # Ensure each detail category has proper structure
+    for category in ["grammar", "vocabulary", "fluency"]:
+        if category not in result["details"]:
+            result["details"][category] = {
+                "score": 0,
+                "errors": [],
+                "strengths": []
+            }
+
+    result.setdefault("feedback", "")
+    result.setdefault("suggestion", "")
+
+    return result
+
+
 def ai_evaluate_listening(correct_answer: str, user_answer: str) -> Dict[str, Any]:
     """
     Evaluate user's answer for a single listening question with detailed grammar, vocabulary, and fluency scoring.
     """
-    prompt = f"""
-    You are an ESL Teacher checking a student's listening answer.
-    
-    Task 1: Compare the semantic meaning. Does the Student's Answer convey the same meaning as the Correct Answer?
-    Task 2: Check grammar and vocabulary accuracy.
-    
-    Correct Answer: "{correct_answer}"
-    Student Answer: "{user_answer}"
-    
-    Output strictly valid JSON format:
-    {{
-        "general": "correct" (meaning matches) | "partially_correct" | "incorrect" (meaning wrong),
-        "overall_score": 0-100 (If incorrect meaning, max score is 40. If correct meaning but bad grammar, score 60-90),
-        "details": {{
-            "grammar": {{ "score": 0-100, "errors": [], "strengths": [] }},
-            "vocabulary": {{ "score": 0-100, "errors": [], "strengths": [] }},
-            "fluency": {{ "score": 0-100, "issues": [], "strengths": [] }}
-        }},
-        "feedback": "Short feedback focusing on why it is correct/incorrect.",
-        "suggestion": "How to improve the answer or the correct phrasing."
-    }}
-    """
-    
+    text = ""
     try:
-        resp = client.chat.completions.create(
-            model=MODEL,
-            messages=[
-                {"role": "system", "content": "You are a professional English listening evaluator. You output ONLY valid JSON. Do not use Markdown formatting."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.3,
-            max_tokens=1000,
-            response_format={"type": "json_object"} 
-        )
-        
+        resp = llm_calls.chat("evaluate_listening", llm_backend.get_backend().client, **_listening_request(correct_answer, user_answer))
         text = resp.choices[0].message.content.strip()
-        
-        if text.startswith("```json"):
-            text = text.replace("```json", "").replace("```", "").strip()
-        elif text.startswith("```"):
-            text = text.replace("```", "").strip()
-
-        result = json.loads(text)
-        
-        result.setdefault("general", "incorrect")
-        result.setdefault("overall_score", 0)
-        
-        if "details" not in result:
-            result["details"] = {}
-        
-        # Ensure each detail category has proper structure
-        for category in ["grammar", "vocabulary", "fluency"]:
-            if category not in result["details"]:
-                result["details"][category] = {
-                    "score": 0,
-                    "errors": [],
-                    "strengths": []
-                }
-        
-        result.setdefault("feedback", "")
-        result.setdefault("suggestion", "")
-        
-        return result
-        
+        return _parse_listening(text)
+
     except json.JSONDecodeError:
         # In ra raw text để debug nếu vẫn lỗi
         print(f"❌ JSON Decode Error. Raw text from AI: {text}")
@@ -184,185 +374,76 @@ def ai_evaluate_listening(correct_answer: str, user_answer: str) -> Dict[str, An
     except Exception as e:
         return {"error": f"AI evaluation failed: {str(e)}"}
 
+
+async def ai_evaluate_listening_async(correct_answer: str, user_answer: str) -> Dict[str, Any]:
+    """
+    Async variant of ai_evaluate_listening using the backend's async client.
+    """
+    text = ""
+    try:
+        resp = await llm_calls.achat("evaluate_listening", llm_backend.get_backend().async_client, **_listening_request(correct_answer, user_answer))
+        text = resp.choices[0].message.content.strip()
+        return _parse_listening(text)
+
+    except json.JSONDecodeError:
+        print(f"❌ JSON Decode Error. Raw text from AI: {text}")
+        return {"error": "invalid_json", "raw": text}
+    except Exception as e:
+        return {"error": f"AI evaluation failed: {str(e)}"}
+
 # --------------------------
 # 🔹 AI evaluation for speaking
 # --------------------------
+def _speaking_request(transcript: str, question: str = "") -> Dict[str, Any]:
+    request = dict(
+        model=MODEL,
+        messages=[
+            # static prefix first (provider prompt caching), then the per-call data
+            {"role": "system", "content": SPEAKING_SYSTEM_PROMPT},
+            {"role": "user", "content": speaking_user_prompt(transcript, question)}
+        ],
+        temperature=0.3,
+        max_tokens=2000
+    )
+    if STRUCTURED_OUTPUTS:
+        request["response_format"] = SPEAKING_RESPONSE_FORMAT
+    return request
+
+
+def _parse_speaking(text: str) -> Dict[str, Any]:
+    # Missing keys get the schema defaults (score 0, empty lists/strings, cefr "A1")
+    return _speaking_adapter.validate_json(text).model_dump()
+
+
 def ai_evaluate_speaking(transcript: str, question: str = "") -> Dict[str, Any]:
     """
     Evaluate user's speaking transcript with detailed grammar, vocabulary, and fluency analysis.
-    
+
     Args:
         transcript: The student's spoken response (transcribed to text)
         question: Optional - the question being answered for context
-        
+
     Returns:
         JSON with comprehensive evaluation
     """
-    question_context = f"\nQuestion being answered: {question}" if question else ""
-    
-    prompt = f"""
-    You are an expert English speaking examiner specializing in ESL evaluation.
-    
-    Evaluate this spoken transcript comprehensively across multiple dimensions.{question_context}
-    
-    Transcript:
-    "{transcript}"
-    
-    Provide detailed evaluation in these areas:
-    
-    1. **Grammar (0-100)**:
-       - Sentence structure complexity and accuracy
-       - Verb tense consistency
-       - Subject-verb agreement
-       - Use of articles, prepositions, conjunctions
-       - Identify specific errors and strengths
-    
-    2. **Vocabulary (0-100)**:
-       - Range (variety of words used)
-       - Precision (appropriate word choice)
-       - Sophistication (use of advanced vocabulary)
-       - Collocations and idioms
-       - Identify specific errors and strengths
-    
-    3. **Fluency (0-100)**:
-       - Coherence and logical flow
-       - Use of linking words
-       - Natural speech patterns
-       - Completeness of ideas
-       - Identify any issues and strengths
-    
-    4. **Pronunciation hints** (based on written patterns that suggest pronunciation issues)
-    
-    5. **Content quality** (relevance, depth, elaboration)
-    
-    Return strictly valid JSON:
-    {{
-        "overall_score": 0-100,
-        "cefr_level": "A1" | "A2" | "B1" | "B2" | "C1" | "C2",
-        "grammar": {{
-            "score": 0-100,
-            "errors": [
-                {{"type": "tense", "example": "I go yesterday", "correction": "I went yesterday"}},
-                {{"type": "article", "example": "I am teacher", "correction": "I am a teacher"}}
-            ],
-            "strengths": ["Uses complex sentences effectively", "Good control of past tense"],
-            "analysis": "Brief overall assessment"
-        }},
-        "vocabulary": {{
-            "score": 0-100,
-            "range_score": 0-100,
-            "precision_score": 0-100,
-            "errors": [
-                {{"word": "do homework", "context": "I do my homework", "suggestion": "complete/finish homework"}},
-                {{"word": "very good", "context": "It was very good", "suggestion": "excellent/outstanding"}}
-            ],
-            "strengths": ["Uses topic-specific vocabulary", "Good use of collocations"],
-            "advanced_words_used": ["sophisticated", "furthermore", "consequently"],
-            "analysis": "Brief overall assessment"
-        }},
-        "fluency": {{
-            "score": 0-100,
-            "coherence_score": 0-100,
-            "cohesion_score": 0-100,
-            "issues": ["Lacks transition between ideas", "Incomplete sentence at the end"],
-            "strengths": ["Logical progression", "Clear main idea"],
-            "linking_words_used": ["however", "therefore", "additionally"],
-            "analysis": "Brief overall assessment"
-        }},
-        "pronunciation_hints": [
-            "Possible issue with 'th' sounds based on spelling patterns",
-            "May need to work on word stress for multi-syllable words"
-        ],
-        "content": {{
-            "score": 0-100,
-            "relevance": "Addresses the question directly/partially/not at all",
-            "depth": "Superficial/Adequate/Detailed analysis",
-            "comments": "Brief assessment of content quality"
-        }},
-        "overall_feedback": "Comprehensive 2-3 sentence summary of performance",
-        "strengths_summary": ["Main strength 1", "Main strength 2"],
-        "areas_for_improvement": ["Priority area 1", "Priority area 2"],
-        "actionable_suggestions": [
-            "Practice using past perfect tense for completed actions",
-            "Expand vocabulary by learning synonyms for common words",
-            "Use more linking words to connect ideas smoothly"
-        ]
-    }}
-    
-    SCORING RUBRIC:
-    - 90-100: Near-native or C2 level
-    - 80-89: Advanced (C1)
-    - 70-79: Upper-intermediate (B2)
-    - 60-69: Intermediate (B1)
-    - 50-59: Pre-intermediate (A2)
-    - 0-49: Beginner (A1)
+    try:
+        return _chat_parsed("evaluate_speaking", _speaking_request(transcript, question), _parse_speaking)
+
+    except StructuredOutputError as e:
+        return {"error": "invalid_json", "raw": e.raw_output}
+    except Exception as e:
+        return {"error": f"AI evaluation failed: {str(e)}"}
+
+
+async def ai_evaluate_speaking_async(transcript: str, question: str = "") -> Dict[str, Any]:
+    """
+    Async variant of ai_evaluate_speaking using the backend's async client.
     """
-    
     try:
-        resp = client.chat.completions.create(
-            model=MODEL,
-            messages=[
-                {"role": "system", "content": "You are a professional English speaking evaluator with expertise in detailed linguistic analysis and ESL assessment."},
-                {"role": "user", "content": prompt}
-            ],
-            temperature=0.3,
-            max_tokens=2000
-        )
-        
-        text = resp.choices[0].message.content.strip()
-        result = json.loads(text)
-        
-        # Ensure all required top-level keys exist
-        result.setdefault("overall_score", 0)
-        result.setdefault("cefr_level", "A1")
-        result.setdefault("overall_feedback", "")
-        result.setdefault("strengths_summary", [])
-        result.setdefault("areas_for_improvement", [])
-        result.setdefault("actionable_suggestions", [])
-        result.setdefault("pronunciation_hints", [])
-        
-        # Ensure grammar structure
-        if "grammar" not in result:
-            result["grammar"] = {}
-        result["grammar"].setdefault("score", 0)
-        result["grammar"].setdefault("errors", [])
-        result["grammar"].setdefault("strengths", [])
-        result["grammar"].setdefault("analysis", "")
-        
-        # Ensure vocabulary structure
-        if "vocabulary" not in result:
-            result["vocabulary"] = {}
-        result["vocabulary"].setdefault("score", 0)
-        result["vocabulary"].setdefault("range_score", 0)
-        result["vocabulary"].setdefault("precision_score", 0)
-        result["vocabulary"].setdefault("errors", [])
-        result["vocabulary"].setdefault("strengths", [])
-        result["vocabulary"].setdefault("advanced_words_used", [])
-        result["vocabulary"].setdefault("analysis", "")
-        
-        # Ensure fluency structure
-        if "fluency" not in result:
-            result["fluency"] = {}
-        result["fluency"].setdefault("score", 0)
-        result["fluency"].setdefault("coherence_score", 0)
-        result["fluency"].setdefault("cohesion_score", 0)
-        result["fluency"].setdefault("issues", [])
-        result["fluency"].setdefault("strengths", [])
-        result["fluency"].setdefault("linking_words_used", [])
-        result["fluency"].setdefault("analysis", "")
-        
-        # Ensure content structure
-        if "content" not in result:
-            result["content"] = {}
-        result["content"].setdefault("score", 0)
-        result["content"].setdefault("relevance", "")
-        result["content"].setdefault("depth", "")
-        result["content"].setdefault("comments", "")
-        
-        return result
-        
-    except json.JSONDecodeError:
-        return {"error": "invalid_json", "raw": text}
+        return await _achat_parsed("evaluate_speaking", _speaking_request(transcript, question), _parse_speaking)
+
+    except StructuredOutputError as e:
+        return {"error": "invalid_json", "raw": e.raw_output}
     except Exception as e:
         return {"error": f"AI evaluation failed: {str(e)}"}
 
@@ -0,0 +1,93 @@
+import asyncio
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import AsyncIterator, List, Optional, Tuple
+
+# --------------------------
+# 🔹 Config
+# --------------------------
+ASR_WORKERS = int(os.getenv("ASR_WORKERS", str(os.cpu_count() or 1)))
+ASR_SAMPLE_RATE = 16000
+# Audio is cut into fixed windows that are recognized in parallel
+ASR_CHUNK_MS = int(os.getenv("ASR_CHUNK_MS", "15000"))
+ASR_LANGUAGE = os.getenv("ASR_LANGUAGE", "en-US")
+
+_executor: Optional[ProcessPoolExecutor] = None
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=ASR_WORKERS)
+    return _executor
+
+
+def shutdown_executor() -> None:
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+
+# --------------------------
+# 🔹 Worker-side functions (run in the process pool)
+# --------------------------
+# pydub / speech_recognition are imported here, inside the pool workers: they
+# are slow to import and pydub warns about ffmpeg on import, which the API
+# process should not pay for at startup.
+def prepare_chunks(path: str) -> List[bytes]:
+    """Decode any pydub/ffmpeg format, convert to 16 kHz mono 16-bit, normalize loudness, split into WAV chunks."""
+    from pydub import AudioSegment
+    from pydub.effects import normalize
+    from pydub.utils import make_chunks
+
+    audio = AudioSegment.from_file(path)
+    audio = audio.set_channels(1).set_frame_rate(ASR_SAMPLE_RATE).set_sample_width(2)
+    audio = normalize(audio)
+
+    chunks = []
+    for chunk in make_chunks(audio, ASR_CHUNK_MS):
+        buf = io.BytesIO()
+        chunk.export(buf, format="wav")
+        chunks.append(buf.getvalue())
+    return chunks
+
+
+def transcribe_chunk(wav_bytes: bytes) -> str:
+    """Offline recognition (CMU Sphinx) of one WAV chunk; silence/unintelligible -> ''."""
+    import speech_recognition as sr
+
+    recognizer = sr.Recognizer()
+    with sr.AudioFile(io.BytesIO(wav_bytes)) as source:
+        audio = recognizer.record(source)
+    try:
+        return recognizer.recognize_sphinx(audio, language=ASR_LANGUAGE).strip()
+    except sr.UnknownValueError:
+        return ""
+
+
+# --------------------------
+# 🔹 Async API
+# --------------------------
+async def transcribe_stream(path: str) -> AsyncIterator[Tuple[int, int, str]]:
+    """
+    Yield (chunk_index, chunk_count, text) in audio order. All chunks are
+    submitted to the pool at once, so later chunks are recognized while
+    earlier partial transcripts are being streamed.
+    """
+    loop = asyncio.get_running_loop()
+    executor = _get_executor()
+    chunks = await loop.run_in_executor(executor, prepare_chunks, path)
+    futures = [loop.run_in_executor(executor, transcribe_chunk, chunk) for chunk in chunks]
+    try:
+        for index, future in enumerate(futures):
+            yield index, len(futures), await future
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+async def transcribe(path: str) -> str:
+    parts = [text async for _, _, text in transcribe_stream(path)]
+    return " ".join(p for p in parts if p)
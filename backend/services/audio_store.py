@@ -0,0 +1,129 @@
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import Optional
+
+from fastapi import UploadFile
+
+logger = logging.getLogger("api_debug")
+
+# --------------------------
+# 🔹 Config
+# --------------------------
+AUDIO_STORE_DIR = os.getenv("AUDIO_STORE_DIR", os.path.join(tempfile.gettempdir(), "english_buddy_audio"))
+MAX_AUDIO_UPLOAD_BYTES = int(os.getenv("MAX_AUDIO_UPLOAD_BYTES", str(20 * 1024 * 1024)))
+AUDIO_TTL_SECONDS = int(os.getenv("AUDIO_TTL_SECONDS", str(24 * 3600)))
+AUDIO_JANITOR_INTERVAL = int(os.getenv("AUDIO_JANITOR_INTERVAL", "600"))
+CHUNK_SIZE = 1024 * 1024
+
+
+class AudioTooLargeError(Exception):
+    pass
+
+
+@dataclass
+class StoredAudio:
+    sha256: str
+    path: str
+    size: int
+    deduplicated: bool
+
+
+def _extension(filename: Optional[str]) -> str:
+    ext = os.path.splitext(filename or "")[1].lower()
+    return ext if re.fullmatch(r"\.[a-z0-9]{1,8}", ext) else ""
+
+
+def _store_dir() -> str:
+    os.makedirs(AUDIO_STORE_DIR, exist_ok=True)
+    return AUDIO_STORE_DIR
+
+
+async def save_upload(file: UploadFile, max_bytes: int = MAX_AUDIO_UPLOAD_BYTES) -> StoredAudio:
+    """
+    Stream an upload to the store in fixed-size chunks (never the whole file
+    in memory), hashing as it goes. Files are stored as <sha256><ext>, so the
+    same recording uploaded twice is kept once.
+    Raises AudioTooLargeError as soon as max_bytes is exceeded.
+    """
+    store_dir = _store_dir()
+    digest = hashlib.sha256()
+    size = 0
+    fd, part_path = tempfile.mkstemp(dir=store_dir, suffix=".part")
+    try:
+        with os.fdopen(fd, "wb") as out:
+            while True:
+                chunk = await file.read(CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                if size > max_bytes:
+                    raise AudioTooLargeError(f"Audio file exceeds the {max_bytes // (1024 * 1024)} MB limit")
+                digest.update(chunk)
+                out.write(chunk)
+
+        sha256 = digest.hexdigest()
+        final_path = os.path.join(store_dir, f"{sha256}{_extension(file.filename)}")
+        if os.path.exists(final_path):
+            os.remove(part_path)
+            os.utime(final_path)  # refresh TTL
+            return StoredAudio(sha256=sha256, path=final_path, size=size, deduplicated=True)
+
+        os.replace(part_path, final_path)
+        return StoredAudio(sha256=sha256, path=final_path, size=size, deduplicated=False)
+    except BaseException:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        raise
+
+
+# --------------------------
+# 🔹 Janitor
+# --------------------------
+def purge_expired(ttl_seconds: int = AUDIO_TTL_SECONDS) -> int:
+    """Delete stored files (and stale partial uploads) not touched for ttl_seconds."""
+    if not os.path.isdir(AUDIO_STORE_DIR):
+        return 0
+    cutoff = time.time() - ttl_seconds
+    removed = 0
+    for entry in os.scandir(AUDIO_STORE_DIR):
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+        except FileNotFoundError:
+            continue
+    return removed
+
+
+_janitor_task: Optional[asyncio.Task] = None
+
+
+async def _janitor_loop() -> None:
+    while True:
+        try:
+            removed = await asyncio.to_thread(purge_expired)
+            if removed:
+                logger.info(f"🧹 Audio janitor removed {removed} expired file(s)")
+        except Exception as e:
+            logger.warning(f"⚠️ Audio janitor failed: {e}")
+        await asyncio.sleep(AUDIO_JANITOR_INTERVAL)
+
+
+def start_janitor() -> None:
+    global _janitor_task
+    if _janitor_task is None:
+        _janitor_task = asyncio.create_task(_janitor_loop())
+
+
+async def stop_janitor() -> None:
+    global _janitor_task
+    if _janitor_task is not None:
+        _janitor_task.cancel()
+        await asyncio.gather(_janitor_task, return_exceptions=True)
+        _janitor_task = None
@@ -0,0 +1,170 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from backend import models
+from backend.database import SessionLocal
+from backend.services.ai_service import MODEL, LISTENING_PROMPT_VERSION, ai_evaluate_listening_async
+from backend.services.lru_cache import TTLCache
+
+logger = logging.getLogger("api_debug")
+
+# --------------------------
+# 🔹 Config
+# --------------------------
+EVAL_CACHE_SIZE = int(os.getenv("EVAL_CACHE_SIZE", "5000"))
+EVAL_CACHE_TTL = float(os.getenv("EVAL_CACHE_TTL", "86400"))
+# "db" enables the shared tier (ai_eval_cache table) so all workers reuse results
+EVAL_CACHE_SHARED = os.getenv("EVAL_CACHE_SHARED", "").lower() in ("1", "true", "db")
+
+_local = TTLCache(maxsize=EVAL_CACHE_SIZE, ttl=EVAL_CACHE_TTL)
+_stats = {"local_hits": 0, "shared_hits": 0, "misses": 0, "coalesced": 0, "stores": 0}
+_stats_lock = threading.Lock()
+# key -> future of the evaluation already running for it (single-flight)
+_inflight: Dict[str, asyncio.Future] = {}
+
+
+def _count(name: str) -> None:
+    with _stats_lock:
+        _stats[name] += 1
+
+
+def normalize_answer(text: str) -> str:
+    """Lower-case and collapse whitespace so trivially different answers share a key."""
+    return " ".join((text or "").lower().split())
+
+
+def listening_cache_key(expected_points: List[str], user_answer: str) -> str:
+    payload = json.dumps(
+        {
+            "expected": [normalize_answer(p) for p in expected_points],
+            "answer": normalize_answer(user_answer),
+            "model": MODEL,
+            "prompt": LISTENING_PROMPT_VERSION,
+        },
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# --------------------------
+# 🔹 Shared tier (DB)
+# --------------------------
+def _shared_get(key: str) -> Optional[Dict[str, Any]]:
+    db = SessionLocal()
+    try:
+        row = db.query(models.AIEvalCache).filter_by(cache_key=key).first()
+        if not row:
+            return None
+        created_at = row.created_at
+        if created_at is not None:
+            if created_at.tzinfo is None:
+                created_at = created_at.replace(tzinfo=timezone.utc)
+            if created_at < datetime.now(timezone.utc) - timedelta(seconds=EVAL_CACHE_TTL):
+                return None
+        return row.result
+    finally:
+        db.close()
+
+
+def _shared_set(key: str, result: Dict[str, Any]) -> None:
+    db = SessionLocal()
+    try:
+        db.merge(models.AIEvalCache(cache_key=key, result=result, created_at=datetime.now(timezone.utc)))
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"⚠️ Could not store shared eval cache entry: {e}")
+    finally:
+        db.close()
+
+
+# --------------------------
+# 🔹 Cached evaluation
+# --------------------------
+async def _lookup_or_evaluate(key: str, expected_points: List[str], user_answer: str) -> Dict[str, Any]:
+    if EVAL_CACHE_SHARED:
+        try:
+            result = await asyncio.to_thread(_shared_get, key)
+        except Exception as e:
+            logger.warning(f"⚠️ Shared eval cache lookup failed: {e}")
+            result = None
+        if result is not None:
+            _count("shared_hits")
+            _local.set(key, result)
+            return result
+
+    _count("misses")
+    result = await ai_evaluate_listening_async(", ".join(expected_points), user_answer)
+    if "error" in result:
+        return result
+
+    _local.set(key, result)
+    _count("stores")
+    if EVAL_CACHE_SHARED:
+        await asyncio.to_thread(_shared_set, key, result)
+    return result
+
+
+async def cached_evaluate_listening(expected_points: List[str], user_answer: str) -> Dict[str, Any]:
+    """
+    Content-addressed cache in front of ai_evaluate_listening.
+    Lookup order: in-process LRU -> shared DB tier (optional) -> model.
+    Concurrent misses on the same key share one lookup/model call.
+    Error results are never cached.
+    """
+    key = listening_cache_key(expected_points, user_answer)
+
+    while True:
+        result = _local.get(key)
+        if result is not None:
+            _count("local_hits")
+            return result
+
+        pending = _inflight.get(key)
+        if pending is None:
+            break
+        try:
+            result = await asyncio.shield(pending)
+        except asyncio.CancelledError:
+            if pending.cancelled():
+                continue  # the first caller was cancelled: evaluate ourselves
+            raise
+        _count("coalesced")
+        return result
+
+    future = asyncio.get_running_loop().create_future()
+    future.add_done_callback(lambda f: f.cancelled() or f.exception())  # no "never retrieved" warning without followers
+    _inflight[key] = future
+    try:
+        result = await _lookup_or_evaluate(key, expected_points, user_answer)
+    except asyncio.CancelledError:
+        future.cancel()
+        raise
+    except Exception as e:
+        future.set_exception(e)
+        raise
+    finally:
+        _inflight.pop(key, None)
+    future.set_result(result)
+    return result
+
+
+def cache_stats() -> Dict[str, Any]:
+    with _stats_lock:
+        stats = dict(_stats)
+    # a coalesced request waited for another one's model call: counts as a hit
+    hits = stats["local_hits"] + stats["shared_hits"] + stats["coalesced"]
+    lookups = hits + stats["misses"]
+    return {
+        **stats,
+        "size": len(_local),
+        "shared_enabled": EVAL_CACHE_SHARED,
+        "hit_ratio": round(hits / lookups, 4) if lookups else 0.0,
+    }
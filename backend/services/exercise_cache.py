@@ -0,0 +1,116 @@
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, load_only, object_session
+
+from backend import models
+from backend.services.lru_cache import TTLCache
+
+# --------------------------
+# 🔹 Config
+# --------------------------
+EXERCISE_CACHE_SIZE = int(os.getenv("EXERCISE_CACHE_SIZE", "512"))
+# Other workers only see updates/deletes once their copy expires
+EXERCISE_CACHE_TTL = float(os.getenv("EXERCISE_CACHE_TTL", "300"))
+
+
+@dataclass
+class CachedExercise:
+    """Read-only view of an exercise with its questions indexed by id."""
+    id: str
+    title: str
+    questions: List[Dict[str, Any]]
+    questions_by_id: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    expected_points: Dict[str, List[str]] = field(default_factory=dict)
+    correct_answers: Dict[str, str] = field(default_factory=dict)  # ", ".join(expected_points)
+
+    @classmethod
+    def from_content(cls, exercise_id: str, content: Dict[str, Any]) -> "CachedExercise":
+        questions = [q for q in content.get("questions", []) if isinstance(q, dict)]
+        cached = cls(id=exercise_id, title=content.get("title", ""), questions=questions)
+        for q in questions:
+            qid = str(q.get("id"))
+            points = q.get("expected_answer_points", [])
+            if not isinstance(points, list):
+                points = [str(points)]
+            cached.questions_by_id[qid] = q
+            cached.expected_points[qid] = points
+            cached.correct_answers[qid] = ", ".join(points)
+        return cached
+
+
+_cache = TTLCache(maxsize=EXERCISE_CACHE_SIZE, ttl=EXERCISE_CACHE_TTL)
+_stats = {"hits": 0, "misses": 0, "invalidations": 0}
+
+
+def _lookup(exercise_id: str) -> Optional[CachedExercise]:
+    cached = _cache.get(exercise_id)
+    _stats["hits" if cached is not None else "misses"] += 1
+    return cached
+
+
+def _select_exercise(exercise_id: str):
+    Exercise = models.ListeningExercise
+    return select(Exercise).options(load_only(Exercise.id, Exercise.content)).where(Exercise.id == exercise_id)
+
+
+def _store(exercise: Optional[models.ListeningExercise]) -> Optional[CachedExercise]:
+    if exercise is None:
+        return None
+    if not exercise.content or "questions" not in exercise.content:
+        raise ValueError("Exercise content invalid")
+    cached = CachedExercise.from_content(exercise.id, exercise.content)
+    _cache.set(exercise.id, cached)
+    return cached
+
+
+async def aget_exercise(db: AsyncSession, exercise_id: str) -> Optional[CachedExercise]:
+    """
+    Read-through lookup. Returns None when the exercise does not exist,
+    raises ValueError when its content has no question list (neither is cached).
+    """
+    cached = _lookup(exercise_id)
+    if cached is not None:
+        return cached
+    return _store((await db.execute(_select_exercise(exercise_id))).scalars().first())
+
+
+def invalidate(exercise_id: str) -> None:
+    if _cache.pop(exercise_id) is not None:
+        _stats["invalidations"] += 1
+
+
+def cache_stats() -> Dict[str, int]:
+    return {**_stats, "size": len(_cache)}
+
+
+# --------------------------
+# 🔹 Invalidation on ORM update/delete
+# --------------------------
+# Ids are collected at flush time and evicted after commit, so a concurrent
+# reader cannot re-cache the old row between the flush and the commit.
+_PENDING_KEY = "exercise_cache_invalidate"
+
+
+@event.listens_for(models.ListeningExercise, "after_update")
+@event.listens_for(models.ListeningExercise, "after_delete")
+def _mark_changed(mapper, connection, target) -> None:
+    session = object_session(target)
+    if session is None:
+        invalidate(target.id)
+        return
+    session.info.setdefault(_PENDING_KEY, set()).add(target.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _evict_committed(session) -> None:
+    for exercise_id in session.info.pop(_PENDING_KEY, ()):
+        invalidate(exercise_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_rolled_back(session) -> None:
+    session.info.pop(_PENDING_KEY, None)
@@ -0,0 +1,154 @@
+import asyncio
+import copy
+import hashlib
+import json
+import uuid
+from typing import Any, Dict, List, Tuple
+
+from sqlalchemy.orm import Session
+
+from backend import models
+from backend.services.ai_service import MODEL, QUESTIONS_PROMPT_VERSION
+from backend.services.job_queue import job_handler
+from backend.services.question_pipeline import generate_questions_map_reduce
+from backend.services.transcript_segments import TranscriptSegments
+
+
+class QuestionGenerationError(Exception):
+    """Raised when the model did not return a usable question list."""
+
+    def __init__(self, detail: Any):
+        super().__init__(str(detail))
+        self.detail = detail
+
+
+def questions_cache_key(title: str, transcript: str) -> str:
+    payload = json.dumps(
+        {
+            "title": title or "",
+            "transcript": transcript or "",
+            "model": MODEL,
+            "prompt": QUESTIONS_PROMPT_VERSION,
+        },
+        ensure_ascii=False,
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def clean_questions(ai_response: Any) -> List[Dict[str, Any]]:
+    """Keep only dict questions (decoding JSON strings) and give each a unique id."""
+    if isinstance(ai_response, dict) and "error" in ai_response:
+        raise QuestionGenerationError(ai_response)
+    if not isinstance(ai_response, list):
+        raise QuestionGenerationError(f"Invalid AI response format (expected list, got {type(ai_response)})")
+
+    questions = []
+    for q in ai_response:
+        if isinstance(q, str):
+            try:
+                q = json.loads(q)
+            except Exception:
+                continue
+        if not isinstance(q, dict):
+            print(f"⚠️ Skipping invalid question item: {q}")
+            continue
+        q["id"] = str(uuid.uuid4())  # Gán ID duy nhất cho từng câu hỏi
+        questions.append(q)
+
+    if not questions:
+        raise QuestionGenerationError("No valid questions extracted")
+    return questions
+
+
+def save_exercise(db: Session, video: models.ListeningSource, questions: List[Dict[str, Any]], content_hash: str) -> models.ListeningExercise:
+    exercise_content = {
+        "title": f"Questions for: {video.title}",
+        "questions": questions
+    }
+    exercise = models.ListeningExercise(
+        source_id=video.id,
+        exercise_type="comprehension",
+        content=exercise_content
+    )
+    db.add(exercise)
+    db.flush()
+    db.merge(models.GeneratedQuestionSet(content_hash=content_hash, exercise_id=exercise.id))
+    db.commit()
+    db.refresh(exercise)
+    return exercise
+
+
+def find_cached_exercise(db: Session, video: models.ListeningSource, content_hash: str) -> models.ListeningExercise | None:
+    """
+    Return a stored exercise for this transcript hash.
+    If it was generated for another video with the same title/transcript, its
+    content is copied onto a new exercise for this video, once: later calls
+    find that copy among this video's exercises.
+    """
+    entry = db.query(models.GeneratedQuestionSet).filter_by(content_hash=content_hash).first()
+    if not entry or not entry.exercise:
+        return None
+    if entry.exercise.source_id == video.id:
+        return entry.exercise
+
+    # the hash keeps pointing at the original, so look for an earlier copy first
+    for existing in (
+        db.query(models.ListeningExercise)
+        .filter_by(source_id=video.id, exercise_type=entry.exercise.exercise_type)
+        .order_by(models.ListeningExercise.created_at.desc())
+    ):
+        if existing.content == entry.exercise.content:
+            return existing
+
+    exercise = models.ListeningExercise(
+        source_id=video.id,
+        exercise_type=entry.exercise.exercise_type,
+        content=copy.deepcopy(entry.exercise.content)
+    )
+    db.add(exercise)
+    db.commit()
+    db.refresh(exercise)
+    return exercise
+
+
+def _stored_segments(video: models.ListeningSource) -> TranscriptSegments | None:
+    # segments is a deferred column: reading it may hit the database
+    return TranscriptSegments.from_json(video.segments) if video.segments else None
+
+
+async def get_or_generate_exercise(db: Session, video: models.ListeningSource, force: bool = False) -> Tuple[models.ListeningExercise, bool]:
+    """
+    Return (exercise, cached). The model is only called when no exercise exists
+    for this transcript hash or when force=True.
+    The session is sync: every DB step runs in a worker thread, never on the
+    event loop. `video` may be expired afterwards, use exercise.source_id.
+    """
+    content_hash = questions_cache_key(video.title, video.transcript)
+    if not force:
+        exercise = await asyncio.to_thread(find_cached_exercise, db, video, content_hash)
+        if exercise is not None:
+            return exercise, True
+
+    segments = await asyncio.to_thread(_stored_segments, video)
+    ai_response = await generate_questions_map_reduce(video.transcript, video.title, segments=segments)
+    questions = clean_questions(ai_response)
+    return await asyncio.to_thread(save_exercise, db, video, questions, content_hash), False
+
+
+@job_handler("generate_questions")
+async def run_generate_questions_job(db: Session, payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Background job: create the ListeningExercise for a newly added video."""
+    video = await asyncio.to_thread(lambda: db.query(models.ListeningSource).filter_by(id=payload["video_id"]).first())
+    if not video:
+        raise ValueError(f"Video {payload['video_id']} not found")
+    if not video.transcript:
+        raise ValueError(f"Video {video.id} has no transcript")
+
+    exercise, cached = await get_or_generate_exercise(db, video, force=payload.get("force", False))
+    return {
+        "exercise_id": exercise.id,
+        "source_id": exercise.source_id,
+        "cached": cached,
+        "questions_generated": len(exercise.content["questions"]),
+    }
@@ -0,0 +1,239 @@
+import asyncio
+import logging
+import os
+import traceback
+from datetime import datetime, timedelta, timezone
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from sqlalchemy import func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from backend import models
+from backend.database import SessionLocal
+
+logger = logging.getLogger("api_debug")
+
+# --------------------------
+# 🔹 Config
+# --------------------------
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+JOB_RETRY_BASE_DELAY = float(os.getenv("JOB_RETRY_BASE_DELAY", "2"))
+JOB_RETRY_MAX_DELAY = float(os.getenv("JOB_RETRY_MAX_DELAY", "60"))
+# A running job whose updated_at is older than this is considered abandoned
+# (its worker died) and is queued again; live workers refresh it every LEASE/3.
+JOB_LEASE_SECONDS = float(os.getenv("JOB_LEASE_SECONDS", "300"))
+
+JobHandler = Callable[[Session, Dict[str, Any]], Awaitable[Optional[Dict[str, Any]]]]
+_handlers: Dict[str, JobHandler] = {}
+
+
+def job_handler(kind: str):
+    """Register the coroutine that executes jobs of the given kind."""
+    def decorator(func: JobHandler) -> JobHandler:
+        _handlers[kind] = func
+        return func
+    return decorator
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class JobQueue:
+    """
+    In-process worker pool backed by the jobs table.
+
+    Jobs are persisted before they are queued. A job is claimed with a
+    conditional UPDATE (queued -> running), so when several workers/processes
+    see the same id only one runs it. Running jobs hold a lease (updated_at,
+    refreshed while the handler runs); jobs whose lease expired are queued
+    again by the reaper. Failed attempts are retried with exponential backoff
+    until max_attempts is reached.
+    """
+
+    def __init__(self, workers: int = JOB_WORKERS):
+        self.workers = workers
+        self._queue: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._tasks: List[asyncio.Task] = []
+        self._retry_timers: Set[asyncio.Task] = set()  # strong refs, or pending retries can be garbage-collected
+
+    async def start(self) -> None:
+        if self._tasks:
+            return
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._worker()) for _ in range(self.workers)]
+        self._tasks.append(asyncio.create_task(self._reaper()))
+        for job_id in await asyncio.to_thread(self._pending_job_ids):
+            self._queue.put_nowait(job_id)
+
+    async def stop(self) -> None:
+        for task in [*self._tasks, *self._retry_timers]:
+            task.cancel()
+        await asyncio.gather(*self._tasks, *self._retry_timers, return_exceptions=True)
+        self._tasks = []
+        self._retry_timers.clear()
+
+    def enqueue(self, db: Session, kind: str, payload: Dict[str, Any], max_attempts: int = JOB_MAX_ATTEMPTS) -> models.Job:
+        if kind not in _handlers:
+            raise ValueError(f"No handler registered for job kind '{kind}'")
+        job = models.Job(kind=kind, status="queued", payload=payload, attempts=0, max_attempts=max_attempts)
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+        # Khi worker chưa chạy, job vẫn nằm trong DB và được nạp lại lúc start()
+        if self._queue is not None:
+            # enqueue may be called from a threadpool endpoint
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, job.id)
+        return job
+
+    async def aenqueue(self, db: AsyncSession, kind: str, payload: Dict[str, Any], max_attempts: int = JOB_MAX_ATTEMPTS) -> models.Job:
+        """enqueue() for async endpoints holding an AsyncSession."""
+        if kind not in _handlers:
+            raise ValueError(f"No handler registered for job kind '{kind}'")
+        job = models.Job(kind=kind, status="queued", payload=payload, attempts=0, max_attempts=max_attempts)
+        db.add(job)
+        await db.commit()
+        await db.refresh(job)
+        if self._queue is not None:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, job.id)
+        return job
+
+    @staticmethod
+    def _pending_job_ids(idle_for: float = 0) -> List[str]:
+        """
+        Queue again the running jobs whose lease expired, then return the ids of
+        queued jobs not touched for idle_for seconds (0 = all of them).
+        """
+        Job = models.Job
+        now = _now()
+        stale = or_(Job.updated_at.is_(None), Job.updated_at < now - timedelta(seconds=JOB_LEASE_SECONDS))
+        db = SessionLocal()
+        try:
+            recovered = db.execute(
+                update(Job).where(Job.status == "running", stale).values(status="queued", updated_at=now)
+            ).rowcount
+            db.commit()
+            if recovered:
+                logger.warning(f"⚠️ Re-queued {recovered} job(s) whose worker stopped renewing the lease")
+
+            query = select(Job.id).where(Job.status == "queued")
+            if idle_for:
+                query = query.where(or_(Job.updated_at.is_(None), Job.updated_at < now - timedelta(seconds=idle_for)))
+            return list(db.execute(query).scalars())
+        finally:
+            db.close()
+
+    async def _reaper(self) -> None:
+        # picks up jobs of crashed workers, and queued jobs whose process died before running them
+        while True:
+            await asyncio.sleep(JOB_LEASE_SECONDS)
+            try:
+                for job_id in await asyncio.to_thread(self._pending_job_ids, JOB_LEASE_SECONDS):
+                    self._queue.put_nowait(job_id)
+            except Exception:
+                logger.error(f"❌ Job reaper failed: {traceback.format_exc()}")
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except Exception:
+                logger.error(f"❌ Job worker crashed on {job_id}: {traceback.format_exc()}")
+            finally:
+                self._queue.task_done()
+
+    async def _requeue_later(self, job_id: str, delay: float) -> None:
+        await asyncio.sleep(delay)
+        self._queue.put_nowait(job_id)
+
+    def _schedule_retry(self, job_id: str, delay: float) -> None:
+        timer = asyncio.create_task(self._requeue_later(job_id, delay))
+        self._retry_timers.add(timer)
+        timer.add_done_callback(self._retry_timers.discard)
+
+    @staticmethod
+    def _claim(db: Session, job_id: str) -> Optional[models.Job]:
+        """queued -> running in one conditional UPDATE; None if another worker got it first."""
+        Job = models.Job
+        claimed = db.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == "queued")
+            .values(status="running", attempts=func.coalesce(Job.attempts, 0) + 1, updated_at=_now())
+        ).rowcount
+        db.commit()
+        return db.get(Job, job_id) if claimed == 1 else None
+
+    @staticmethod
+    def _renew_lease(job_id: str) -> None:
+        db = SessionLocal()
+        try:
+            Job = models.Job
+            db.execute(update(Job).where(Job.id == job_id, Job.status == "running").values(updated_at=_now()))
+            db.commit()
+        finally:
+            db.close()
+
+    async def _heartbeat(self, job_id: str) -> None:
+        while True:
+            await asyncio.sleep(JOB_LEASE_SECONDS / 3)
+            try:
+                await asyncio.to_thread(self._renew_lease, job_id)
+            except Exception as e:
+                logger.warning(f"⚠️ Could not renew the lease of job {job_id}: {e}")
+
+    @staticmethod
+    def _record_failure(db: Session, job: models.Job, error: Exception) -> Optional[float]:
+        """Mark the attempt as failed. Returns the retry delay, or None when out of attempts."""
+        db.rollback()
+        job.error = f"{type(error).__name__}: {error}"
+        job.updated_at = _now()
+        if job.attempts < job.max_attempts:
+            job.status = "queued"
+            db.commit()
+            return min(JOB_RETRY_BASE_DELAY * 2 ** (job.attempts - 1), JOB_RETRY_MAX_DELAY)
+        job.status = "failed"
+        db.commit()
+        return None
+
+    @staticmethod
+    def _record_success(db: Session, job: models.Job, result: Optional[Dict[str, Any]]) -> None:
+        job.status = "succeeded"
+        job.result = result
+        job.error = None
+        job.updated_at = _now()
+        db.commit()
+
+    async def _run(self, job_id: str) -> None:
+        # the session is sync: every DB step runs in a worker thread, never on the event loop
+        db = SessionLocal()
+        try:
+            job = await asyncio.to_thread(self._claim, db, job_id)
+            if job is None:
+                return
+            kind, payload, attempts = job.kind, job.payload or {}, job.attempts
+
+            heartbeat = asyncio.create_task(self._heartbeat(job_id))
+            try:
+                result = await _handlers[kind](db, payload)
+            except Exception as e:
+                delay = await asyncio.to_thread(self._record_failure, db, job, e)
+                if delay is not None:
+                    logger.warning(f"⚠️ Job {job_id} attempt {attempts} failed, retrying in {delay:.1f}s: {type(e).__name__}: {e}")
+                    self._schedule_retry(job_id, delay)
+                else:
+                    logger.error(f"❌ Job {job_id} failed after {attempts} attempts: {type(e).__name__}: {e}")
+                return
+            finally:
+                heartbeat.cancel()
+
+            await asyncio.to_thread(self._record_success, db, job, result)
+        finally:
+            db.close()
+
+
+job_queue = JobQueue()
@@ -0,0 +1,324 @@
+import asyncio
+import json
+import math
+import os
+import random
+import re
+import threading
+import time
+import uuid
+from types import SimpleNamespace
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from backend.schemas import SpeakingEvaluation
+from backend.services import llm_calls
+from backend.services.prompts import LISTENING_SYSTEM_PROMPT, SPEAKING_SYSTEM_PROMPT
+
+# --------------------------
+# 🔹 Config
+# --------------------------
+LLM_BACKEND = os.getenv("LLM_BACKEND", "openai")  # "openai" | "mock"
+
+# Mock backend: latency = time to first token (sampled) + completion tokens / token rate
+MOCK_LLM_LATENCY_MS = float(os.getenv("MOCK_LLM_LATENCY_MS", "300"))
+MOCK_LLM_LATENCY_DIST = os.getenv("MOCK_LLM_LATENCY_DIST", "lognormal")  # "fixed" | "uniform" | "lognormal"
+MOCK_LLM_LATENCY_SIGMA = float(os.getenv("MOCK_LLM_LATENCY_SIGMA", "0.5"))
+MOCK_LLM_TOKENS_PER_SEC = float(os.getenv("MOCK_LLM_TOKENS_PER_SEC", "150"))  # 0 = whole output at once
+MOCK_LLM_FAILURE_RATE = float(os.getenv("MOCK_LLM_FAILURE_RATE", "0"))
+MOCK_LLM_FAILURE_KIND = os.getenv("MOCK_LLM_FAILURE_KIND", "rate_limit")  # "rate_limit" | "server_error" | "timeout"
+MOCK_LLM_SEED = os.getenv("MOCK_LLM_SEED")
+
+LEVELS = ["A1", "A2", "B1", "B2", "C1"]
+
+
+# --------------------------
+# 🔹 OpenAI backend
+# --------------------------
+def openai_module():
+    """
+    The openai package, imported on first use: `import openai` alone is about
+    half of the app's import time and the mock backend never needs it.
+    """
+    import openai
+    return openai
+
+
+class OpenAIBackend:
+    """OpenAI chat completions; clients are created on first use, not at import."""
+
+    name = "openai"
+
+    def __init__(self, api_key: Optional[str] = None):
+        self._api_key = api_key
+        self._client = None
+        self._async_client = None
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        with self._lock:
+            if self._client is None:
+                from openai import OpenAI
+                self._client = OpenAI(api_key=self._api_key or os.getenv("OPENAI_API_KEY"))
+            return self._client
+
+    @property
+    def async_client(self):
+        # Async client: lets a single worker keep many model calls in flight
+        with self._lock:
+            if self._async_client is None:
+                from openai import AsyncOpenAI
+                self._async_client = AsyncOpenAI(api_key=self._api_key or os.getenv("OPENAI_API_KEY"))
+            return self._async_client
+
+
+# --------------------------
+# 🔹 Mock backend
+# --------------------------
+def _words(text: str) -> List[str]:
+    return re.findall(r"[a-z0-9']+", (text or "").lower())
+
+
+def _mock_listening(user_prompt: str) -> Dict[str, Any]:
+    match = re.search(r'Correct Answer: "(.*)"\nStudent Answer: "(.*)"', user_prompt, re.DOTALL)
+    correct, answer = (match.group(1), match.group(2)) if match else ("", user_prompt)
+    expected = set(_words(correct))
+    overlap = len(expected & set(_words(answer))) / len(expected) if expected else 0.5
+
+    if overlap >= 0.7:
+        general, score = "correct", round(70 + 25 * overlap)
+    elif overlap >= 0.4:
+        general, score = "partially_correct", round(45 + 30 * overlap)
+    else:
+        general, score = "incorrect", round(40 * overlap)
+    detail = {"score": score, "errors": [], "strengths": []}
+    return {
+        "general": general,
+        "overall_score": score,
+        "details": {"grammar": dict(detail), "vocabulary": dict(detail), "fluency": {"score": score, "issues": [], "strengths": []}},
+        "feedback": f"The answer covers {round(overlap * 100)}% of the key points.",
+        "suggestion": "" if general == "correct" else f"Key points needed: {correct}",
+    }
+
+
+def _mock_speaking(user_prompt: str) -> Dict[str, Any]:
+    transcript = user_prompt.split("Transcript:\n", 1)[-1].strip('"')
+    words = _words(transcript)
+    variety = len(set(words)) / len(words) if words else 0
+    score = min(95, 30 + min(len(words), 120) // 3 + round(variety * 25))
+    cefr = LEVELS[min(len(LEVELS) - 1, max(0, (score - 30) // 13))]
+    evaluation = SpeakingEvaluation(
+        overall_score=score,
+        cefr_level=cefr,
+        grammar={"score": score, "analysis": "Mock grammar assessment"},
+        vocabulary={"score": score, "range_score": round(variety * 100), "precision_score": score},
+        fluency={"score": score, "coherence_score": score, "cohesion_score": score},
+        content={"score": score, "relevance": "Addresses the question directly", "depth": "Adequate"},
+        overall_feedback=f"{len(words)} words, {round(variety * 100)}% unique.",
+        strengths_summary=["Clear main idea"],
+        areas_for_improvement=["Use more linking words"],
+        actionable_suggestions=["Practice connecting ideas with however/therefore"],
+    )
+    return evaluation.model_dump()
+
+
+def _mock_questions(user_prompt: str) -> Dict[str, Any]:
+    count = re.search(r"Generate (\d+)", user_prompt)
+    count = int(count.group(1)) if count else 15
+    title = re.search(r'Title: "(.*?)"', user_prompt)
+    transcript = re.search(r"Transcript: (.*?)\n\s*\n\s*Output strictly", user_prompt, re.DOTALL)
+    sentences = [s.strip() for s in re.split(r"(?<=[.!?])\s+", transcript.group(1) if transcript else "") if len(s.split()) >= 3]
+    sentences = sentences or ["The speaker talks about the topic of the video."]
+
+    questions = []
+    for i in range(count):
+        sentence = sentences[i * len(sentences) // count]
+        level = LEVELS[i * len(LEVELS) // count]
+        topic = " ".join(sentence.split()[:6]).rstrip(".,!?")
+        if level == "C1":
+            question = {"question": f'In your opinion, why does the speaker say "{topic}"?', "answer": ["Student's personal opinion"], "question_type": "opinion"}
+        else:
+            question = {"question": f'What does the speaker say about "{topic}" (part {i + 1})?', "answer": [sentence], "question_type": "factual"}
+        questions.append({"difficulty": level, **question})
+    return {"title": title.group(1) if title else "", "questions": questions}
+
+
+class _MockCompletions:
+    def __init__(self, backend: "MockBackend", is_async: bool):
+        self._backend = backend
+        self._is_async = is_async
+
+    def create(self, **request):
+        if self._is_async:
+            return self._backend._acreate(request)
+        return self._backend._create(request)
+
+
+class _MockClient:
+    """Duck-types the part of OpenAI/AsyncOpenAI used by llm_calls: client.chat.completions.create."""
+
+    def __init__(self, backend: "MockBackend", is_async: bool):
+        self.chat = SimpleNamespace(completions=_MockCompletions(backend, is_async))
+
+
+class MockBackend:
+    """
+    Local stand-in for load tests and benchmarks: no key, no network.
+    Outputs are deterministic per prompt (valid for each call site's parser),
+    latency/failures are sampled from the configured distribution.
+    """
+
+    name = "mock"
+
+    def __init__(
+        self,
+        latency_ms: float = MOCK_LLM_LATENCY_MS,
+        latency_dist: str = MOCK_LLM_LATENCY_DIST,
+        latency_sigma: float = MOCK_LLM_LATENCY_SIGMA,
+        tokens_per_sec: float = MOCK_LLM_TOKENS_PER_SEC,
+        failure_rate: float = MOCK_LLM_FAILURE_RATE,
+        failure_kind: str = MOCK_LLM_FAILURE_KIND,
+        seed: Optional[str] = MOCK_LLM_SEED,
+    ):
+        self.latency_ms = latency_ms
+        self.latency_dist = latency_dist
+        self.latency_sigma = latency_sigma
+        self.tokens_per_sec = tokens_per_sec
+        self.failure_rate = failure_rate
+        self.failure_kind = failure_kind
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.client = _MockClient(self, is_async=False)
+        self.async_client = _MockClient(self, is_async=True)
+
+    # ---- sampling ----
+    def _first_token_delay(self) -> float:
+        with self._lock:
+            if self.latency_dist == "fixed":
+                ms = self.latency_ms
+            elif self.latency_dist == "uniform":
+                ms = self._random.uniform(0, 2 * self.latency_ms)
+            else:
+                # lognormal with the configured mean
+                ms = self._random.lognormvariate(math.log(max(self.latency_ms, 1e-3)) - self.latency_sigma ** 2 / 2, self.latency_sigma)
+        return ms / 1000
+
+    def _should_fail(self) -> bool:
+        with self._lock:
+            return self._random.random() < self.failure_rate
+
+    def _error(self) -> Exception:
+        import httpx
+
+        openai = openai_module()
+        request = httpx.Request("POST", "http://mock-llm/v1/chat/completions")
+        if self.failure_kind == "timeout":
+            return openai.APITimeoutError(request=request)
+        if self.failure_kind == "server_error":
+            return openai.InternalServerError("Injected server error", response=httpx.Response(500, request=request), body=None)
+        return openai.RateLimitError("Injected rate limit", response=httpx.Response(429, request=request), body=None)
+
+    def _generation_delay(self, tokens: int) -> float:
+        return tokens / self.tokens_per_sec if self.tokens_per_sec > 0 else 0.0
+
+    # ---- outputs ----
+    def _content(self, request: Dict[str, Any]) -> str:
+        messages = request.get("messages", [])
+        system = next((m["content"] for m in messages if m["role"] == "system"), "")
+        user = next((m["content"] for m in reversed(messages) if m["role"] == "user"), "")
+        schema_name = (request.get("response_format") or {}).get("json_schema", {}).get("name")
+        if system == LISTENING_SYSTEM_PROMPT:
+            return json.dumps(_mock_listening(user))
+        if system == SPEAKING_SYSTEM_PROMPT or schema_name == "SpeakingEvaluation":
+            return json.dumps(_mock_speaking(user))
+        # repair round-trips: the first user message holds the original prompt
+        prompt = next((m["content"] for m in messages if m["role"] == "user"), "")
+        return json.dumps(_mock_questions(prompt))
+
+    def _response(self, request: Dict[str, Any]):
+        content = self._content(request)
+        model = request.get("model", "mock")
+        prompt_tokens = llm_calls.count_message_tokens(request.get("messages", []), model)
+        completion_tokens = llm_calls.count_tokens(content, model)
+        usage = SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens, total_tokens=prompt_tokens + completion_tokens)
+        return content, usage
+
+    def _chunks(self, content: str, usage, include_usage: bool) -> Iterator[Any]:
+        pieces = re.findall(r"\S*\s*", content)
+        for i in range(0, len(pieces), 4):
+            yield SimpleNamespace(choices=[SimpleNamespace(index=0, delta=SimpleNamespace(content="".join(pieces[i:i + 4])), finish_reason=None)], usage=None)
+        if include_usage:
+            yield SimpleNamespace(choices=[], usage=usage)
+
+    @staticmethod
+    def _completion(content: str, usage, model: str):
+        message = SimpleNamespace(role="assistant", content=content)
+        return SimpleNamespace(
+            id=f"chatcmpl-mock-{uuid.uuid4().hex[:12]}",
+            model=model,
+            choices=[SimpleNamespace(index=0, message=message, finish_reason="stop")],
+            usage=usage,
+        )
+
+    def _create(self, request: Dict[str, Any]):
+        time.sleep(self._first_token_delay())
+        if self._should_fail():
+            raise self._error()
+        content, usage = self._response(request)
+        if request.get("stream"):
+            include_usage = (request.get("stream_options") or {}).get("include_usage", False)
+
+            def stream():
+                for chunk in self._chunks(content, usage, include_usage):
+                    time.sleep(self._generation_delay(4))
+                    yield chunk
+            return stream()
+        time.sleep(self._generation_delay(usage.completion_tokens))
+        return self._completion(content, usage, request.get("model", "mock"))
+
+    async def _acreate(self, request: Dict[str, Any]):
+        await asyncio.sleep(self._first_token_delay())
+        if self._should_fail():
+            raise self._error()
+        content, usage = self._response(request)
+        if request.get("stream"):
+            include_usage = (request.get("stream_options") or {}).get("include_usage", False)
+
+            async def stream() -> AsyncIterator[Any]:
+                for chunk in self._chunks(content, usage, include_usage):
+                    await asyncio.sleep(self._generation_delay(4))
+                    yield chunk
+            return stream()
+        await asyncio.sleep(self._generation_delay(usage.completion_tokens))
+        return self._completion(content, usage, request.get("model", "mock"))
+
+
+# --------------------------
+# 🔹 Selection
+# --------------------------
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def create_backend(name: str = LLM_BACKEND):
+    if name == "mock":
+        return MockBackend()
+    if name == "openai":
+        return OpenAIBackend()
+    raise ValueError(f"Unknown LLM_BACKEND: {name!r} (expected 'openai' or 'mock')")
+
+
+def get_backend():
+    global _backend
+    with _backend_lock:
+        if _backend is None:
+            _backend = create_backend()
+            print(f"🤖 LLM backend: {_backend.name}")
+        return _backend
+
+
+def set_backend(backend) -> None:
+    """Swap the backend at runtime (tests, benchmarks)."""
+    global _backend
+    with _backend_lock:
+        _backend = backend
@@ -0,0 +1,265 @@
+import asyncio
+import math
+import os
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, List, Tuple
+
+from backend.services.metrics import Histogram
+
+try:
+    import tiktoken
+except ImportError:  # optional: fall back to a character-based estimate
+    tiktoken = None
+
+# --------------------------
+# 🔹 Budgets & prices
+# --------------------------
+# (max prompt tokens, max completion tokens) per call site; override with
+# LLM_BUDGET_<NAME>_PROMPT / LLM_BUDGET_<NAME>_COMPLETION
+DEFAULT_BUDGETS: Dict[str, Tuple[int, int]] = {
+    "generate_questions": (6000, 2000),
+    "evaluate_listening": (1500, 1000),
+    "evaluate_speaking": (4000, 2000),
+}
+# USD per 1M tokens (input, output)
+MODEL_PRICES: Dict[str, Tuple[float, float]] = {
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1": (2.00, 8.00),
+}
+# Tokens added per chat message by the chat format
+TOKENS_PER_MESSAGE = 4
+# Fallback estimate when tiktoken is not available
+CHARS_PER_TOKEN = 4
+# Extra prompt tokens a structured-output repair round may use on top of the
+# call site budget: the rejected output (at most the completion budget) is
+# appended, plus this much for the validation error
+REPAIR_PROMPT_ALLOWANCE = int(os.getenv("LLM_REPAIR_PROMPT_ALLOWANCE", "1000"))
+
+
+class TokenBudgetExceeded(Exception):
+    pass
+
+
+def budget_for(name: str) -> Tuple[int, int]:
+    prompt_budget, completion_budget = DEFAULT_BUDGETS.get(name, (16000, 4000))
+    key = f"LLM_BUDGET_{name.upper()}"
+    return (
+        int(os.getenv(f"{key}_PROMPT", prompt_budget)),
+        int(os.getenv(f"{key}_COMPLETION", completion_budget)),
+    )
+
+
+def _price(model: str) -> Tuple[float, float]:
+    if os.getenv("OPENAI_PRICE_INPUT") and os.getenv("OPENAI_PRICE_OUTPUT"):
+        return float(os.getenv("OPENAI_PRICE_INPUT")), float(os.getenv("OPENAI_PRICE_OUTPUT"))
+    # longest matching prefix, e.g. "gpt-4o-mini-2024-07-18" -> "gpt-4o-mini"
+    for name in sorted(MODEL_PRICES, key=len, reverse=True):
+        if model.startswith(name):
+            return MODEL_PRICES[name]
+    return 0.0, 0.0
+
+
+# --------------------------
+# 🔹 Local token counting
+# --------------------------
+_encodings: Dict[str, Any] = {}
+_encodings_lock = threading.Lock()
+
+
+def _encoding(model: str):
+    """Blocking on first use: tiktoken may download the BPE file. Async callers go through _aprepare."""
+    if tiktoken is None:
+        return None
+    if model not in _encodings:
+        with _encodings_lock:
+            if model not in _encodings:
+                try:
+                    _encodings[model] = tiktoken.encoding_for_model(model)
+                except KeyError:
+                    _encodings[model] = tiktoken.get_encoding("o200k_base")
+                except Exception:  # e.g. BPE file cannot be downloaded
+                    _encodings[model] = None
+    return _encodings[model]
+
+
+def warm_encoding(model: str) -> None:
+    """Load the tokenizer ahead of the first call (run in a thread at startup)."""
+    _encoding(model)
+
+
+def count_tokens(text: str, model: str = "gpt-4o-mini") -> int:
+    encoding = _encoding(model)
+    if encoding is None:
+        return math.ceil(len(text or "") / CHARS_PER_TOKEN)
+    return len(encoding.encode(text or "", disallowed_special=()))
+
+
+def split_tokens(text: str, max_tokens: int, model: str = "gpt-4o-mini") -> List[str]:
+    """Cut text into consecutive pieces of at most max_tokens each."""
+    encoding = _encoding(model)
+    if encoding is None:
+        step = max_tokens * CHARS_PER_TOKEN
+        return [text[i:i + step] for i in range(0, len(text or ""), step)]
+    tokens = encoding.encode(text or "", disallowed_special=())
+    return [encoding.decode(tokens[i:i + max_tokens]) for i in range(0, len(tokens), max_tokens)]
+
+
+def truncate_tokens(text: str, max_tokens: int, model: str = "gpt-4o-mini") -> str:
+    """First max_tokens tokens of text (text itself when it already fits)."""
+    if count_tokens(text, model) <= max_tokens:
+        return text
+    pieces = split_tokens(text, max_tokens, model)
+    return pieces[0] if pieces else ""
+
+
+def count_message_tokens(messages: List[Dict[str, Any]], model: str = "gpt-4o-mini") -> int:
+    return sum(TOKENS_PER_MESSAGE + count_tokens(str(m.get("content") or ""), model) for m in messages) + 3
+
+
+# --------------------------
+# 🔹 Metrics
+# --------------------------
+TOKEN_BUCKETS = [50, 100, 250, 500, 1000, 2000, 4000, 8000, 16000]
+LATENCY_BUCKETS_MS = [100, 250, 500, 1000, 2000, 4000, 8000, 15000, 30000, 60000]
+COST_BUCKETS_USD = [0.00001, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05]
+
+_lock = threading.Lock()
+_metrics: Dict[str, Dict[str, Any]] = {}
+
+
+def _metric(name: str) -> Dict[str, Any]:
+    if name not in _metrics:
+        _metrics[name] = {
+            "calls": 0,
+            "errors": 0,
+            "budget_rejections": 0,
+            "prompt_tokens_estimated": Histogram(TOKEN_BUCKETS),
+            "prompt_tokens": Histogram(TOKEN_BUCKETS),
+            "completion_tokens": Histogram(TOKEN_BUCKETS),
+            "latency_ms": Histogram(LATENCY_BUCKETS_MS),
+            "cost_usd": Histogram(COST_BUCKETS_USD),
+        }
+    return _metrics[name]
+
+
+def _prepare(name: str, request: Dict[str, Any], repair: bool = False) -> int:
+    """
+    Count prompt tokens locally, enforce the budget and cap max_tokens. Returns the estimate.
+    A repair round (rejected output + error appended) gets REPAIR_PROMPT_ALLOWANCE
+    plus the completion budget on top of the prompt budget.
+    """
+    model = request.get("model", "")
+    prompt_budget, completion_budget = budget_for(name)
+    if repair:
+        prompt_budget += completion_budget + REPAIR_PROMPT_ALLOWANCE
+    estimated = count_message_tokens(request.get("messages", []), model)
+    if estimated > prompt_budget:
+        with _lock:
+            _metric(name)["budget_rejections"] += 1
+        raise TokenBudgetExceeded(f"{name}: prompt is ~{estimated} tokens, budget is {prompt_budget}")
+    request["max_tokens"] = min(request.get("max_tokens") or completion_budget, completion_budget)
+    return estimated
+
+
+async def _aprepare(name: str, request: Dict[str, Any], repair: bool = False) -> int:
+    # a tokenizer that is not loaded yet is loaded in a thread, not on the event loop
+    if tiktoken is not None and request.get("model", "") not in _encodings:
+        await asyncio.to_thread(_encoding, request.get("model", ""))
+    return _prepare(name, request, repair)
+
+
+def _record(name: str, model: str, estimated: int, usage: Any, started: float, failed: bool = False) -> None:
+    latency_ms = (time.perf_counter() - started) * 1000
+    with _lock:
+        m = _metric(name)
+        m["calls"] += 1
+        m["prompt_tokens_estimated"].observe(estimated)
+        m["latency_ms"].observe(latency_ms)
+        if failed:
+            m["errors"] += 1
+            return
+        if usage is not None:
+            prompt_tokens = getattr(usage, "prompt_tokens", 0) or 0
+            completion_tokens = getattr(usage, "completion_tokens", 0) or 0
+            input_price, output_price = _price(model)
+            m["prompt_tokens"].observe(prompt_tokens)
+            m["completion_tokens"].observe(completion_tokens)
+            m["cost_usd"].observe((prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000)
+
+
+# --------------------------
+# 🔹 Call wrappers
+# --------------------------
+def chat(name: str, client, *, repair: bool = False, **request):
+    """client.chat.completions.create with token budget + metrics (repair=True for a repair round)."""
+    estimated = _prepare(name, request, repair)
+    started = time.perf_counter()
+    try:
+        resp = client.chat.completions.create(**request)
+    except Exception:
+        _record(name, request.get("model", ""), estimated, None, started, failed=True)
+        raise
+    _record(name, request.get("model", ""), estimated, getattr(resp, "usage", None), started)
+    return resp
+
+
+async def achat(name: str, client, *, repair: bool = False, **request):
+    """Async variant of chat() for AsyncOpenAI clients."""
+    estimated = await _aprepare(name, request, repair)
+    started = time.perf_counter()
+    try:
+        resp = await client.chat.completions.create(**request)
+    except Exception:
+        _record(name, request.get("model", ""), estimated, None, started, failed=True)
+        raise
+    _record(name, request.get("model", ""), estimated, getattr(resp, "usage", None), started)
+    return resp
+
+
+async def achat_stream(name: str, client, **request) -> AsyncIterator[Any]:
+    """Streaming variant: yields chunks; usage is taken from the final chunk."""
+    estimated = await _aprepare(name, request)
+    request["stream"] = True
+    request.setdefault("stream_options", {"include_usage": True})
+    started = time.perf_counter()
+    usage = None
+    try:
+        stream = await client.chat.completions.create(**request)
+        async for chunk in stream:
+            if getattr(chunk, "usage", None) is not None:
+                usage = chunk.usage
+            yield chunk
+    except Exception:
+        _record(name, request.get("model", ""), estimated, None, started, failed=True)
+        raise
+    _record(name, request.get("model", ""), estimated, usage, started)
+
+
+def metrics_snapshot() -> Dict[str, Any]:
+    with _lock:
+        return {
+            name: {key: (value.snapshot() if isinstance(value, Histogram) else value) for key, value in m.items()}
+            for name, m in _metrics.items()
+        }
+
+
+def prometheus_text() -> str:
+    lines = []
+    with _lock:
+        for name, m in _metrics.items():
+            for key, value in m.items():
+                metric = f"llm_{key}"
+                if isinstance(value, Histogram):
+                    cumulative = 0
+                    for bound, n in zip(value.buckets + [math.inf], value.counts):
+                        cumulative += n
+                        le = "+Inf" if bound == math.inf else bound
+                        lines.append(f'{metric}_bucket{{call="{name}",le="{le}"}} {cumulative}')
+                    lines.append(f'{metric}_sum{{call="{name}"}} {value.sum}')
+                    lines.append(f'{metric}_count{{call="{name}"}} {value.count}')
+                else:
+                    lines.append(f'{metric}_total{{call="{name}"}} {value}')
+    return "\n".join(lines) + "\n"
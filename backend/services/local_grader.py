@@ -0,0 +1,171 @@
+import re
+import unicodedata
+from typing import Any, Dict, List, Optional
+
+# --------------------------
+# 🔹 Config
+# --------------------------
+# Question types whose answers need real judgement -> always sent to the model
+OPEN_ENDED_TYPES = {"open_ended", "opinion", "analysis", "inference", "personal"}
+# Expected points longer than this are treated as sentences, not keywords
+MAX_KEYWORD_TOKENS = 4
+# Student answers longer than this are considered elaborated -> model
+MAX_ANSWER_TOKENS = 12
+# Typos tolerated per word: 15% of its length, at least 1 edit from
+# MIN_FUZZY_WORD_LEN characters up ('Georg' ~ 'George'); shorter words must match exactly
+TYPO_RATIO = 0.15
+MIN_FUZZY_WORD_LEN = 4
+
+STOPWORDS = {
+    "a", "an", "the", "is", "are", "was", "were", "it", "its", "his", "her", "their",
+    "he", "she", "they", "to", "of", "in", "on", "at", "and", "or", "name", "called",
+}
+TRUE_WORDS = {"true", "yes", "correct", "right"}
+FALSE_WORDS = {"false", "no", "incorrect", "wrong"}
+# Answers containing these (unless the expected answer does) may mean the
+# opposite of their keywords or name several candidates -> model
+NEGATION_WORDS = {"not", "no", "never", "none", "nobody", "nothing", "neither", "nor", "without"}
+HEDGE_WORDS = {"or", "maybe", "perhaps", "probably", "either", "unless", "except", "but", "might"}
+
+_stats = {"local": 0, "escalated": 0}
+
+
+def normalize(text: str) -> str:
+    text = unicodedata.normalize("NFKD", str(text or "")).encode("ascii", "ignore").decode("ascii")
+    text = re.sub(r"[^\w\s']", " ", text.lower())
+    return " ".join(text.split())
+
+
+def _tokens(text: str) -> List[str]:
+    return [t for t in normalize(text).split() if t not in STOPWORDS]
+
+
+def levenshtein(a: str, b: str, max_distance: Optional[int] = None) -> int:
+    """Edit distance with an optional early exit once max_distance is exceeded."""
+    if a == b:
+        return 0
+    if len(a) < len(b):
+        a, b = b, a
+    if max_distance is not None and len(a) - len(b) > max_distance:
+        return max_distance + 1
+    previous = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        current = [i]
+        for j, cb in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ca != cb)))
+        if max_distance is not None and min(current) > max_distance:
+            return max_distance + 1
+        previous = current
+    return previous[-1]
+
+
+def _typo_budget(word: str) -> int:
+    if len(word) < MIN_FUZZY_WORD_LEN:
+        return 0
+    return max(1, int(len(word) * TYPO_RATIO))
+
+
+def _word_matches(expected: str, given: str) -> bool:
+    if expected == given:
+        return True
+    budget = _typo_budget(expected)
+    return budget > 0 and levenshtein(expected, given, budget) <= budget
+
+
+def _qualifiers(words: List[str]) -> set:
+    """Negation / alternative markers of an answer (e.g. 'not', "didn't", 'or')."""
+    return {w for w in words if w in NEGATION_WORDS or w in HEDGE_WORDS or w.endswith("n't")}
+
+
+def _result(general: str, score: int, feedback: str, suggestion: str = "") -> Dict[str, Any]:
+    """Same shape as ai_evaluate_listening so the router formats it unchanged."""
+    return {
+        "general": general,
+        "overall_score": score,
+        "details": {
+            "grammar": {"score": score, "errors": [], "strengths": []},
+            "vocabulary": {"score": score, "errors": [], "strengths": []},
+            "fluency": {"score": score, "issues": [], "strengths": []},
+        },
+        "feedback": feedback,
+        "suggestion": suggestion,
+        "graded_by": "local",
+    }
+
+
+def pre_grade(question: Dict[str, Any], user_answer: str) -> Optional[Dict[str, Any]]:
+    """
+    Deterministic grading for short factual answers.
+    Returns an evaluator-shaped result, or None when the answer is ambiguous
+    or the question is open-ended and must go to the model.
+    """
+    result = _pre_grade(question, user_answer)
+    _stats["local" if result is not None else "escalated"] += 1
+    return result
+
+
+def _pre_grade(question: Dict[str, Any], user_answer: str) -> Optional[Dict[str, Any]]:
+    points = question.get("expected_answer_points") or []
+    if not isinstance(points, list):
+        points = [str(points)]
+    points = [p for p in points if normalize(p)]
+    if not points or str(question.get("question_type", "")).lower() in OPEN_ENDED_TYPES:
+        return None
+    if any("opinion" in normalize(p) for p in points):
+        return None
+
+    answer = normalize(user_answer)
+    if not answer:
+        return _result("incorrect", 0, "No answer was given.", f"Key points needed: {', '.join(points)}")
+
+    answer_words = answer.split()
+    if len(answer_words) > MAX_ANSWER_TOKENS:
+        return None
+    # "not George", "Peppa or George", "yes that is not right": the keywords are
+    # there but the meaning is not -> only the model can tell
+    expected_words = {w for p in points for w in normalize(p).split()}
+    qualifiers = _qualifiers(answer_words) - expected_words
+
+    # True/false: only a bare yes/no ("true", "yes it is true") is graded locally
+    if len(points) == 1 and normalize(points[0]) in TRUE_WORDS | FALSE_WORDS:
+        expected_true = normalize(points[0]) in TRUE_WORDS
+        answer_tokens = set(_tokens(answer))
+        if not answer_tokens or qualifiers - FALSE_WORDS:
+            return None
+        if answer_tokens <= TRUE_WORDS:
+            said_true = True
+        elif answer_tokens <= FALSE_WORDS:
+            said_true = False
+        else:
+            return None
+        if said_true == expected_true:
+            return _result("correct", 100, "Correct!")
+        return _result("incorrect", 0, "That is the opposite of what the recording says.", f"The answer is: {points[0]}")
+
+    if qualifiers:
+        return None
+
+    point_tokens = []
+    for point in points:
+        tokens = _tokens(point)
+        if not tokens or len(normalize(point).split()) > MAX_KEYWORD_TOKENS:
+            return None
+        point_tokens.append(tokens)
+    answer_tokens = _tokens(answer)
+
+    # Near-exact only: every expected word is in the answer and the answer has
+    # nothing else (extra content may contradict or change the answer)
+    all_point_tokens = [pt for tokens in point_tokens for pt in tokens]
+    if not answer_tokens or any(not any(_word_matches(pt, at) for pt in all_point_tokens) for at in answer_tokens):
+        return None
+    if any(not any(_word_matches(pt, at) for at in answer_tokens) for pt in all_point_tokens):
+        # Partial overlap could still be a valid paraphrase -> let the model decide
+        return None
+
+    if all(pt in answer_tokens for pt in all_point_tokens):
+        return _result("correct", 100, "Correct!")
+    return _result("correct", 90, "Correct! Check the spelling of the key words.", f"Expected answer: {', '.join(points)}")
+
+
+def grader_stats() -> Dict[str, int]:
+    return dict(_stats)
@@ -0,0 +1,42 @@
+import math
+from bisect import bisect_left
+from typing import Any, Dict, List, Optional
+
+
+class Histogram:
+    """Fixed-bucket histogram (Prometheus style: cumulative le buckets)."""
+
+    def __init__(self, buckets: List[float]):
+        self.buckets = sorted(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-quantile."""
+        if not self.count:
+            return None
+        rank, seen = q * self.count, 0
+        for bound, n in zip(self.buckets + [math.inf], self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return math.inf
+
+    def snapshot(self) -> Dict[str, Any]:
+        cumulative, buckets = 0, {}
+        for bound, n in zip(self.buckets + [math.inf], self.counts):
+            cumulative += n
+            buckets["+Inf" if bound == math.inf else str(bound)] = cumulative
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "buckets": buckets,
+        }
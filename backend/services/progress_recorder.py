@@ -0,0 +1,295 @@
+import asyncio
+import logging
+import os
+import threading
+import uuid
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from backend import models
+from backend.database import SessionLocal
+
+logger = logging.getLogger("api_debug")
+
+# --------------------------
+# 🔹 Config
+# --------------------------
+PROGRESS_FLUSH_SIZE = int(os.getenv("PROGRESS_FLUSH_SIZE", "200"))  # flush early once this many rows are queued
+PROGRESS_FLUSH_INTERVAL = float(os.getenv("PROGRESS_FLUSH_INTERVAL", "2"))  # seconds
+PROGRESS_MAX_PENDING = int(os.getenv("PROGRESS_MAX_PENDING", "10000"))  # oldest rows dropped beyond this while the DB is down
+
+SummaryKey = Tuple[str, str, str]  # (user_id, exercise_id, cefr_level)
+
+# progress ids for client submission ids are derived per user, so two users
+# sending the same submission_id ("1", a per-client counter...) never collide
+PROGRESS_ID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "english-buddy/user_listening_progress")
+
+
+def progress_id_for(user_id: Optional[str], submission_id: str) -> str:
+    return str(uuid.uuid5(PROGRESS_ID_NAMESPACE, f"{user_id or ''}:{submission_id}"))
+
+
+def _level(result: Dict[str, Any]) -> str:
+    level = str(result.get("level") or "").upper()
+    return level[:8] if level else "NA"
+
+
+def _aggregate(rows: List[Dict[str, Any]]) -> Dict[SummaryKey, Dict[str, Any]]:
+    """Fold graded answers of the flushed rows into one summary delta per key (anonymous rows are skipped)."""
+    deltas: Dict[SummaryKey, Dict[str, Any]] = {}
+    for row in rows:
+        if not row["user_id"]:
+            continue
+        for result in row["results"]:
+            if "error" in result:
+                continue
+            key = (row["user_id"], row["exercise_id"], _level(result))
+            score = int(result.get("score") or 0)
+            delta = deltas.setdefault(key, {
+                "user_id": key[0], "exercise_id": key[1], "cefr_level": key[2],
+                "attempts": 0, "total_score": 0, "best_score": 0, "last_submitted_at": row["submitted_at"],
+            })
+            delta["attempts"] += 1
+            delta["total_score"] += score
+            delta["best_score"] = max(delta["best_score"], score)
+            delta["last_submitted_at"] = max(delta["last_submitted_at"], row["submitted_at"])
+    return deltas
+
+
+def _upsert_summaries(db, deltas: Dict[SummaryKey, Dict[str, Any]]) -> None:
+    if not deltas:
+        return
+    table = models.UserProgressSummary
+    values = list(deltas.values())
+    dialect = db.get_bind().dialect.name
+
+    if dialect == "mysql":
+        stmt = mysql_insert(table).values(values)
+        db.execute(stmt.on_duplicate_key_update(
+            attempts=table.attempts + stmt.inserted.attempts,
+            total_score=table.total_score + stmt.inserted.total_score,
+            best_score=func.greatest(table.best_score, stmt.inserted.best_score),
+            last_submitted_at=func.greatest(table.last_submitted_at, stmt.inserted.last_submitted_at),
+        ))
+    elif dialect == "sqlite":
+        stmt = sqlite_insert(table).values(values)
+        db.execute(stmt.on_conflict_do_update(
+            index_elements=[table.user_id, table.exercise_id, table.cefr_level],
+            set_={
+                "attempts": table.attempts + stmt.excluded.attempts,
+                "total_score": table.total_score + stmt.excluded.total_score,
+                "best_score": func.max(table.best_score, stmt.excluded.best_score),
+                "last_submitted_at": func.max(table.last_submitted_at, stmt.excluded.last_submitted_at),
+            },
+        ))
+    else:
+        # portable fallback: one read-modify-write per key
+        for key, delta in deltas.items():
+            summary = db.get(table, key, with_for_update=True)
+            if summary is None:
+                db.add(table(**delta))
+                continue
+            summary.attempts += delta["attempts"]
+            summary.total_score += delta["total_score"]
+            summary.best_score = max(summary.best_score, delta["best_score"])
+            summary.last_submitted_at = max(filter(None, [summary.last_submitted_at, delta["last_submitted_at"]]))
+
+
+class ProgressRecorder:
+    """
+    Buffers evaluation results and writes them in bulk: one multi-row insert
+    into user_listening_progress plus one upsert into user_progress_summary
+    per flush. Flushes every PROGRESS_FLUSH_INTERVAL seconds or as soon as
+    PROGRESS_FLUSH_SIZE rows are queued, and once more on shutdown.
+
+    Recording is best-effort: rows still buffered when the process dies are
+    lost, and rows the database rejects (e.g. an unknown user_id) are dropped.
+    Flushes are idempotent on the progress id, so a retried batch or a
+    resubmitted client submission_id is never counted twice.
+    """
+
+    def __init__(self, session_factory=SessionLocal, flush_size: int = PROGRESS_FLUSH_SIZE, flush_interval: float = PROGRESS_FLUSH_INTERVAL):
+        self._session_factory = session_factory
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self._pending: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stats = {"recorded": 0, "written": 0, "duplicates": 0, "flushes": 0, "dropped": 0}
+
+    def record(self, user_id: Optional[str], exercise_id: str, results: List[Dict[str, Any]], submission_id: Optional[str] = None) -> str:
+        """
+        Queue one submission (results carry question_id, level, score...).
+        submission_id is an optional client-generated key (idempotency per
+        user); returns the id the row will have once flushed.
+        """
+        graded = [r for r in results if "error" not in r]
+        row = {
+            "id": progress_id_for(user_id, submission_id) if submission_id else str(uuid.uuid4()),
+            "user_id": user_id,
+            "exercise_id": exercise_id,
+            "score": round(sum(r.get("score", 0) for r in graded) / len(graded)) if graded else 0,
+            "results": results,
+            "submitted_at": datetime.now(timezone.utc),
+        }
+        with self._lock:
+            self._pending.append(row)
+            self._stats["recorded"] += 1
+            full = len(self._pending) >= self.flush_size
+        if full and self._loop is not None:
+            self._loop.call_soon_threadsafe(self._wakeup.set)
+        return row["id"]
+
+    def _write(self, rows: List[Dict[str, Any]]) -> int:
+        """Insert the rows not stored yet and add only those to the summaries. Returns how many were new."""
+        Progress = models.UserListeningProgress
+        with self._session_factory() as db:
+            # a batch retried after a commit that did succeed (or a resubmitted
+            # submission_id) is already there: skip it instead of counting it twice
+            stored = set(db.execute(select(Progress.id).where(Progress.id.in_({r["id"] for r in rows}))).scalars())
+            new_rows = []
+            for r in rows:
+                if r["id"] not in stored:
+                    stored.add(r["id"])  # the same submission queued twice in one batch
+                    new_rows.append(r)
+            if new_rows:
+                db.execute(insert(Progress), new_rows)
+                _upsert_summaries(db, _aggregate(new_rows))
+            db.commit()
+            return len(new_rows)
+
+    def flush(self) -> int:
+        """Write everything queued so far (blocking). Returns the number of rows written."""
+        with self._flush_lock:
+            with self._lock:
+                rows, self._pending = self._pending, []
+            if not rows:
+                return 0
+
+            dropped = 0
+            written = 0
+            try:
+                written = self._write(rows)
+            except IntegrityError as e:
+                # e.g. an unknown user_id or the same id twice: keep the valid rows, drop the offending ones
+                logger.warning("⚠️ Progress bulk insert rejected (%s), retrying row by row", e.orig)
+                for i, row in enumerate(rows):
+                    try:
+                        written += self._write([row])
+                    except IntegrityError as row_err:
+                        dropped += 1
+                        logger.error("❌ Dropping progress row %s: %s", row["id"], row_err.orig)
+                    except SQLAlchemyError as row_err:
+                        # DB went away mid-retry: keep this row and the ones not tried yet
+                        logger.error("❌ Progress flush failed, will retry: %s", row_err)
+                        self._requeue(rows[i:])
+                        self._count(written, dropped, duplicates=i - written - dropped)
+                        return written
+            except SQLAlchemyError as e:
+                logger.error("❌ Progress flush failed, will retry: %s", e)
+                self._requeue(rows)
+                return 0
+
+            self._count(written, dropped, duplicates=len(rows) - written - dropped)
+            return written
+
+    def _requeue(self, rows: List[Dict[str, Any]]) -> None:
+        """Put unwritten rows back in front of the queue, dropping the oldest beyond PROGRESS_MAX_PENDING."""
+        with self._lock:
+            self._pending[:0] = rows
+            overflow = len(self._pending) - PROGRESS_MAX_PENDING
+            if overflow > 0:
+                del self._pending[:overflow]
+                self._stats["dropped"] += overflow
+
+    def _count(self, written: int, dropped: int, duplicates: int) -> None:
+        with self._lock:
+            self._stats["flushes"] += 1
+            self._stats["written"] += written
+            self._stats["dropped"] += dropped
+            self._stats["duplicates"] += duplicates
+
+    async def _flush_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await asyncio.to_thread(self.flush)
+            except Exception as e:
+                # never let one bad flush stop recording for the rest of the process
+                logger.exception("❌ Progress flush loop error: %r", e)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._loop = asyncio.get_running_loop()
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._flush_loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+            self._loop = None
+        await asyncio.to_thread(self.flush)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._stats, "pending": len(self._pending)}
+
+
+progress_recorder = ProgressRecorder()
+
+
+# --------------------------
+# 🔹 Read side
+# --------------------------
+def _totals(rows) -> Dict[str, Any]:
+    attempts = sum(r.attempts for r in rows)
+    return {
+        "attempts": attempts,
+        "average_score": round(sum(r.total_score for r in rows) / attempts, 1) if attempts else 0.0,
+        "best_score": max((r.best_score for r in rows), default=0),
+    }
+
+
+def user_progress(db, user_id: str) -> Dict[str, Any]:
+    """Dashboard view built from user_progress_summary only (no history scan)."""
+    table = models.UserProgressSummary
+    rows = db.execute(select(table).where(table.user_id == user_id)).scalars().all()
+
+    by_level: Dict[str, list] = {}
+    by_exercise: Dict[str, list] = {}
+    for row in rows:
+        by_level.setdefault(row.cefr_level, []).append(row)
+        by_exercise.setdefault(row.exercise_id, []).append(row)
+
+    exercises = [
+        {
+            "exercise_id": exercise_id,
+            **_totals(group),
+            "last_submitted_at": max((r.last_submitted_at for r in group if r.last_submitted_at), default=None),
+            "levels": {r.cefr_level: _totals([r]) for r in sorted(group, key=lambda r: r.cefr_level)},
+        }
+        for exercise_id, group in by_exercise.items()
+    ]
+    # most recently practised first
+    exercises.sort(key=lambda e: (e["last_submitted_at"] is not None, e["last_submitted_at"] or 0), reverse=True)
+
+    return {
+        "user_id": user_id,
+        **_totals(rows),
+        "by_level": {level: _totals(group) for level, group in sorted(by_level.items())},
+        "exercises": exercises,
+    }
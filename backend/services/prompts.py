@@ -0,0 +1,159 @@
+import hashlib
+from typing import Dict
+
+# --------------------------
+# 🔹 Prompt templates
+# --------------------------
+# NOTE: prefix caching only starts at 1024 prompt tokens (OpenAI). The
+# listening prefix (LISTENING_SYSTEM_PROMPT, ~270 tokens) is below that, so
+# the listening layout below gets no cache hits today: it only keeps the
+# prefix stable for when the rubric grows. The speaking prefix (~900 tokens
+# plus its json_schema response_format) sits around the limit. Padding a
+# prefix just to reach 1024 tokens costs more than the cached-input discount
+# saves, so none is added.
+#
+# Each evaluator prompt is split into a STATIC prefix (system message: role,
+# rubric, JSON schema, examples) and a short VARIABLE suffix (user message).
+# Providers cache identical leading tokens, so everything that never changes
+# must come first and must stay byte-identical between calls: never format
+# request data into the *_SYSTEM_PROMPT constants (backend/tests/test_prompts.py
+# checks the serialized request prefix of every call site).
+#
+# Bump the version whenever a template changes; the versions are part of the
+# evaluation cache keys.
+
+LISTENING_PROMPT_VERSION = "listening-v2"
+SPEAKING_PROMPT_VERSION = "speaking-v3"
+
+LISTENING_SYSTEM_PROMPT = """You are a professional English listening evaluator and ESL teacher checking a student's listening answer. You output ONLY valid JSON. Do not use Markdown formatting.
+
+The user message contains the Correct Answer (the key points from the recording) and the Student Answer.
+
+Task 1: Compare the semantic meaning. Does the Student's Answer convey the same meaning as the Correct Answer?
+Task 2: Check grammar and vocabulary accuracy.
+
+Output strictly valid JSON format:
+{
+    "general": "correct" (meaning matches) | "partially_correct" | "incorrect" (meaning wrong),
+    "overall_score": 0-100 (If incorrect meaning, max score is 40. If correct meaning but bad grammar, score 60-90),
+    "details": {
+        "grammar": { "score": 0-100, "errors": [], "strengths": [] },
+        "vocabulary": { "score": 0-100, "errors": [], "strengths": [] },
+        "fluency": { "score": 0-100, "issues": [], "strengths": [] }
+    },
+    "feedback": "Short feedback focusing on why it is correct/incorrect.",
+    "suggestion": "How to improve the answer or the correct phrasing."
+}
+"""
+
+SPEAKING_SYSTEM_PROMPT = """You are an expert English speaking examiner specializing in ESL evaluation, with expertise in detailed linguistic analysis.
+
+The user message contains a student's spoken response transcribed to text, optionally preceded by the question being answered.
+Evaluate this spoken transcript comprehensively across multiple dimensions.
+
+Provide detailed evaluation in these areas:
+
+1. **Grammar (0-100)**:
+   - Sentence structure complexity and accuracy
+   - Verb tense consistency
+   - Subject-verb agreement
+   - Use of articles, prepositions, conjunctions
+   - Identify specific errors and strengths
+
+2. **Vocabulary (0-100)**:
+   - Range (variety of words used)
+   - Precision (appropriate word choice)
+   - Sophistication (use of advanced vocabulary)
+   - Collocations and idioms
+   - Identify specific errors and strengths
+
+3. **Fluency (0-100)**:
+   - Coherence and logical flow
+   - Use of linking words
+   - Natural speech patterns
+   - Completeness of ideas
+   - Identify any issues and strengths
+
+4. **Pronunciation hints** (based on written patterns that suggest pronunciation issues)
+
+5. **Content quality** (relevance, depth, elaboration)
+
+Return strictly valid JSON:
+{
+    "overall_score": 0-100,
+    "cefr_level": "A1" | "A2" | "B1" | "B2" | "C1" | "C2",
+    "grammar": {
+        "score": 0-100,
+        "errors": [
+            {"type": "tense", "example": "I go yesterday", "correction": "I went yesterday"},
+            {"type": "article", "example": "I am teacher", "correction": "I am a teacher"}
+        ],
+        "strengths": ["Uses complex sentences effectively", "Good control of past tense"],
+        "analysis": "Brief overall assessment"
+    },
+    "vocabulary": {
+        "score": 0-100,
+        "range_score": 0-100,
+        "precision_score": 0-100,
+        "errors": [
+            {"word": "do homework", "context": "I do my homework", "suggestion": "complete/finish homework"},
+            {"word": "very good", "context": "It was very good", "suggestion": "excellent/outstanding"}
+        ],
+        "strengths": ["Uses topic-specific vocabulary", "Good use of collocations"],
+        "advanced_words_used": ["sophisticated", "furthermore", "consequently"],
+        "analysis": "Brief overall assessment"
+    },
+    "fluency": {
+        "score": 0-100,
+        "coherence_score": 0-100,
+        "cohesion_score": 0-100,
+        "issues": ["Lacks transition between ideas", "Incomplete sentence at the end"],
+        "strengths": ["Logical progression", "Clear main idea"],
+        "linking_words_used": ["however", "therefore", "additionally"],
+        "analysis": "Brief overall assessment"
+    },
+    "pronunciation_hints": [
+        "Possible issue with 'th' sounds based on spelling patterns",
+        "May need to work on word stress for multi-syllable words"
+    ],
+    "content": {
+        "score": 0-100,
+        "relevance": "Addresses the question directly/partially/not at all",
+        "depth": "Superficial/Adequate/Detailed analysis",
+        "comments": "Brief assessment of content quality"
+    },
+    "overall_feedback": "Comprehensive 2-3 sentence summary of performance",
+    "strengths_summary": ["Main strength 1", "Main strength 2"],
+    "areas_for_improvement": ["Priority area 1", "Priority area 2"],
+    "actionable_suggestions": [
+        "Practice using past perfect tense for completed actions",
+        "Expand vocabulary by learning synonyms for common words",
+        "Use more linking words to connect ideas smoothly"
+    ]
+}
+
+SCORING RUBRIC:
+- 90-100: Near-native or C2 level
+- 80-89: Advanced (C1)
+- 70-79: Upper-intermediate (B2)
+- 60-69: Intermediate (B1)
+- 50-59: Pre-intermediate (A2)
+- 0-49: Beginner (A1)
+"""
+
+
+def listening_user_prompt(correct_answer: str, user_answer: str) -> str:
+    return f'Correct Answer: "{correct_answer}"\nStudent Answer: "{user_answer}"'
+
+
+def speaking_user_prompt(transcript: str, question: str = "") -> str:
+    question_context = f"Question being answered: {question}\n" if question else ""
+    return f'{question_context}Transcript:\n"{transcript}"'
+
+
+def prefix_fingerprints() -> Dict[str, str]:
+    """sha256 of every static prefix, e.g. to check that it did not drift between deploys."""
+    return {
+        LISTENING_PROMPT_VERSION: hashlib.sha256(LISTENING_SYSTEM_PROMPT.encode("utf-8")).hexdigest(),
+        SPEAKING_PROMPT_VERSION: hashlib.sha256(SPEAKING_SYSTEM_PROMPT.encode("utf-8")).hexdigest(),
+    }
@@ -0,0 +1,178 @@
+import asyncio
+import math
+import os
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from backend.services import llm_calls
+from backend.services.ai_service import MAX_TRANSCRIPT_TOKENS, MODEL, generate_comprehension_questions_async
+from backend.services.transcript_segments import TranscriptSegments
+
+# --------------------------
+# 🔹 Config
+# --------------------------
+# windows are measured with the same token counter as the llm_calls budgets
+QUESTION_WINDOW_TOKENS = int(os.getenv("QUESTION_WINDOW_TOKENS", str(MAX_TRANSCRIPT_TOKENS)))
+QUESTION_MAX_PARALLEL_WINDOWS = int(os.getenv("QUESTION_MAX_PARALLEL_WINDOWS", "6"))
+TARGET_QUESTIONS = int(os.getenv("TARGET_QUESTIONS", "20"))
+LEVELS = ["A1", "A2", "B1", "B2", "C1"]
+DUPLICATE_THRESHOLD = 0.7
+
+# (start_seconds, end_seconds, text); times are None for windows cut from plain text
+Window = Tuple[Optional[float], Optional[float], str]
+
+
+def _tokens(text: str) -> int:
+    return llm_calls.count_tokens(text, MODEL)
+
+
+# --------------------------
+# 🔹 Split
+# --------------------------
+def _cut_sentence(sentence: str, max_tokens: int) -> List[str]:
+    """Cut a sentence longer than max_tokens by words (a single huge word by tokens)."""
+    pieces, current, size = [], "", 0
+    for word in sentence.split(" "):
+        tokens = _tokens(word)
+        if tokens > max_tokens:
+            if current:
+                pieces.append(current)
+            *head, current = llm_calls.split_tokens(word, max_tokens, MODEL)
+            pieces.extend(head)
+            size = _tokens(current)
+        elif current and size + 1 + tokens > max_tokens:
+            pieces.append(current)
+            current, size = word, tokens
+        else:
+            current = f"{current} {word}".strip()
+            size += tokens + (1 if size else 0)
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def split_text_windows(transcript: str, max_tokens: int = QUESTION_WINDOW_TOKENS) -> List[Window]:
+    """Pack whole sentences into windows of at most max_tokens (a single huge sentence is cut by words)."""
+    sentences = re.split(r"(?<=[.!?])\s+|\n+", transcript or "")
+    windows, current, size = [], "", 0
+    for sentence in (" ".join(s.split()) for s in sentences):
+        if not sentence:
+            continue
+        for piece in ([sentence] if _tokens(sentence) <= max_tokens else _cut_sentence(sentence, max_tokens)):
+            tokens = _tokens(piece)
+            if current and size + 1 + tokens > max_tokens:
+                windows.append(current)
+                current, size = "", 0
+            current = f"{current} {piece}".strip()
+            size += tokens + (1 if size else 0)
+    if current:
+        windows.append(current)
+    return [(None, None, w) for w in windows]
+
+
+def split_segment_windows(segments: TranscriptSegments, max_tokens: int = QUESTION_WINDOW_TOKENS) -> List[Window]:
+    """Pack consecutive timed segments into windows, keeping each window's time range."""
+    windows, start, texts, size = [], 0, [], 0
+    for i, text in enumerate(segments.texts):
+        tokens = _tokens(text) + 1
+        if texts and size + tokens > max_tokens:
+            windows.append((segments.starts[start], max(segments.ends[start:i]), " ".join(texts)))
+            start, texts, size = i, [], 0
+        texts.append(text)
+        size += tokens
+    if texts:
+        windows.append((segments.starts[start], max(segments.ends[start:]), " ".join(texts)))
+    return windows
+
+
+# --------------------------
+# 🔹 Reduce
+# --------------------------
+def _question_tokens(question: Dict[str, Any]) -> set:
+    return set(re.findall(r"[a-z0-9']+", str(question.get("question", "")).lower()))
+
+
+def reduce_questions(candidates: List[Dict[str, Any]], target: int = TARGET_QUESTIONS) -> List[Dict[str, Any]]:
+    """
+    Drop near-duplicate questions (token Jaccard similarity), then pick
+    round-robin across CEFR levels A1..C1 so the final set stays balanced.
+    Within a level, questions keep their window order (video order).
+    """
+    unique, seen = [], []
+    for q in candidates:
+        tokens = _question_tokens(q)
+        if not tokens:
+            continue
+        if any(len(tokens & other) / len(tokens | other) >= DUPLICATE_THRESHOLD for other in seen):
+            continue
+        seen.append(tokens)
+        unique.append(q)
+
+    buckets: Dict[str, List[Dict[str, Any]]] = {level: [] for level in LEVELS}
+    others = []
+    for q in unique:
+        level = str(q.get("level", "")).upper()
+        (buckets[level] if level in buckets else others).append(q)
+
+    picked = []
+    queues = [buckets[level] for level in LEVELS] + [others]
+    while len(picked) < target and any(queues):
+        for queue in queues:
+            if queue and len(picked) < target:
+                picked.append(queue.pop(0))
+
+    # present easy -> hard, like the single-call output
+    order = {level: i for i, level in enumerate(LEVELS)}
+    return sorted(picked, key=lambda q: order.get(str(q.get("level", "")).upper(), len(LEVELS)))
+
+
+# --------------------------
+# 🔹 Map-reduce generation
+# --------------------------
+def question_windows(transcript: str, segments: Optional[TranscriptSegments] = None) -> List[Window]:
+    """Windows the pipeline would use; a single window means one (streamable) model call."""
+    if segments is not None and len(segments):
+        return split_segment_windows(segments)
+    return split_text_windows(transcript)
+
+
+async def generate_questions_map_reduce(
+    transcript: str,
+    title: str,
+    segments: Optional[TranscriptSegments] = None,
+    target: int = TARGET_QUESTIONS,
+) -> List[Dict[str, Any]]:
+    """
+    Question generation that covers the whole transcript.
+    Short transcripts use one call. Longer ones are split into token-budgeted
+    windows (timed segments when available), each window gets its share of
+    questions concurrently, and the candidates are deduped and level-balanced.
+    Returns a question list, or the first {"error": ...} if every window failed.
+    """
+    windows = question_windows(transcript, segments)
+    if len(windows) <= 1:
+        return await generate_comprehension_questions_async(transcript, title)
+
+    # ask for ~1.5x the share of each window so dedup/balancing has room
+    per_window = max(3, math.ceil(target * 1.5 / len(windows)))
+    question_count = f"{per_window}-{per_window + 2}"
+    semaphore = asyncio.Semaphore(QUESTION_MAX_PARALLEL_WINDOWS)
+
+    async def map_window(index: int, window: Window):
+        start, end, text = window
+        async with semaphore:
+            result = await generate_comprehension_questions_async(
+                text, f"{title} (part {index + 1}/{len(windows)})", question_count=question_count
+            )
+        if isinstance(result, list) and start is not None:
+            for q in result:
+                if isinstance(q, dict):
+                    q["start"], q["end"] = start, end
+        return result
+
+    results = await asyncio.gather(*(map_window(i, w) for i, w in enumerate(windows)))
+
+    candidates = [q for r in results if isinstance(r, list) for q in r if isinstance(q, dict)]
+    if not candidates:
+        return next((r for r in results if isinstance(r, dict)), {"error": "No questions generated"})
+    return reduce_questions(candidates, target)
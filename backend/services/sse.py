@@ -0,0 +1,7 @@
+import json
+from typing import Any
+
+
+def format_sse(event: str, data: Any) -> str:
+    """Encode one Server-Sent Event with a JSON payload."""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
@@ -0,0 +1,39 @@
+import copy
+from typing import Any, Dict, Type
+
+from pydantic import BaseModel
+
+
+def _make_strict(node: Any) -> Any:
+    """
+    OpenAI strict mode: every object lists all its properties as required,
+    forbids additional properties and carries no defaults.
+    """
+    if isinstance(node, dict):
+        node.pop("default", None)
+        if node.get("type") == "object" and "properties" in node:
+            node["required"] = list(node["properties"].keys())
+            node["additionalProperties"] = False
+        # a $ref must stand alone in strict mode
+        if "$ref" in node:
+            for key in [k for k in node if k != "$ref"]:
+                node.pop(key)
+        for value in node.values():
+            _make_strict(value)
+    elif isinstance(node, list):
+        for item in node:
+            _make_strict(item)
+    return node
+
+
+def strict_json_schema(model: Type[BaseModel]) -> Dict[str, Any]:
+    # by_alias: the model sees the same keys the parser validates (e.g. "difficulty", "answer")
+    return _make_strict(copy.deepcopy(model.model_json_schema(by_alias=True)))
+
+
+def json_schema_format(model: Type[BaseModel]) -> Dict[str, Any]:
+    """response_format value for a Pydantic model."""
+    return {
+        "type": "json_schema",
+        "json_schema": {"name": model.__name__, "strict": True, "schema": strict_json_schema(model)},
+    }
@@ -0,0 +1,88 @@
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import Any, Dict, Iterable, List, Optional
+
+from backend.services.lru_cache import TTLCache
+
+
+class TranscriptSegments:
+    """
+    Timed transcript stored column-wise: two float arrays (start/end seconds)
+    plus the texts, sorted by start time. Time lookups are binary searches
+    over `starts`, i.e. O(log n).
+
+    Captions may overlap (YouTube's often do): `max_ends[i]` is the latest end
+    among segments 0..i, so range searches also find a long segment that
+    started before shorter ones.
+
+    Serialized form (ListeningSource.segments):
+        {"start": [...], "end": [...], "text": [...]}
+    """
+
+    __slots__ = ("starts", "ends", "texts", "max_ends")
+
+    def __init__(self, starts: Iterable[float], ends: Iterable[float], texts: Iterable[str]):
+        self.starts = array("d", starts)
+        self.ends = array("d", ends)
+        self.texts = list(texts)
+        if not (len(self.starts) == len(self.ends) == len(self.texts)):
+            raise ValueError("start/end/text arrays must have the same length")
+        self.max_ends = array("d")
+        latest = float("-inf")
+        for end in self.ends:
+            latest = max(latest, end)
+            self.max_ends.append(latest)
+
+    @classmethod
+    def from_snippets(cls, snippets: Iterable[Dict[str, Any]]) -> "TranscriptSegments":
+        """Build from transcript_service snippets ({start, duration, text})."""
+        rows = sorted(
+            (float(s["start"]), float(s["start"]) + float(s.get("duration") or 0), " ".join(str(s["text"]).split()))
+            for s in snippets
+            if str(s.get("text") or "").strip()
+        )
+        return cls((r[0] for r in rows), (r[1] for r in rows), (r[2] for r in rows))
+
+    @classmethod
+    def from_json(cls, data: Dict[str, List[Any]]) -> "TranscriptSegments":
+        return cls(data.get("start", []), data.get("end", []), data.get("text", []))
+
+    def to_json(self) -> Dict[str, List[Any]]:
+        return {"start": self.starts.tolist(), "end": self.ends.tolist(), "text": self.texts}
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    @property
+    def duration(self) -> float:
+        return self.max_ends[-1] if self.max_ends else 0.0
+
+    def segment(self, index: int) -> Dict[str, Any]:
+        return {"index": index, "start": self.starts[index], "end": self.ends[index], "text": self.texts[index]}
+
+    def index_at(self, t: float) -> Optional[int]:
+        """Index of the segment being spoken at time t (the latest started one when they overlap), or None in a gap."""
+        first = bisect_right(self.max_ends, t)  # segments before this one all ended by t
+        for i in range(bisect_right(self.starts, t) - 1, first - 1, -1):
+            if t < self.ends[i]:
+                return i
+        return None
+
+    def at(self, t: float) -> Optional[Dict[str, Any]]:
+        i = self.index_at(t)
+        return self.segment(i) if i is not None else None
+
+    def _range(self, start: float, end: float) -> List[int]:
+        """Indexes of the segments overlapping [start, end)."""
+        lo = bisect_right(self.max_ends, start)
+        hi = bisect_left(self.starts, end)
+        # a short segment nested after a longer one may have ended already
+        return [i for i in range(lo, hi) if self.ends[i] > start]
+
+    def between(self, start: float, end: float) -> List[Dict[str, Any]]:
+        """Segments overlapping [start, end)."""
+        return [self.segment(i) for i in self._range(start, end)]
+
+
+# Parsed segment indexes of recently used videos, keyed by ListeningSource.id
+segments_cache = TTLCache(maxsize=256, ttl=3600)
@@ -1,25 +1,174 @@
+import json
+import os
+import random
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Union
+
 from youtube_transcript_api import YouTubeTranscriptApi, TranscriptsDisabled, NoTranscriptFound, VideoUnavailable
 
-def fetch_transcript(video_id: str, lang: str = "en") -> str:
+# --------------------------
+# 🔹 Config
+# --------------------------
+TRANSCRIPT_CACHE_DIR = os.getenv("TRANSCRIPT_CACHE_DIR", os.path.join(tempfile.gettempdir(), "english_buddy_transcripts"))
+TRANSCRIPT_PROVIDER = os.getenv("TRANSCRIPT_PROVIDER", "youtube")  # "youtube" | "fake"
+TRANSCRIPT_FAKE_DIR = os.getenv("TRANSCRIPT_FAKE_DIR", "")
+TRANSCRIPT_FETCH_WORKERS = int(os.getenv("TRANSCRIPT_FETCH_WORKERS", "8"))
+TRANSCRIPT_MAX_RETRIES = int(os.getenv("TRANSCRIPT_MAX_RETRIES", "3"))
+TRANSCRIPT_RETRY_BASE_DELAY = float(os.getenv("TRANSCRIPT_RETRY_BASE_DELAY", "1"))
+
+# A snippet is {"start": seconds, "duration": seconds, "text": str}
+Snippet = Dict[str, Union[float, str]]
+
+
+class TranscriptError(Exception):
+    """Transcript could not be fetched; `permanent` errors are not retried."""
+
+    def __init__(self, message: str, permanent: bool = False):
+        super().__init__(message)
+        self.permanent = permanent
+
+
+# --------------------------
+# 🔹 Providers
+# --------------------------
+class YouTubeTranscriptProvider:
+    """Fetches timed snippets from YouTube, reusing one API client."""
+
+    def __init__(self):
+        self._api: Optional[YouTubeTranscriptApi] = None
+        self._lock = threading.Lock()
+
+    def _client(self) -> YouTubeTranscriptApi:
+        with self._lock:
+            if self._api is None:
+                self._api = YouTubeTranscriptApi()
+            return self._api
+
+    def fetch(self, video_id: str, lang: str) -> List[Snippet]:
+        try:
+            transcript = self._client().fetch(video_id, languages=[lang])
+        except TranscriptsDisabled:
+            raise TranscriptError("This video has transcripts disabled.", permanent=True)
+        except NoTranscriptFound:
+            raise TranscriptError("No transcript found for this video.", permanent=True)
+        except VideoUnavailable:
+            raise TranscriptError("The video is unavailable.", permanent=True)
+        except Exception as e:
+            raise TranscriptError(f"Unexpected error while fetching transcript: {str(e)}")
+        return [{"start": s.start, "duration": s.duration, "text": s.text} for s in transcript]
+
+
+class FakeTranscriptProvider:
     """
-    Lấy transcript từ YouTube, trả về string text
+    Offline provider for tests and benchmarks. Snippets come from an in-memory
+    dict {video_id: [snippet, ...]} or from <directory>/<video_id>.<lang>.json.
     """
+
+    def __init__(self, transcripts: Optional[Dict[str, List[Snippet]]] = None, directory: str = ""):
+        self.transcripts = transcripts or {}
+        self.directory = directory
+        self.calls = 0
+
+    def fetch(self, video_id: str, lang: str) -> List[Snippet]:
+        self.calls += 1
+        if video_id in self.transcripts:
+            return list(self.transcripts[video_id])
+        if self.directory:
+            path = os.path.join(self.directory, f"{video_id}.{lang}.json")
+            if os.path.exists(path):
+                with open(path, encoding="utf-8") as f:
+                    return json.load(f)
+        raise TranscriptError("No transcript found for this video.", permanent=True)
+
+
+def _default_provider():
+    if TRANSCRIPT_PROVIDER == "fake":
+        return FakeTranscriptProvider(directory=TRANSCRIPT_FAKE_DIR)
+    return YouTubeTranscriptProvider()
+
+
+provider = _default_provider()
+
+
+# --------------------------
+# 🔹 On-disk cache keyed by (video_id, lang)
+# --------------------------
+def _cache_path(video_id: str, lang: str) -> str:
+    safe_id = re.sub(r"[^A-Za-z0-9_-]", "_", video_id)
+    safe_lang = re.sub(r"[^A-Za-z0-9_-]", "_", lang)
+    return os.path.join(TRANSCRIPT_CACHE_DIR, safe_lang, f"{safe_id}.json")
+
+
+def _cache_get(video_id: str, lang: str) -> Optional[List[Snippet]]:
     try:
-        print("*"*100)
-        print("Fetching transcript for video ID:", video_id)
-        print("*"*100)
-        api = YouTubeTranscriptApi()
-        transcript = api.fetch(video_id, languages=[lang])
-        as_dict = [snippet.text for snippet in transcript]
-        print(as_dict)
-        result = "".join(as_dict)
-        print("*"*100)
-        return result
-    except TranscriptsDisabled:
-        raise Exception("This video has transcripts disabled.")
-    except NoTranscriptFound:
-        raise Exception("No transcript found for this video.")
-    except VideoUnavailable:
-        raise Exception("The video is unavailable.")
-    except Exception as e:
-        raise Exception(f"Unexpected error while fetching transcript: {str(e)}")
+        with open(_cache_path(video_id, lang), encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+
+def _cache_set(video_id: str, lang: str, snippets: List[Snippet]) -> None:
+    path = _cache_path(video_id, lang)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(snippets, f, ensure_ascii=False)
+    os.replace(tmp_path, path)  # atomic: concurrent readers never see a partial file
+
+
+# --------------------------
+# 🔹 Public API
+# --------------------------
+def fetch_snippets(video_id: str, lang: str = "en", source=None, use_cache: bool = True) -> List[Snippet]:
+    """
+    Return the timed snippets of a video, from the disk cache when possible.
+    Transient provider errors are retried with exponential backoff + jitter.
+    """
+    if use_cache:
+        cached = _cache_get(video_id, lang)
+        if cached is not None:
+            return cached
+
+    source = source or provider
+    for attempt in range(1, TRANSCRIPT_MAX_RETRIES + 1):
+        try:
+            snippets = source.fetch(video_id, lang)
+            break
+        except TranscriptError as e:
+            if e.permanent or attempt == TRANSCRIPT_MAX_RETRIES:
+                raise
+            time.sleep(TRANSCRIPT_RETRY_BASE_DELAY * 2 ** (attempt - 1) * (1 + random.random() / 2))
+
+    if use_cache:
+        _cache_set(video_id, lang, snippets)
+    return snippets
+
+
+def snippets_to_text(snippets: Iterable[Snippet]) -> str:
+    # Snippets are separate caption lines: join with a space so words don't merge
+    return " ".join(" ".join(str(s["text"]).split()) for s in snippets if s.get("text"))
+
+
+def fetch_many(
+    video_ids: Iterable[str],
+    lang: str = "en",
+    max_workers: int = TRANSCRIPT_FETCH_WORKERS,
+    source=None,
+) -> Dict[str, Union[List[Snippet], TranscriptError]]:
+    """
+    Fetch many videos concurrently with a bounded thread pool (e.g. a playlist
+    import). Returns {video_id: snippets or the TranscriptError raised}.
+    """
+    def fetch_one(video_id: str):
+        try:
+            return fetch_snippets(video_id, lang, source=source)
+        except TranscriptError as e:
+            return e
+
+    unique_ids = list(dict.fromkeys(video_ids))
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        return dict(zip(unique_ids, pool.map(fetch_one, unique_ids)))
@@ -0,0 +1,58 @@
+import pytest
+
+from backend.services.local_grader import pre_grade
+
+
+def _question(*points, question_type="factual"):
+    return {"expected_answer_points": list(points), "question_type": question_type}
+
+
+GEORGE = _question("George")
+
+
+@pytest.mark.parametrize("answer", ["George", "george.", "It is George", "His name is George"])
+def test_exact_keyword_answers_are_graded_locally(answer):
+    result = pre_grade(GEORGE, answer)
+
+    assert result["general"] == "correct"
+    assert result["overall_score"] == 100
+    assert result["graded_by"] == "local"
+
+
+@pytest.mark.parametrize("answer", ["not George", "It wasn't George", "never George"])
+def test_negated_answers_go_to_the_model(answer):
+    assert pre_grade(GEORGE, answer) is None
+
+
+@pytest.mark.parametrize("answer", ["Peppa or George", "maybe George", "George but not Peppa"])
+def test_hedged_answers_go_to_the_model(answer):
+    assert pre_grade(GEORGE, answer) is None
+
+
+def test_small_typo_in_a_long_word_is_tolerated():
+    result = pre_grade(GEORGE, "Georg")
+
+    assert result["general"] == "correct"
+    assert result["overall_score"] == 90
+
+
+def test_short_words_must_match_exactly():
+    assert pre_grade(_question("cat"), "cat")["general"] == "correct"
+    assert pre_grade(_question("cat"), "car") is None
+
+
+def test_extra_or_missing_content_goes_to_the_model():
+    assert pre_grade(GEORGE, "George and Peppa") is None
+    assert pre_grade(_question("Peppa", "George"), "George") is None
+
+
+def test_open_ended_questions_go_to_the_model():
+    assert pre_grade(_question("George", question_type="opinion"), "George") is None
+
+
+def test_true_false_only_for_a_bare_yes_or_no():
+    question = _question("true")
+
+    assert pre_grade(question, "yes")["general"] == "correct"
+    assert pre_grade(question, "false")["general"] == "incorrect"
+    assert pre_grade(question, "yes that is not right") is None
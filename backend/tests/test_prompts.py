@@ -0,0 +1,54 @@
+import json
+
+import pytest
+
+from backend.services import ai_service
+
+# Two calls per call site with different request data; everything the
+# provider sees before the per-call user message must not change.
+CALLS = {
+    "evaluate_listening": (
+        lambda: ai_service._listening_request("The cat sat on the mat", "a cat on a mat"),
+        lambda: ai_service._listening_request("Paris is the capital of France", "I think it is Paris"),
+    ),
+    "evaluate_speaking": (
+        lambda: ai_service._speaking_request("I go to school yesterday.", "What did you do yesterday?"),
+        lambda: ai_service._speaking_request("My favourite food is pho because it is warm."),
+    ),
+    "generate_questions": (
+        lambda: ai_service._questions_request("A: Hi, how are you? B: Fine, thanks.", "Daily Conversation"),
+        lambda: ai_service._questions_request("Peppa and George go to the beach. " * 50, "Peppa Pig"),
+    ),
+}
+
+
+def _prefix(request):
+    """
+    The serialized request without the final (per-call) user message: tools,
+    response_format, the messages before it and the sampling settings.
+    """
+    static = {key: value for key, value in request.items() if key != "messages"}
+    static["messages"] = request["messages"][:-1]
+    return json.dumps(static, sort_keys=True, ensure_ascii=False).encode("utf-8")
+
+
+@pytest.mark.parametrize("name", sorted(CALLS))
+def test_request_prefix_is_byte_identical_across_calls(name):
+    first, second = (build() for build in CALLS[name])
+
+    assert _prefix(first) == _prefix(second)
+    # the prefix is more than an empty shell: a system message and a response format
+    assert first["messages"][0]["role"] == "system"
+    assert "response_format" in first or not ai_service.STRUCTURED_OUTPUTS
+    # and only the last message carries the request data
+    assert first["messages"][-1]["role"] == "user"
+    assert first["messages"][-1] != second["messages"][-1]
+
+
+@pytest.mark.parametrize("name", sorted(CALLS))
+def test_request_prefix_has_no_request_data(name):
+    first, _ = (build() for build in CALLS[name])
+    prefix = _prefix(first).decode("utf-8")
+
+    for needle in ("The cat sat on the mat", "a cat on a mat", "I go to school yesterday", "Daily Conversation", "Hi, how are you"):
+        assert needle not in prefix
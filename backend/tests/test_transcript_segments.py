@@ -0,0 +1,55 @@
+from backend.services.question_pipeline import split_segment_windows
+from backend.services.transcript_segments import TranscriptSegments
+
+
+def _texts(segments):
+    return [s["text"] for s in segments]
+
+
+def _overlapping():
+    # "a" runs 0-10 while the shorter "b" (1-3) and "c" (6-8) start inside it
+    return TranscriptSegments([0, 1, 6], [10, 3, 8], ["a", "b", "c"])
+
+
+def test_at_finds_the_segment_being_spoken():
+    segments = TranscriptSegments([0, 2, 5], [2, 4, 6], ["one", "two", "three"])
+
+    assert segments.at(0)["text"] == "one"
+    assert segments.at(2)["text"] == "two"  # ends are exclusive
+    assert segments.at(4.5) is None  # gap
+    assert segments.at(6) is None  # after the last segment
+
+
+def test_at_with_overlapping_segments():
+    segments = _overlapping()
+
+    assert segments.at(2)["text"] == "b"  # latest started one wins
+    assert segments.at(4)["text"] == "a"  # "b" has ended, "a" still runs
+    assert segments.at(7)["text"] == "c"
+    assert segments.at(9)["text"] == "a"
+
+
+def test_between_with_overlapping_segments():
+    segments = _overlapping()
+
+    assert _texts(segments.between(3.5, 7)) == ["a", "c"]
+    assert _texts(segments.between(0, 20)) == ["a", "b", "c"]
+    assert _texts(segments.between(8.5, 9)) == ["a"]
+    assert _texts(segments.between(10, 12)) == []
+
+
+def test_segment_windows_end_at_the_latest_end():
+    windows = split_segment_windows(_overlapping(), max_tokens=2)
+
+    assert windows[0][:2] == (0, 10)
+
+
+def test_from_snippets_sorts_and_skips_empty_text():
+    segments = TranscriptSegments.from_snippets([
+        {"start": 5, "duration": 1, "text": "later"},
+        {"start": 1, "duration": 2, "text": "  first\nline "},
+        {"start": 3, "duration": 1, "text": " "},
+    ])
+
+    assert segments.to_json() == {"start": [1.0, 5.0], "end": [3.0, 6.0], "text": ["first line", "later"]}
+    assert segments.duration == 6.0
@@ -0,0 +1,82 @@
+import pytest
+
+from backend.services import transcript_service
+from backend.services.transcript_service import FakeTranscriptProvider, TranscriptError
+
+SNIPPETS = [
+    {"start": 0.0, "duration": 2.0, "text": "Hello"},
+    {"start": 2.0, "duration": 3.0, "text": "world"},
+]
+
+
+class FlakyProvider:
+    """Fails with a transient error `failures` times, then returns SNIPPETS."""
+
+    def __init__(self, failures: int, permanent: bool = False):
+        self.failures = failures
+        self.permanent = permanent
+        self.calls = 0
+
+    def fetch(self, video_id, lang):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise TranscriptError("boom", permanent=self.permanent)
+        return list(SNIPPETS)
+
+
+@pytest.fixture(autouse=True)
+def _isolated(tmp_path, monkeypatch):
+    monkeypatch.setattr(transcript_service, "TRANSCRIPT_CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(transcript_service.time, "sleep", lambda seconds: None)
+
+
+def test_fake_provider_serves_memory_and_directory(tmp_path):
+    (tmp_path / "vid2.en.json").write_text('[{"start": 1, "duration": 1, "text": "from disk"}]', encoding="utf-8")
+    fake = FakeTranscriptProvider({"vid1": SNIPPETS}, directory=str(tmp_path))
+
+    assert fake.fetch("vid1", "en") == SNIPPETS
+    assert fake.fetch("vid2", "en")[0]["text"] == "from disk"
+    with pytest.raises(TranscriptError) as err:
+        fake.fetch("missing", "en")
+    assert err.value.permanent
+
+
+def test_fetch_snippets_uses_the_disk_cache():
+    fake = FakeTranscriptProvider({"vid1": SNIPPETS})
+
+    assert transcript_service.fetch_snippets("vid1", source=fake) == SNIPPETS
+    assert transcript_service.fetch_snippets("vid1", source=fake) == SNIPPETS
+    assert fake.calls == 1
+    # the cache is keyed by language too
+    transcript_service.fetch_snippets("vid1", lang="vi", source=fake)
+    assert fake.calls == 2
+
+
+def test_transient_errors_are_retried():
+    flaky = FlakyProvider(failures=transcript_service.TRANSCRIPT_MAX_RETRIES - 1)
+
+    assert transcript_service.fetch_snippets("vid1", source=flaky, use_cache=False) == SNIPPETS
+    assert flaky.calls == transcript_service.TRANSCRIPT_MAX_RETRIES
+
+
+def test_permanent_errors_are_not_retried():
+    flaky = FlakyProvider(failures=1, permanent=True)
+
+    with pytest.raises(TranscriptError):
+        transcript_service.fetch_snippets("vid1", source=flaky, use_cache=False)
+    assert flaky.calls == 1
+
+
+def test_fetch_many_returns_errors_per_video_and_fetches_each_id_once():
+    fake = FakeTranscriptProvider({"vid1": SNIPPETS, "vid2": SNIPPETS})
+
+    results = transcript_service.fetch_many(["vid1", "vid2", "vid1", "missing"], source=fake, max_workers=2)
+
+    assert list(results) == ["vid1", "vid2", "missing"]
+    assert results["vid1"] == SNIPPETS
+    assert isinstance(results["missing"], TranscriptError)
+    assert fake.calls == 3
+
+
+def test_snippets_to_text_keeps_words_apart():
+    assert transcript_service.snippets_to_text(SNIPPETS + [{"text": "  again\nand again "}]) == "Hello world again and again"
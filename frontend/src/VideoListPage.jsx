@@ -4,34 +4,51 @@ import { useNavigate } from "react-router-dom";
 import { FaPlay, FaMagic, FaTrash } from "react-icons/fa"; // Added FaTrash
 
 const BACKEND_URL = import.meta.env.VITE_BACKEND_URL;
+const PAGE_SIZE = 50;
 
 function VideoListPage() {
   const navigate = useNavigate();
   const [videos, setVideos] = useState([]);
   const [loading, setLoading] = useState(true);
+  // API trả về từng trang: cursor trang sau nằm trong header X-Next-Cursor
+  const [nextCursor, setNextCursor] = useState(null);
+  const [total, setTotal] = useState(null);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     fetchVideos();
   }, []);
 
-  const fetchVideos = () => {
-    axios
-      .get(`${BACKEND_URL}/api/videos/`)
+  const fetchVideos = (cursor = null) => {
+    const params = { limit: PAGE_SIZE };
+    if (cursor) params.cursor = cursor;
+
+    return axios
+      .get(`${BACKEND_URL}/api/videos/`, { params })
       .then((res) => {
         const data = res.data;
+        let page = [];
         if (Array.isArray(data)) {
-          setVideos(data);
+          page = data;
         } else if (Array.isArray(data.data)) {
-          setVideos(data.data);
+          page = data.data;
         } else {
-          setVideos([]);
           console.warn("Unexpected API response:", data);
         }
+        setVideos((prevVideos) => (cursor ? [...prevVideos, ...page] : page));
+        setNextCursor(res.headers["x-next-cursor"] || null);
+        const totalCount = parseInt(res.headers["x-total-count"], 10);
+        setTotal(Number.isNaN(totalCount) ? null : totalCount);
       })
       .catch((err) => console.error("Error fetching videos:", err))
       .finally(() => setLoading(false));
   };
 
+  const handleLoadMore = () => {
+    setLoadingMore(true);
+    fetchVideos(nextCursor).finally(() => setLoadingMore(false));
+  };
+
   const handleClick = (id) => {
     navigate(`/video/${id}`);
   };
@@ -55,6 +72,7 @@ function VideoListPage() {
 
       // 4. Update UI immediately (Optimistic UI)
       setVideos((prevVideos) => prevVideos.filter((video) => video.id !== id));
+      setTotal((prevTotal) => (prevTotal === null ? null : prevTotal - 1));
       alert("Xoá video thành công!");
     } catch (err) {
       console.error("Error deleting video:", err);
@@ -75,6 +93,11 @@ function VideoListPage() {
       <h1 style={{ textAlign: "center", marginBottom: "30px" }}>
         🎥 Danh sách Video Học Tập
       </h1>
+      {total !== null && (
+        <p style={{ textAlign: "center", marginTop: "-20px", marginBottom: "30px", color: "#666" }}>
+          Đang hiển thị {videos.length} / {total} video
+        </p>
+      )}
       
       {/* Floating Action Button (Unchanged) */}
       <div
@@ -218,6 +241,28 @@ function VideoListPage() {
         })}
       </div>
 
+      {/* LOAD MORE: chỉ hiện khi còn trang sau */}
+      {nextCursor && (
+        <div style={{ textAlign: "center", marginTop: "30px" }}>
+          <button
+            onClick={handleLoadMore}
+            disabled={loadingMore}
+            style={{
+              padding: "12px 24px",
+              border: "none",
+              borderRadius: "6px",
+              background: "#007bff",
+              color: "#fff",
+              cursor: loadingMore ? "default" : "pointer",
+              fontWeight: "bold",
+              opacity: loadingMore ? 0.7 : 1,
+            }}
+          >
+            {loadingMore ? "Đang tải..." : "Xem thêm video"}
+          </button>
+        </div>
+      )}
+
       {/* STYLES (Unchanged) */}
       <style>{`
         @keyframes pulse {